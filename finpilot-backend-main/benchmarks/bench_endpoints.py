@@ -0,0 +1,336 @@
+"""
+FinPilot Backend - Per-endpoint benchmark suite
+Drives every route of the app in-process (ASGI, no network) against a SQLite
+store filled by benchmarks/synthetic.py, and reports per endpoint:
+
+    p50 / p95 / p99   latency of sequential calls, in ms
+    req/s             throughput with --concurrency calls in flight
+    peak KiB          peak Python heap allocated by one call (tracemalloc)
+    reads/call        rows read and written per call, as repositories.usage
+    writes/call       counts them (the storage histograms behind /metrics)
+
+/events is timed from connecting to its first snapshot frame; the stream
+is then closed. Routes without a case are listed at the end so new
+endpoints don't slip by.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--transactions 100000] [--users 100] [--requests 50]
+    python benchmarks/bench_endpoints.py --db bench.db        # reuse (or create) a seeded file
+    python benchmarks/bench_endpoints.py --only wrapped --json results.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import date
+from itertools import count
+from urllib.parse import urlencode
+
+os.environ["STORAGE_BACKEND"] = "sqlite"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def storage_totals(method, route):
+    """(queries, reads, writes) the metrics middleware has recorded for a route so far."""
+    from prometheus_client import REGISTRY
+    labels = {"method": method, "route": route}
+    return tuple(
+        REGISTRY.get_sample_value(f"storage_{name}_per_request_sum", labels) or 0.0
+        for name in ("queries", "documents_read", "documents_written")
+    )
+
+
+async def first_event(app, path, params):
+    """
+    GET an SSE stream straight through the ASGI app, wait for its first
+    frame, then disconnect; httpx's ASGITransport would wait for the end of
+    a body that never ends. Returns the status code.
+    """
+    received = asyncio.Event()
+    requested = False
+    status = 500
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await received.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            received.set()
+
+    await app({
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(params).encode(), "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }, receive, send)
+    return status
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def build_cases(users, month, closed_month, year):
+    """
+    (name, method, path, prepare) per case. prepare(i) returns the request
+    kwargs for call i and may do untimed setup, e.g. create the goal a
+    DELETE removes. {"first_event": True} in the kwargs times an SSE stream
+    to its first frame (see first_event).
+    """
+    from database import provider, repo
+    from schemas.goal import GoalInput
+    from services import wrapped_service
+    from services.goal_service import _goal_record
+    from synthetic import PASSWORD
+
+    user_at = lambda i: users[i % len(users)]  # noqa: E731
+    serial = count()
+
+    def user_params(**extra):
+        return lambda i: {"params": {"user_id": user_at(i)["id"], **extra}}
+
+    async def register(i):
+        return {"json": {"name": "Bench", "email": f"bench{next(serial)}@bench.example", "password": PASSWORD}}
+
+    async def login(i):
+        return {"json": {"email": user_at(i)["email"], "password": PASSWORD}}
+
+    async def add_transaction(i):
+        return {"json": {"user_id": user_at(i)["id"], "amount": 250.0, "type": "debit",
+                         "category": "food", "date": f"{month}-15", "description": "bench"}}
+
+    import_body = "amount,type,category,date,description\n" + "".join(
+        f"{100 + r},debit,food,{month}-{(r % 28) + 1:02d},bench import\n" for r in range(100))
+
+    async def import_csv(i):
+        return {"params": {"user_id": user_at(i)["id"], "format": "csv"}, "content": import_body}
+
+    async def goal_of(user):
+        if not user["goal_ids"]:
+            user["goal_ids"].append(await repo.create_goal(_goal_record(GoalInput(
+                user_id=user["id"], name="Bench", target_amount=10_000_000, duration_months=12,
+            ))))
+        return user["goal_ids"][0]
+
+    async def contribute(i):
+        return {"path": f"/savings/goal/{await goal_of(user_at(i))}", "json": {"amount": 1.0}}
+
+    async def delete_goal(i):
+        goal_id = await repo.create_goal(_goal_record(GoalInput(
+            user_id=user_at(i)["id"], name="Doomed", target_amount=100, duration_months=6,
+        )))
+        return {"path": f"/savings/goal/{goal_id}"}
+
+    async def create_goal(i):
+        return {"json": {"user_id": user_at(i)["id"], "target_amount": 50000, "duration_months": 12,
+                         "name": "Bench goal"}}
+
+    async def goal_batch(i):
+        user = user_at(i)
+        goal = {"user_id": user["id"], "target_amount": 20000, "duration_months": 6}
+        return {"json": {"create": [goal, goal],
+                         "contribute": [{"goal_id": await goal_of(user), "amount": 1.0}]}}
+
+    async def wrapped_snapshot(i):
+        # Store the snapshot untimed so the timed call is the read path
+        user = user_at(i)
+        year, month_no = int(closed_month[:4]), int(closed_month[5:])
+        await wrapped_service.precompute_wrapped_summary(user["id"], year, month_no)
+        return {"params": {"user_id": user["id"], "year": year, "month": month_no}}
+
+    async def ready(i):
+        # No lifespan runs in-process; finish the warm-up untimed so the call reports ready
+        await provider.start_warm_up()
+        return {}
+
+    async def set_salary(i):
+        return {"json": {"user_id": user_at(i)["id"], "amount": 65000, "month": month}}
+
+    def sync(prepare):
+        async def run(i):
+            return prepare(i)
+        return run
+
+    return [
+        ("root", "GET", "/", sync(lambda i: {})),
+        ("ready", "GET", "/ready", ready),
+        ("auth register", "POST", "/auth/register", register),
+        ("auth login", "POST", "/auth/login", login),
+        ("salary set", "POST", "/salary", set_salary),
+        ("transaction add", "POST", "/transactions", add_transaction),
+        ("transaction import 100 rows", "POST", "/transactions/import", import_csv),
+        ("dashboard summary", "GET", "/dashboard/summary", sync(user_params(month=month))),
+        ("dashboard forecast", "GET", "/dashboard/forecast", sync(user_params())),
+        ("dashboard category page", "GET", "/dashboard/category/{category_name}",
+         sync(lambda i: {"path": "/dashboard/category/food",
+                         "params": {"user_id": user_at(i)["id"], "limit": 100}})),
+        ("dashboard category stream", "GET", "/dashboard/category/{category_name}",
+         sync(lambda i: {"path": "/dashboard/category/food", "params": {"user_id": user_at(i)["id"]}})),
+        ("dashboard history page", "GET", "/dashboard/history", sync(user_params(limit=100))),
+        ("dashboard history stream", "GET", "/dashboard/history", sync(user_params(format="ndjson"))),
+        ("goal create", "POST", "/savings/goal", create_goal),
+        ("goals list", "GET", "/savings/goals", sync(user_params())),
+        ("goal projections", "GET", "/savings/goals/projections", sync(user_params())),
+        ("goal contribute", "PUT", "/savings/goal/{goal_id}", contribute),
+        ("goal delete", "DELETE", "/savings/goal/{goal_id}", delete_goal),
+        ("goals batch", "POST", "/savings/goals/batch", goal_batch),
+        ("wrapped summary live", "GET", "/wrapped/summary",
+         sync(user_params(year=int(month[:4]), month=int(month[5:])))),
+        ("wrapped summary snapshot", "GET", "/wrapped/summary", wrapped_snapshot),
+        ("wrapped year live", "GET", "/wrapped/year", sync(user_params(year=year))),
+        ("events first snapshot", "GET", "/events",
+         sync(lambda i: {"params": {"user_id": user_at(i)["id"], "month": month}, "first_event": True})),
+    ]
+
+
+async def run_case(client, app, method, path, prepare, requests, concurrency):
+    async def request(i):
+        kwargs = await prepare(i)
+        url = kwargs.pop("path", path)
+        return url, kwargs
+
+    async def send(url, kwargs):
+        if kwargs.get("first_event"):
+            return await first_event(app, url, kwargs["params"])
+        response = await client.request(method, url, **kwargs)
+        await response.aread()
+        return response.status_code
+
+    # Warm-up, then one traced call for the allocation peak
+    await send(*await request(0))
+    gc.collect()
+    url, kwargs = await request(1)
+    tracemalloc.start()
+    await send(url, kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    errors = 0
+    # Setup in prepare() calls services directly, outside the middleware, so isn't counted
+    before = storage_totals(method, path)
+    for i in range(requests):
+        url, kwargs = await request(i + 2)
+        started = time.perf_counter()
+        status = await send(url, kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        errors += status >= 400
+    queries, reads, writes = (after - total for total, after in zip(before, storage_totals(method, path)))
+
+    prepared = [await request(requests + 2 + i) for i in range(requests)]
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bounded(url, kwargs):
+        async with limit:
+            return await send(url, kwargs)
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(bounded(url, kwargs) for url, kwargs in prepared))
+    elapsed = time.perf_counter() - started
+    errors += sum(status >= 400 for status in statuses)
+
+    timings.sort()
+    return {
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "p99_ms": percentile(timings, 99),
+        "requests_per_s": requests / elapsed,
+        "peak_kib": peak / 1024,
+        "queries_per_call": queries / requests,
+        "reads_per_call": reads / requests,
+        "writes_per_call": writes / requests,
+        "errors": errors,
+    }
+
+
+async def seeded_users(repo):
+    """Users (with their goals) already in a reused database."""
+    users = []
+    async for user_id in repo.list_user_ids():
+        user = await repo.get_user(user_id)
+        goals = await repo.list_goals(user_id)
+        users.append({"id": user_id, "email": user["email"], "goal_ids": [g["id"] for g in goals]})
+    return users
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=":memory:", help="SQLite file; seeded when it has no users")
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=50, help="Timed calls per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight for the throughput run")
+    parser.add_argument("--only", help="Only run cases whose name contains this text")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    os.environ["SQLITE_PATH"] = args.db
+    import httpx
+    import database
+    import synthetic
+    from main import app
+    from services import password_service
+
+    users = await seeded_users(database.repo)
+    if not users:
+        print(f"Seeding {args.users} users, {args.transactions} transactions (seed {args.seed})...")
+        started = time.monotonic()
+        users = await synthetic.populate(database.repo, args.users, args.transactions,
+                                         date.today().strftime("%Y-%m"), seed=args.seed)
+        print(f"   seeded in {time.monotonic() - started:.1f}s")
+
+    today = date.today()
+    month = today.strftime("%Y-%m")
+    closed_month = f"{today.year - 1}-12" if today.month == 1 else f"{today.year}-{today.month - 1:02d}"
+    cases = build_cases(users, month, closed_month, today.year)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'endpoint':<30} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'peak KiB':>9} "
+              f"{'reads/call':>10} {'writes/call':>11} {'errors':>6}")
+        for name, method, path, prepare in cases:
+            if args.only and args.only not in name:
+                continue
+            r = await run_case(client, app, method, path, prepare, args.requests, args.concurrency)
+            results[name] = r
+            print(f"{name:<30} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                  f"{r['requests_per_s']:>8.1f} {r['peak_kib']:>9.0f} {r['reads_per_call']:>10.1f} {r['writes_per_call']:>11.1f} {r['errors']:>6}")
+    password_service.shutdown()
+
+    # ru_maxrss is KiB on Linux
+    print(f"\nprocess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+    covered = {(method, path) for _, method, path, _ in cases}
+    missing = sorted(
+        (method, route.path)
+        for route in app.routes if hasattr(route, "methods") and route.include_in_schema
+        for method in route.methods if method not in ("HEAD", "OPTIONS")
+        if (method, route.path) not in covered
+    )
+    for method, path in missing:
+        print(f"⚠️  no benchmark case for {method} {path}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"transactions": args.transactions, "users": len(users), "seed": args.seed,
+                       "requests": args.requests, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
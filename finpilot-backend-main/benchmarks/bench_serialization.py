@@ -0,0 +1,148 @@
+"""
+FinPilot Backend - Serialization benchmark
+CPU spent turning a service's output into response bytes, per request:
+
+    before    what FastAPI does by default: validate against the route's
+              response_model (jsonable_encoder where there is none) and
+              encode with the stdlib json module; streamed history encoded
+              row by row with json.dumps
+    after     responses.trusted_json / the orjson history stream
+
+Payloads are real service output for the heaviest synthetic user, so no
+storage time is included. Also reports what negotiating gzip or brotli
+(compression.py) costs and saves on each payload.
+
+Usage: python benchmarks/bench_serialization.py [--transactions 50000] [--rows 1000] [--runs 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = ":memory:"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from compression import COMPRESSORS  # noqa: E402
+from database import repo  # noqa: E402
+from responses import trusted_json  # noqa: E402
+from routers.dashboard import _json_array  # noqa: E402
+from schemas.goal import GoalFullResponse  # noqa: E402
+from schemas.transaction import DashboardSummaryResponse  # noqa: E402
+from schemas.wrapped import WrappedSummaryResponse, WrappedYearResponse  # noqa: E402
+from services import finance_service, goal_service, password_service, wrapped_service  # noqa: E402
+
+
+async def _listed(rows):
+    for row in rows:
+        yield row
+
+
+async def _stdlib_array(rows):
+    # The history stream before the fast path
+    yield "["
+    first = True
+    async for row in rows:
+        yield ("" if first else ",") + json.dumps(row, default=str)
+        first = False
+    yield "]"
+
+
+def _validated(model):
+    field = create_model_field(name="Response", type_=model, mode="serialization") if model else None
+
+    async def encode(content):
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+    return encode
+
+
+async def _fast(content):
+    return trusted_json(content).body
+
+
+async def _stream_before(rows):
+    return b"".join([chunk.encode() async for chunk in _stdlib_array(_listed(rows))])
+
+
+async def _stream_after(rows):
+    return b"".join([chunk async for chunk in _json_array(_listed(rows))])
+
+
+async def cpu_ms(encode, content, runs: int):
+    """Median process CPU time of one encode, in ms, and the bytes produced."""
+    body = await encode(content)
+    samples = []
+    for _ in range(runs):
+        started = time.process_time()
+        await encode(content)
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples), body
+
+
+def compress_ms(encoding: str, body: bytes, runs: int):
+    samples = []
+    for _ in range(runs):
+        started = time.process_time()
+        compressor = COMPRESSORS[encoding]()
+        compressed = compressor.compress(body) + compressor.finish()
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples), len(compressed)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows in the history page (API max 1000)")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--end-month", default="2026-09")
+    args = parser.parse_args()
+
+    print(f"🌱 Seeding {args.transactions} transactions over {args.users} users...")
+    users = await synthetic.populate(repo, args.users, args.transactions, args.end_month)
+    user_id = max(users, key=lambda u: u["transactions"])["id"]
+    year, month = int(args.end_month[:4]), int(args.end_month[5:])
+
+    page, _ = await finance_service.get_history_page(user_id, args.rows)
+    history = [row async for row in finance_service.iter_history(user_id)]
+    payloads: List[tuple] = [
+        ("dashboard summary", DashboardSummaryResponse,
+         await finance_service.get_dashboard_summary(user_id, args.end_month)),
+        ("goals list", List[GoalFullResponse], await goal_service.get_user_goals(user_id)),
+        ("wrapped summary", WrappedSummaryResponse, await wrapped_service.get_wrapped_summary(user_id, year, month)),
+        ("wrapped year", WrappedYearResponse, await wrapped_service.get_wrapped_year(user_id, year)),
+        (f"history page ({len(page)} rows)", None, page),
+    ]
+    password_service.shutdown()
+
+    print(f"\n{'payload':<30} {'KiB':>8} {'before ms':>10} {'after ms':>9} {'speedup':>8}"
+          f" {'gzip ms':>8} {'gzip %':>7} {'br ms':>7} {'br %':>6}")
+
+    def report(name, before, after, body):
+        gzip_ms, gzip_size = compress_ms("gzip", body, args.runs)
+        br_ms, br_size = compress_ms("br", body, args.runs)
+        print(f"{name:<30} {len(body) / 1024:>8.1f} {before:>10.3f} {after:>9.3f} {before / after:>7.1f}x"
+              f" {gzip_ms:>8.2f} {gzip_size / len(body) * 100:>6.0f}% {br_ms:>7.2f} {br_size / len(body) * 100:>5.0f}%")
+
+    for name, model, content in payloads:
+        before, _ = await cpu_ms(_validated(model), content, args.runs)
+        after, body = await cpu_ms(_fast, content, args.runs)
+        report(name, before, after, body)
+
+    runs = max(3, args.runs // 10)
+    before, _ = await cpu_ms(_stream_before, history, runs)
+    after, body = await cpu_ms(_stream_after, history, runs)
+    report(f"history stream ({len(history)} rows)", before, after, body)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
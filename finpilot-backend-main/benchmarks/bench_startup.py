@@ -0,0 +1,112 @@
+"""
+FinPilot Backend - Cold start benchmark
+Starts the API in a fresh uvicorn process, as a serverless platform does on
+a cold start, and measures from process launch to:
+
+    first byte   the first response to GET / (the app imported and serving)
+    ready        GET /ready answering 200: storage connected and warmed up
+                 ("-" if the app has no /ready endpoint)
+
+The process runs in --app-dir with the current environment, so for
+Firestore the credentials file must be there. Point --app-dir at another
+checkout to compare revisions.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--backend sqlite|firestore] [--app-dir DIR]
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+POLL_SECONDS = 0.005
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(port: int, path: str):
+    """Status of GET path, or None if nothing is listening yet."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+def cold_start(app_dir: str, backend: str, timeout: float):
+    """(seconds to first byte, seconds to ready or None)."""
+    port = _free_port()
+    env = {**os.environ, "STORAGE_BACKEND": backend}
+    if backend == "sqlite":
+        env.setdefault("SQLITE_PATH", ":memory:")
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        first_byte = ready = None
+        while time.perf_counter() - launched < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with {process.returncode}")
+            if first_byte is None:
+                if _get(port, "/") is not None:
+                    first_byte = time.perf_counter() - launched
+            else:
+                status = _get(port, "/ready")
+                if status == 200:
+                    ready = time.perf_counter() - launched
+                if status != 503:
+                    return first_byte, ready
+            time.sleep(POLL_SECONDS)
+        if first_byte is None:
+            raise RuntimeError(f"server not serving after {timeout}s")
+        print(f"⚠️  /ready still 503 after {timeout}s")
+        return first_byte, None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "firestore"])
+    parser.add_argument("--app-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    first_bytes, readies = [], []
+    for run in range(args.runs):
+        first_byte, ready = cold_start(args.app_dir, args.backend, args.timeout)
+        first_bytes.append(first_byte)
+        if ready is not None:
+            readies.append(ready)
+        print(f"   run {run + 1}: first byte {first_byte * 1000:.0f} ms, "
+              f"ready {'-' if ready is None else f'{ready * 1000:.0f} ms'}")
+
+    def summary(values):
+        if not values:
+            return "-"
+        return f"median {statistics.median(values) * 1000:.0f} ms, min {min(values) * 1000:.0f} ms"
+
+    print(f"\n{args.backend} cold start over {args.runs} runs")
+    print(f"   first byte: {summary(first_bytes)}")
+    print(f"   ready:      {summary(readies)}")
+
+
+if __name__ == "__main__":
+    main()
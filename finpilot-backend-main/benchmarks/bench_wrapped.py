@@ -0,0 +1,94 @@
+"""
+FinPilot Backend - Wrapped summary benchmark
+Times the live Wrapped computation (snapshots bypassed) against an in-memory
+SQLite store.
+Every repository call is delayed by a simulated round trip, which is what
+dominates the request when the store is Firestore.
+
+Usage: python benchmarks/bench_wrapped.py [--rtt-ms 20] [--transactions 5000] [--runs 30]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = ":memory:"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from services import finance_service, wrapped_service  # noqa: E402
+from schemas.transaction import TransactionInput  # noqa: E402
+
+CATEGORIES = ["food", "rent", "transport", "entertainment", "shopping", "misc", "health"]
+
+
+class DelayedRepository:
+    """Proxy that sleeps for one simulated round trip before each call."""
+
+    def __init__(self, inner, rtt: float):
+        self.inner = inner
+        self.rtt = rtt
+        self.calls = 0
+
+    def __getattr__(self, name):
+        target = getattr(self.inner, name)
+        if not callable(target):
+            return target
+
+        async def call(*args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(self.rtt)
+            return await target(*args, **kwargs)
+
+        return call
+
+
+async def seed(user_id: str, count: int):
+    rng = random.Random(42)
+    for i in range(count):
+        year = rng.choice([2024, 2025, 2026])
+        await finance_service.add_transaction(TransactionInput(
+            user_id=user_id,
+            amount=round(rng.uniform(10, 3000), 2),
+            type="credit" if rng.random() < 0.1 else "debit",
+            category=rng.choice(CATEGORIES),
+            date=f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            description=f"txn {i}",
+        ))
+    for month in range(1, 13):
+        await database.repo.set_salary(user_id, f"2025-{month:02d}", 60000)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    user_id = await database.repo.create_user({"email": "bench@example.com", "name": "Bench", "password_hash": "x"})
+    await seed(user_id, args.transactions)
+
+    delayed = DelayedRepository(database.repo, args.rtt_ms / 1000)
+    wrapped_service.repo = delayed
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        await wrapped_service._compute_wrapped_summary(user_id, 2025, 6)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"transactions={args.transactions} rtt={args.rtt_ms}ms runs={args.runs}")
+    print(f"repository calls per request: {delayed.calls / args.runs:.1f}")
+    print(f"p50={statistics.median(timings):.1f}ms  "
+          f"p95={timings[int(len(timings) * 0.95) - 1]:.1f}ms  "
+          f"mean={statistics.mean(timings):.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
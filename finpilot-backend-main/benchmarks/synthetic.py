@@ -0,0 +1,256 @@
+"""
+FinPilot Backend - Synthetic data generator
+Seeded, reproducible users with monthly salaries and allocations, savings
+goals and transaction histories shaped like a real account: salary on the
+1st, rent and utilities once a month, and day-to-day spending whose amounts
+are log-normal per category and which leans towards weekends for food,
+shopping and entertainment. A few debits come back as refunds.
+
+Transactions are spread over users with a heavy tail (a few users own most
+of the history) and written through the repository in import-sized batches,
+so rollups are maintained exactly as the API maintains them. The same seed,
+scale and --end-month always produce the same data.
+
+Usage:
+    STORAGE_BACKEND=sqlite SQLITE_PATH=bench.db \\
+        python benchmarks/synthetic.py --transactions 1000000 [--users 500] [--months 12] [--seed 7]
+"""
+import argparse
+import asyncio
+import calendar
+import os
+import sys
+import time
+from datetime import date
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import STORAGE_BACKEND  # noqa: E402
+from schemas.goal import GoalInput  # noqa: E402
+from services import password_service  # noqa: E402
+from services.ai_service import predict_budget_allocation  # noqa: E402
+from services.finance_service import transaction_keys  # noqa: E402
+from services.goal_service import _goal_record  # noqa: E402
+from services.import_service import IMPORT_BATCH_SIZE  # noqa: E402
+
+# Every synthetic user logs in with this password
+PASSWORD = "synthetic-password"
+
+# category: (share of day-to-day transactions, median amount, weekend weight)
+SPENDING = {
+    "food": (0.42, 250, 1.4),
+    "transport": (0.24, 120, 0.7),
+    "shopping": (0.12, 1200, 1.5),
+    "entertainment": (0.10, 450, 2.0),
+    "health": (0.04, 700, 1.0),
+    "misc": (0.08, 300, 1.0),
+}
+
+MERCHANTS = {
+    "food": ["Swiggy", "Zomato", "Chai Point", "BigBasket", "Office canteen"],
+    "transport": ["Uber", "Ola", "Metro card top-up", "Petrol"],
+    "shopping": ["Amazon", "Flipkart", "Myntra", "Decathlon"],
+    "entertainment": ["PVR", "Netflix", "BookMyShow", "Spotify"],
+    "health": ["Apollo Pharmacy", "Clinic visit", "Gym"],
+    "misc": ["ATM withdrawal", "Gift", "Stationery"],
+}
+
+GOALS = [
+    ("Emergency Fund", "🛟"),
+    ("Vacation", "🏖️"),
+    ("New Laptop", "💻"),
+    ("Wedding", "💍"),
+    ("Car", "🚗"),
+]
+
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Ananya", "Kabir", "Meera", "Rohan", "Saanvi", "Vikram", "Zoya"]
+
+REFUND_RATE = 0.03
+
+
+def month_range(end_month: str, months: int):
+    """The `months` months ending with end_month ("YYYY-MM"), oldest first."""
+    year, month = (int(part) for part in end_month.split("-"))
+    result = []
+    for _ in range(months):
+        result.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return result[::-1]
+
+
+def split_transactions(rng: np.random.Generator, total: int, users: int) -> np.ndarray:
+    """Transactions per user: heavy-tailed, summing exactly to total."""
+    weights = rng.pareto(1.5, users) + 1
+    return rng.multinomial(total, weights / weights.sum())
+
+
+def monthly_salaries(rng: np.random.Generator, months) -> dict:
+    """{"YYYY-MM": salary}, starting around 60k with the occasional raise."""
+    salary = float(np.round(rng.lognormal(np.log(60000), 0.4), -3))
+    salaries = {}
+    for year, month in months:
+        if rng.random() < 0.05:
+            salary = round(salary * 1.1, -3)
+        salaries[f"{year}-{month:02d}"] = salary
+    return salaries
+
+
+class _Calendar:
+    """Day ordinals covered by the dataset and their transaction keys, computed once."""
+
+    def __init__(self, months):
+        first_year, first_month = months[0]
+        last_year, last_month = months[-1]
+        start = date(first_year, first_month, 1).toordinal()
+        end = date(last_year, last_month, calendar.monthrange(last_year, last_month)[1]).toordinal()
+        self.ordinals = np.arange(start, end + 1)
+        self.keys = {int(o): transaction_keys(date.fromordinal(int(o)).isoformat()) for o in self.ordinals}
+        weekend = (self.ordinals - 1) % 7 >= 5
+        self.day_weights = {}
+        for category, (_, _, weekend_weight) in SPENDING.items():
+            weights = np.where(weekend, weekend_weight, 1.0)
+            self.day_weights[category] = weights / weights.sum()
+
+
+def user_transactions(rng: np.random.Generator, user_id: str, count: int, salaries: dict, days: _Calendar):
+    """About `count` transactions for one user, in date order."""
+    rows = []
+
+    def add(ordinal, category, amount, txn_type, description):
+        rows.append({
+            "user_id": user_id,
+            "amount": amount,
+            "type": txn_type,
+            "category": category,
+            "description": description,
+            **days.keys[ordinal],
+        })
+
+    # Salary, rent and utilities once a month, when there is room for them
+    fixed = 3 * len(salaries) if count >= 6 * len(salaries) else 0
+    if fixed:
+        for month, salary in salaries.items():
+            year, month_no = int(month[:4]), int(month[5:])
+            first = date(year, month_no, 1).toordinal()
+            add(first, "salary", salary, "credit", "Salary")
+            add(first + int(rng.integers(0, 5)), "rent", round(salary * rng.uniform(0.25, 0.35), -2),
+                "debit", "Rent")
+            add(first + int(rng.integers(9, 15)), "utilities", round(salary * rng.uniform(0.02, 0.04), 2),
+                "debit", "Electricity & internet")
+
+    # Day-to-day spending
+    shares = np.array([share for share, _, _ in SPENDING.values()])
+    per_category = rng.multinomial(count - fixed, shares / shares.sum())
+    for (category, (_, median, _)), n in zip(SPENDING.items(), per_category):
+        if n == 0:
+            continue
+        ordinals = rng.choice(days.ordinals, size=n, p=days.day_weights[category])
+        amounts = np.round(rng.lognormal(np.log(median), 0.6, n), 2)
+        refunds = rng.random(n) < REFUND_RATE
+        merchants = rng.integers(0, len(MERCHANTS[category]), n)
+        for ordinal, amount, refund, merchant in zip(ordinals.tolist(), amounts.tolist(),
+                                                     refunds.tolist(), merchants.tolist()):
+            name = MERCHANTS[category][merchant]
+            add(ordinal, category, amount, "credit" if refund else "debit",
+                f"Refund: {name}" if refund else name)
+
+    rows.sort(key=lambda row: row["date_ordinal"])
+    return rows
+
+
+def user_goals(rng: np.random.Generator, user_id: str, salary: float):
+    """Zero to four savings goals sized against the user's salary."""
+    goals = []
+    for index in rng.choice(len(GOALS), size=int(rng.integers(0, 5)), replace=False).tolist():
+        name, icon = GOALS[index]
+        target = float(round(salary * rng.uniform(0.5, 12), -3))
+        goals.append(_goal_record(GoalInput(
+            user_id=user_id,
+            target_amount=target,
+            duration_months=int(rng.integers(6, 37)),
+            name=name,
+            icon=icon,
+            current_amount=float(round(target * rng.uniform(0, 0.8), -2)),
+        )))
+    return goals
+
+
+async def populate(repo, users: int, transactions: int, end_month: str, months: int = 12,
+                   seed: int = 7, batch_size: int = IMPORT_BATCH_SIZE, progress: bool = False):
+    """
+    Write a synthetic dataset through `repo`. Returns one dict per user:
+    {"id", "email", "transactions", "goal_ids"}.
+    """
+    rng = np.random.default_rng(seed)
+    month_list = month_range(end_month, months)
+    days = _Calendar(month_list)
+    counts = split_transactions(rng, transactions, users)
+    password_hash = await password_service.hash_password(PASSWORD)
+
+    created = []
+    batch = []
+    written = 0
+    started = time.monotonic()
+    for i, count in enumerate(counts.tolist()):
+        email = f"user{i:06d}@synthetic.example"
+        user_id = await repo.create_user({
+            "name": f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {i}",
+            "email": email,
+            "password_hash": password_hash,
+        })
+
+        salaries = monthly_salaries(rng, month_list)
+        writes = []
+        for month, salary in salaries.items():
+            writes.append(repo.set_salary(user_id, month, salary))
+            writes.append(repo.set_allocation(user_id, month, predict_budget_allocation(salary)))
+        await asyncio.gather(*writes)
+        goal_ids, _, _ = await repo.apply_goal_changes(
+            user_goals(rng, user_id, salaries[end_month]), {}, [])
+
+        for row in user_transactions(rng, user_id, count, salaries, days):
+            batch.append(row)
+            if len(batch) == batch_size:
+                await repo.add_transactions(batch)
+                written += len(batch)
+                batch = []
+
+        created.append({"id": user_id, "email": email, "transactions": count, "goal_ids": goal_ids})
+        if progress and (i + 1) % 100 == 0:
+            print(f"   {i + 1}/{users} users, {written} transactions ({written / (time.monotonic() - started):.0f}/s)")
+
+    if batch:
+        await repo.add_transactions(batch)
+    return created
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=100_000, help="Total transactions (1k to 10M)")
+    parser.add_argument("--users", type=int, help="Users (default: one per 1000 transactions)")
+    parser.add_argument("--months", type=int, default=12, help="Months of history")
+    parser.add_argument("--end-month", default=date.today().strftime("%Y-%m"),
+                        help="Last month of history, YYYY-MM (default: this month)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--allow-firestore", action="store_true",
+                        help="Allow writing to Firestore (every document is billed)")
+    args = parser.parse_args()
+
+    if STORAGE_BACKEND == "firestore" and not args.allow_firestore:
+        parser.error("STORAGE_BACKEND is firestore; set STORAGE_BACKEND=sqlite or pass --allow-firestore")
+
+    from database import repo
+
+    users = args.users or max(1, args.transactions // 1000)
+    started = time.monotonic()
+    try:
+        await populate(repo, users, args.transactions, args.end_month, args.months, args.seed, progress=True)
+    finally:
+        password_service.shutdown()
+    print(f"✅ {users} users, {args.transactions} transactions over {args.months} months "
+          f"in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
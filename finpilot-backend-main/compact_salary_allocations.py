@@ -0,0 +1,153 @@
+"""
+FinPilot Backend - One-off migration
+Collapses the random-ID salary and allocation records written before they
+were keyed by month into one "{user_id}_{YYYY-MM}" record each.
+
+For every (user, month) the latest salary (by created_at) is kept. Allocations
+carry no timestamp, so the one matching the kept salary's predicted allocation
+is preferred, falling back to any of them.
+
+Usage: python compact_salary_allocations.py [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+from config import STORAGE_BACKEND
+from database import repo
+from repositories.rollups import month_doc_id
+from services.ai_service import predict_budget_allocation
+
+BATCH_SIZE = 500  # Firestore limit per batch commit
+
+
+def _timestamp(value) -> float:
+    return value.timestamp() if value is not None else 0.0
+
+
+def pick_allocation(candidates, salary_amount):
+    """candidates: [(record_id, categories)]; returns the categories to keep."""
+    if salary_amount is not None:
+        expected = predict_budget_allocation(salary_amount)
+        for _, categories in candidates:
+            if categories == expected:
+                return categories
+    return candidates[-1][1]
+
+
+async def compact_firestore(dry_run: bool):
+    db = repo.db
+    salaries = {}
+    async for doc in db.collection("salaries").stream():
+        s = doc.to_dict()
+        salaries.setdefault((s["user_id"], s["month"]), []).append((doc.id, s))
+    allocations = {}
+    async for doc in db.collection("allocations").stream():
+        a = doc.to_dict()
+        allocations.setdefault((a["user_id"], a["month"]), []).append((doc.id, a.get("categories", {})))
+
+    batch = db.batch()
+    pending = 0
+    removed = 0
+
+    async def write(op, *args):
+        nonlocal batch, pending
+        if dry_run:
+            return
+        getattr(batch, op)(*args)
+        pending += 1
+        if pending == BATCH_SIZE:
+            await batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    kept_salary = {}
+    for key, records in salaries.items():
+        doc_id = month_doc_id(*key)
+        # Records from before the switch have a created_at; the keyed one (if any) is newest
+        records.sort(key=lambda r: (r[0] == doc_id, _timestamp(r[1].get("created_at"))))
+        latest = records[-1][1]
+        kept_salary[key] = latest.get("amount")
+        if records[-1][0] != doc_id:
+            await write("set", db.collection("salaries").document(doc_id), latest)
+        for record_id, _ in records:
+            if record_id != doc_id:
+                await write("delete", db.collection("salaries").document(record_id))
+                removed += 1
+
+    for key, records in allocations.items():
+        doc_id = month_doc_id(*key)
+        keyed = [r for r in records if r[0] == doc_id]
+        categories = keyed[0][1] if keyed else pick_allocation(records, kept_salary.get(key))
+        if not keyed:
+            await write("set", db.collection("allocations").document(doc_id), {
+                "user_id": key[0], "month": key[1], "categories": categories,
+            })
+        for record_id, _ in records:
+            if record_id != doc_id:
+                await write("delete", db.collection("allocations").document(record_id))
+                removed += 1
+
+    if pending:
+        await batch.commit()
+    return len(salaries), len(allocations), removed
+
+
+def compact_sqlite(dry_run: bool):
+    conn = repo.conn
+    with conn:
+        salaries = {}
+        for row in conn.execute("SELECT rowid, * FROM salaries ORDER BY rowid"):
+            salaries.setdefault((row["user_id"], row["month"]), []).append(dict(row))
+        allocations = {}
+        for row in conn.execute("SELECT rowid, * FROM allocations ORDER BY rowid"):
+            allocations.setdefault((row["user_id"], row["month"]), []).append(
+                (row["id"], json.loads(row["categories"])))
+
+        removed = 0
+        kept_salary = {}
+        for key, rows in salaries.items():
+            doc_id = month_doc_id(*key)
+            keyed = [r for r in rows if r["id"] == doc_id]
+            latest = keyed[0] if keyed else rows[-1]  # rowid order is insertion order
+            kept_salary[key] = latest["amount"]
+            removed += len(rows) - len(keyed)
+            if dry_run:
+                continue
+            conn.execute("DELETE FROM salaries WHERE user_id = ? AND month = ?", key)
+            conn.execute(
+                "INSERT INTO salaries (id, user_id, month, amount, created_at) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, *key, latest["amount"], latest["created_at"]),
+            )
+
+        for key, records in allocations.items():
+            doc_id = month_doc_id(*key)
+            keyed = [r for r in records if r[0] == doc_id]
+            categories = keyed[0][1] if keyed else pick_allocation(records, kept_salary.get(key))
+            removed += len(records) - len(keyed)
+            if dry_run:
+                continue
+            conn.execute("DELETE FROM allocations WHERE user_id = ? AND month = ?", key)
+            conn.execute(
+                "INSERT INTO allocations (id, user_id, month, categories) VALUES (?, ?, ?, ?)",
+                (doc_id, *key, json.dumps(categories)),
+            )
+    return len(salaries), len(allocations), removed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    if STORAGE_BACKEND == "firestore":
+        months, allocation_months, removed = await compact_firestore(args.dry_run)
+    else:
+        months, allocation_months, removed = await repo._run(compact_sqlite, args.dry_run)
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"✅ {months} salary months, {allocation_months} allocation months. "
+          f"{verb} {removed} duplicate or legacy records.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
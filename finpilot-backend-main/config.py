@@ -5,4 +5,33 @@ load_dotenv()
 
 # In a real app, use os.getenv("FIREBASE_CREDENTIALS_PATH")
 # For this hackathon setup, we assume the file is in the root
-CREDENTIALS_PATH = "serviceAccountKey.json"
\ No newline at end of file
+CREDENTIALS_PATH = "serviceAccountKey.json"
+
+# Storage backend: "firestore" (default) or "sqlite" for local / on-prem runs
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "finpilot.db")
+
+# Password hashing: bcrypt work factor and the process pool it runs on.
+# Raising BCRYPT_ROUNDS upgrades existing hashes on each user's next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Hash/verify jobs allowed to wait or run at once before auth requests get a 503
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+
+# While precompute_wrapped.py is running for a closed month, answer a missing
+# Wrapped snapshot of that month with a 503 instead of a live computation
+WRAPPED_PRECOMPUTED_ONLY = os.getenv("WRAPPED_PRECOMPUTED_ONLY", "false").lower() in ("1", "true", "yes")
+
+# Conditional GETs: how long a user's data version read from storage is
+# trusted before it is read again. Writes made through this process update it
+# immediately, but with several workers or instances this is how long one can
+# answer 304 for data another has changed. The default (0) reads it on every
+# request; raise it only for a single-process deploy.
+DATA_VERSION_CACHE_SECONDS = float(os.getenv("DATA_VERSION_CACHE_SECONDS", "0"))
+
+# Budget allocation and spend forecasts: how long a user's spending model,
+# built from their rollups, is reused before it is rebuilt. Transactions
+# written through this process update it immediately; this bounds how long
+# writes made through other workers or instances go unseen by POST /salary
+# and GET /dashboard/forecast.
+BUDGET_MODEL_CACHE_SECONDS = float(os.getenv("BUDGET_MODEL_CACHE_SECONDS", "3600"))
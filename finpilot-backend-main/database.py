@@ -1,46 +1,195 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from config import CREDENTIALS_PATH
+"""
+The storage repository every service talks to, created on first use.
+
+Importing this module is cheap: `repo` is a stand-in that builds the real
+repository (and imports firebase_admin / the gRPC stack, for Firestore) the
+first time one of its methods is looked up. The app's lifespan starts that
+in the background at startup with provider.start_warm_up(), which also makes
+one round trip so the first request finds the connection open; /ready
+reports when it has. Calls made before the repository exists wait for its
+creation on a worker thread, never on the event loop.
+"""
+import asyncio
+import inspect
 import os
-import sys
-
-# Check if credentials file exists
-if not os.path.exists(CREDENTIALS_PATH):
-    print("\n" + "="*70)
-    print("❌ FIREBASE CREDENTIALS NOT FOUND!")
-    print("="*70)
-    print(f"\n📁 Expected file: {CREDENTIALS_PATH}")
-    print("\n🔧 How to fix this:")
-    print("   1. Go to https://console.firebase.google.com/")
-    print("   2. Select your project (or create a new one)")
-    print("   3. Enable Firestore Database")
-    print("   4. Go to Project Settings → Service Accounts")
-    print("   5. Click 'Generate new private key'")
-    print("   6. Save the JSON file as 'serviceAccountKey.json'")
-    print(f"   7. Place it in: {os.path.dirname(os.path.abspath(__file__))}")
-    print("\n💡 Tip: Run 'python setup_helper.py' for guided setup")
-    print("="*70 + "\n")
-    sys.exit(1)
-
-# Initialize Firebase Admin SDK
-try:
-    if not firebase_admin._apps:
-        cred = credentials.Certificate(CREDENTIALS_PATH)
-        firebase_admin.initialize_app(cred)
+import threading
+import time
+from typing import Optional
+from config import CREDENTIALS_PATH, STORAGE_BACKEND, SQLITE_PATH
+from repositories.base import Repository
+
+
+# A warm-up round trip taking longer than this is abandoned (and retried by /ready)
+WARM_UP_TIMEOUT_SECONDS = 30
+# After a failed attempt to create the repository, callers get the same error
+# for this long before it is tried again
+RETRY_SECONDS = 10
+
+
+class StorageUnavailable(Exception):
+    """The storage backend could not be initialized."""
+
+
+def _connect_firestore():
+    import firebase_admin
+    from firebase_admin import credentials, firestore_async
+
+    # Check if credentials file exists
+    if not os.path.exists(CREDENTIALS_PATH):
+        print("\n" + "="*70)
+        print("❌ FIREBASE CREDENTIALS NOT FOUND!")
+        print("="*70)
+        print(f"\n📁 Expected file: {CREDENTIALS_PATH}")
+        print("\n🔧 How to fix this:")
+        print("   1. Go to https://console.firebase.google.com/")
+        print("   2. Select your project (or create a new one)")
+        print("   3. Enable Firestore Database")
+        print("   4. Go to Project Settings → Service Accounts")
+        print("   5. Click 'Generate new private key'")
+        print("   6. Save the JSON file as 'serviceAccountKey.json'")
+        print(f"   7. Place it in: {os.path.dirname(os.path.abspath(__file__))}")
+        print("\n💡 Tip: Run 'python setup_helper.py' for guided setup")
+        print("="*70 + "\n")
+        raise StorageUnavailable(f"Firebase credentials not found at {CREDENTIALS_PATH}")
+
+    # Initialize Firebase Admin SDK
+    try:
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(CREDENTIALS_PATH)
+            firebase_admin.initialize_app(cred)
     
-    # Export the Firestore client
-    db = firestore.client()
-    print("✅ Firebase connected successfully!")
+        db = firestore_async.client()
+        print("✅ Firebase connected successfully!")
+        return db
     
-except Exception as e:
-    print("\n" + "="*70)
-    print("❌ FIREBASE INITIALIZATION FAILED!")
-    print("="*70)
-    print(f"\nError: {str(e)}")
-    print("\n🔧 Possible issues:")
-    print("   - Invalid service account key file")
-    print("   - Firestore not enabled in Firebase Console")
-    print("   - Network connectivity issues")
-    print("\n💡 Tip: Check your Firebase project settings")
-    print("="*70 + "\n")
-    sys.exit(1)
\ No newline at end of file
+    except Exception as e:
+        print("\n" + "="*70)
+        print("❌ FIREBASE INITIALIZATION FAILED!")
+        print("="*70)
+        print(f"\nError: {str(e)}")
+        print("\n🔧 Possible issues:")
+        print("   - Invalid service account key file")
+        print("   - Firestore not enabled in Firebase Console")
+        print("   - Network connectivity issues")
+        print("\n💡 Tip: Check your Firebase project settings")
+        print("="*70 + "\n")
+        raise StorageUnavailable(f"Firebase initialization failed: {e}") from e
+
+
+def _create_repository():
+    if STORAGE_BACKEND == "sqlite":
+        from repositories.sqlite_repo import SQLiteRepository
+        repository = SQLiteRepository(SQLITE_PATH)
+        print(f"✅ SQLite storage ready at {SQLITE_PATH}")
+        return repository
+    from repositories.firestore_repo import FirestoreRepository
+    return FirestoreRepository(_connect_firestore())
+
+
+class RepositoryProvider:
+    """Creates the repository once, on whichever thread asks first."""
+
+    def __init__(self):
+        self._repository = None
+        self._lock = threading.Lock()
+        self._failed_at: Optional[float] = None
+        self._warm_up: Optional[asyncio.Task] = None
+        self._creating: Optional[asyncio.Future] = None
+        self.warm = False
+        self.error: Optional[str] = None
+        self.warm_up_seconds: Optional[float] = None
+
+    @property
+    def repository(self):
+        """The repository if it has been created, else None."""
+        return self._repository
+
+    def get(self):
+        if self._repository is None:
+            with self._lock:
+                if self._repository is None:
+                    if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_SECONDS:
+                        raise StorageUnavailable(self.error)
+                    try:
+                        self._repository = _create_repository()
+                    except Exception as e:
+                        self._failed_at = time.monotonic()
+                        self.error = str(e)
+                        raise
+        return self._repository
+
+    async def create(self):
+        """
+        get() for coroutines. The imports and client creation are blocking,
+        so they run on a worker thread, shared by every caller waiting at once.
+        """
+        if self._repository is None:
+            if self._creating is None or self._creating.done():
+                self._creating = asyncio.ensure_future(asyncio.to_thread(self.get))
+            await asyncio.shield(self._creating)
+        return self._repository
+
+    async def _warm(self):
+        started = time.perf_counter()
+        try:
+            repository = await self.create()
+            await asyncio.wait_for(repository.warm_up(), WARM_UP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.error = f"warm-up timed out after {WARM_UP_TIMEOUT_SECONDS}s"
+            print(f"⚠️  Storage {self.error}")
+            return
+        except StorageUnavailable:
+            return
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"⚠️  Storage warm-up failed: {self.error}")
+            return
+        self.warm_up_seconds = time.perf_counter() - started
+        self.error = None
+        self.warm = True
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Start warming up in the background, unless it is running or done; a failed attempt is retried."""
+        if self._warm_up is None or (self._warm_up.done() and not self.warm):
+            self._warm_up = asyncio.create_task(self._warm())
+        return self._warm_up
+
+
+class LazyRepository:
+    """Stands in for the repository; the first method call creates it."""
+
+    def __init__(self, provider: RepositoryProvider):
+        self._provider = provider
+
+    def __getattr__(self, name):
+        repository = self._provider.repository
+        if repository is None:
+            deferred = self._deferred(name)
+            if deferred is not None:
+                return deferred
+            # Backend attributes (db, conn, _run) used by the maintenance scripts
+            repository = self._provider.get()
+        value = getattr(repository, name)
+        # Later lookups of the same method skip __getattr__ entirely
+        setattr(self, name, value)
+        return value
+
+    def _deferred(self, name):
+        # For a Repository method, a stand-in of the same kind (coroutine or
+        # async generator) that waits for the repository, then calls it
+        member = getattr(Repository, name, None)
+        if inspect.iscoroutinefunction(member):
+            async def call(*args, **kwargs):
+                return await getattr(await self._provider.create(), name)(*args, **kwargs)
+        elif getattr(member, "__isabstractmethod__", False):
+            # The interface declares its async iterators as plain methods
+            async def call(*args, **kwargs):
+                async for item in getattr(await self._provider.create(), name)(*args, **kwargs):
+                    yield item
+        else:
+            return None
+        return call
+
+
+provider = RepositoryProvider()
+repo = LazyRepository(provider)
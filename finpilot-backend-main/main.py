@@ -1,8 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import salary, dashboard, goals, auth, wrapped
+from compression import CompressionMiddleware
+from config import STORAGE_BACKEND
+from database import provider
+from metrics import MetricsMiddleware, metrics_endpoint
+from responses import FastJSONResponse
+from routers import salary, dashboard, goals, auth, wrapped, events
+from services import password_service
 
-app = FastAPI(title="Finance AI Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect to storage in the background: requests are served meanwhile
+    # (the first ones wait for the connection) and /ready reports progress
+    warm_up = provider.start_warm_up()
+    yield
+    warm_up.cancel()
+    password_service.shutdown()
+
+app = FastAPI(title="Finance AI Backend", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # CORS Setup (Allowing all for hackathon convenience)
 app.add_middleware(
@@ -11,7 +27,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
+# Added last so it wraps everything, CORS preflights included
+app.add_middleware(MetricsMiddleware)
 
 # Include Routers
 app.include_router(auth.router)
@@ -19,11 +39,30 @@ app.include_router(salary.router)
 app.include_router(dashboard.router)
 app.include_router(goals.router)
 app.include_router(wrapped.router)
+app.include_router(events.router)
+
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Finance AI Backend is running"}
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness: 200 once the storage backend is connected and has answered a
+    round trip, 503 until then. Also starts (or retries) the warm-up, for
+    platforms that do not run the lifespan.
+    """
+    provider.start_warm_up()
+    status = {"storage": STORAGE_BACKEND, "warm": provider.warm}
+    if provider.warm:
+        status["warm_up_seconds"] = round(provider.warm_up_seconds, 3)
+        return status
+    if provider.error:
+        status["error"] = provider.error
+    return FastJSONResponse(status, status_code=503)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Prometheus metrics, exported at /metrics.
+
+    http_requests_total{method, route, status}
+    http_request_duration_seconds{method, route}
+    storage_queries_per_request{method, route}
+    storage_documents_read_per_request{method, route}
+    storage_documents_written_per_request{method, route}
+    sse_subscribers
+
+`route` is the path template ("/savings/goal/{goal_id}"), so label
+cardinality stays bounded; unmatched paths share "unmatched". The storage
+histograms come from repositories.usage; their _sum series are the
+per-endpoint totals. An /events stream is observed once, when it closes, so
+its duration is the connection's lifetime.
+
+Written as plain ASGI middleware rather than BaseHTTPMiddleware so that
+streamed responses are timed and counted until their last chunk.
+Counters live in this process; with several uvicorn workers each one
+exports its own.
+"""
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+from repositories import usage
+from services import events_service
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DOCUMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests served", ["method", "route", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to send the full response",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    "storage_queries_per_request", "Storage queries run per request",
+    ["method", "route"], buckets=DOCUMENT_BUCKETS,
+)
+READS = Histogram(
+    "storage_documents_read_per_request", "Documents read per request (as Firestore bills them)",
+    ["method", "route"], buckets=DOCUMENT_BUCKETS,
+)
+WRITES = Histogram(
+    "storage_documents_written_per_request", "Documents written per request",
+    ["method", "route"], buckets=DOCUMENT_BUCKETS,
+)
+SUBSCRIBERS = Gauge("sse_subscribers", "Open /events streams")
+SUBSCRIBERS.set_function(events_service.subscriber_count)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        counts = usage.track()
+
+        async def send_and_capture(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            REQUESTS.labels(*labels, str(status)).inc()
+            LATENCY.labels(*labels).observe(time.perf_counter() - started)
+            QUERIES.labels(*labels).observe(counts.queries)
+            READS.labels(*labels).observe(counts.reads)
+            WRITES.labels(*labels).observe(counts.writes)
+
+
+async def metrics_endpoint():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
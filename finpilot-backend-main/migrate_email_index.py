@@ -0,0 +1,53 @@
+"""
+FinPilot Backend - One-off migration
+Points the email lookup that registration and login use at every existing
+user (on Firestore, the user_emails index documents: normalized email ->
+user) and normalizes the email stored on each user.
+Users sharing an email after normalization are reported and left unindexed.
+
+Usage: python migrate_email_index.py
+"""
+import asyncio
+from database import repo
+from repositories.base import AlreadyExists, NotFound
+from services.auth_service import normalize_email
+
+# Users indexed at once; each is its own small transaction
+CONCURRENCY = 50
+
+
+async def main():
+    indexed = 0
+    duplicates = []
+
+    async def index(user_id):
+        nonlocal indexed
+        user = await repo.get_user(user_id)
+        if user is None:
+            return  # Deleted since it was listed
+        email = normalize_email(user.get("email", ""))
+        try:
+            await repo.index_user_email(user_id, email)
+        except AlreadyExists:
+            kept = await repo.find_user_by_email(email)
+            duplicates.append((email, kept["id"] if kept else "another user", user_id))
+        except NotFound:
+            return
+        else:
+            indexed += 1
+
+    chunk = []
+    async for user_id in repo.list_user_ids():
+        chunk.append(user_id)
+        if len(chunk) == CONCURRENCY:
+            await asyncio.gather(*(index(uid) for uid in chunk))
+            chunk = []
+    await asyncio.gather(*(index(uid) for uid in chunk))
+
+    for email, kept, skipped in duplicates:
+        print(f"⚠️  {email} is used by {kept} and {skipped}; only {kept} can log in")
+    print(f"✅ Indexed {indexed} users ({len(duplicates)} duplicate emails)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
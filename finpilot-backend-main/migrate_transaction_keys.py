@@ -0,0 +1,54 @@
+"""
+FinPilot Backend - One-off migration
+Adds the "month" and "date_ordinal" index keys to Firestore transactions
+written before they were stored at write time.
+
+Usage: python migrate_transaction_keys.py
+"""
+import asyncio
+from config import STORAGE_BACKEND
+from database import repo
+from services.finance_service import transaction_keys
+
+BATCH_SIZE = 500  # Firestore limit per batch commit
+
+
+async def main():
+    if STORAGE_BACKEND != "firestore":
+        print("Nothing to migrate: the SQLite backend stores index keys from the start.")
+        return
+
+    db = repo.db
+    batch = db.batch()
+    pending = 0
+    updated = 0
+    skipped = 0
+
+    async for doc in db.collection("transactions").stream():
+        t = doc.to_dict()
+        if "date_ordinal" in t and "month" in t:
+            continue
+        try:
+            keys = transaction_keys(t.get("date", ""))
+        except ValueError as e:
+            print(f"⚠️  Skipping {doc.id}: {e}")
+            skipped += 1
+            continue
+
+        batch.update(doc.reference, keys)
+        pending += 1
+        if pending == BATCH_SIZE:
+            await batch.commit()
+            updated += pending
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        await batch.commit()
+        updated += pending
+
+    print(f"✅ Migrated {updated} transactions ({skipped} skipped)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""
+FinPilot Backend - Month-end Wrapped precompute
+Computes every user's Wrapped summary for a month that has ended and stores
+it as that month's snapshot, so on launch day /wrapped/summary only reads it
+(with WRAPPED_PRECOMPUTED_ONLY=true the API answers a miss with a 503 while
+this runs, rather than computing it live).
+
+User IDs are streamed in ID order and handed to a pool of worker processes
+in chunks. After each chunk the last user ID below which every chunk has
+finished is written to a checkpoint file; a run that crashed resumes from
+there. Users that already have a snapshot are skipped unless --force, and so
+are users whose month a write invalidated while it was being computed.
+--concurrency caps the users being computed at once across all workers, each
+one a handful of reads and a single write, to stay inside Firestore quotas.
+
+Usage:
+    python precompute_wrapped.py                    # the month that just ended
+    python precompute_wrapped.py --month 2026-09
+    python precompute_wrapped.py --workers 4 --concurrency 32
+    python precompute_wrapped.py --restart          # ignore the checkpoint
+    python precompute_wrapped.py --force            # recompute existing snapshots
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from database import repo
+from services.wrapped_service import precompute_wrapped_summary
+
+CHUNK_SIZE = 100
+
+# ── Worker processes ──
+# Each worker keeps one event loop for its lifetime: the async Firestore
+# client binds its channel to the loop it is first used on.
+_loop = None
+
+
+def _init_worker():
+    global _loop
+    _loop = asyncio.new_event_loop()
+
+
+async def _precompute_chunk(user_ids, year, month, concurrency, force):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def precompute(user_id):
+        async with limit:
+            return await precompute_wrapped_summary(user_id, year, month, force)
+
+    results = await asyncio.gather(*(precompute(uid) for uid in user_ids), return_exceptions=True)
+    computed = skipped = 0
+    failed = {}
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, Exception):
+            failed[user_id] = f"{type(result).__name__}: {result}"
+        elif result:
+            computed += 1
+        else:
+            skipped += 1
+    return computed, skipped, failed
+
+
+def _run_chunk(user_ids, year, month, concurrency, force):
+    return _loop.run_until_complete(_precompute_chunk(user_ids, year, month, concurrency, force))
+
+
+# ── Checkpoint ──
+def _load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"last_user_id": None, "computed": 0, "skipped": 0, "failed": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _closed_month(value):
+    if value is None:
+        today = date.today()
+        return (today.year - 1, 12) if today.month == 1 else (today.year, today.month - 1)
+    try:
+        year, month = (int(part) for part in value.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+    if (year, month) >= (date.today().year, date.today().month):
+        raise argparse.ArgumentTypeError(f"{value} has not ended yet")
+    return year, month
+
+
+async def _chunks(after):
+    chunk = []
+    async for user_id in repo.list_user_ids(after=after):
+        chunk.append(user_id)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--month", type=_closed_month, default=_closed_month(None),
+                        help="Month to precompute, YYYY-MM (default: last month)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Users computed at once across all workers")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: precompute_wrapped_YYYY-MM.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    parser.add_argument("--force", action="store_true", help="Recompute users that already have a snapshot")
+    args = parser.parse_args()
+
+    year, month = args.month
+    month_key = f"{year}-{str(month).zfill(2)}"
+    path = args.checkpoint or f"precompute_wrapped_{month_key}.json"
+    checkpoint = {"last_user_id": None, "computed": 0, "skipped": 0, "failed": {}} \
+        if args.restart else _load_checkpoint(path)
+    if checkpoint["last_user_id"] is not None:
+        print(f"↪️  Resuming {month_key} after user {checkpoint['last_user_id']}")
+
+    workers = max(1, min(args.workers, args.concurrency))
+    per_worker = max(1, args.concurrency // workers)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    loop = asyncio.get_running_loop()
+
+    # Chunks finish out of order; the checkpoint only moves past a chunk once
+    # every chunk streamed before it has finished too
+    in_flight = {}  # future -> (chunk number, last user ID, size)
+    finished = {}   # chunk number -> last user ID, waiting for earlier chunks
+    next_to_checkpoint = 0
+    processed = 0
+    started = time.monotonic()
+    # Tells the API (WRAPPED_PRECOMPUTED_ONLY) to hold off computing the month live
+    await repo.set_precompute_heartbeat(month_key, time.time())
+
+    async def collect(return_when):
+        nonlocal next_to_checkpoint, processed
+        done, _ = await asyncio.wait(in_flight, return_when=return_when)
+        for future in done:
+            number, last_user_id, size = in_flight.pop(future)
+            computed, skipped, failed = future.result()
+            checkpoint["computed"] += computed
+            checkpoint["skipped"] += skipped
+            checkpoint["failed"].update(failed)
+            processed += size
+            finished[number] = last_user_id
+        while next_to_checkpoint in finished:
+            checkpoint["last_user_id"] = finished.pop(next_to_checkpoint)
+            next_to_checkpoint += 1
+        _save_checkpoint(path, checkpoint)
+        await repo.set_precompute_heartbeat(month_key, time.time())
+        rate = processed / max(time.monotonic() - started, 1e-9)
+        print(f"   {processed} users this run | {checkpoint['computed']} computed, "
+              f"{checkpoint['skipped']} skipped, {len(checkpoint['failed'])} failed | {rate:.1f} users/s")
+
+    try:
+        number = 0
+        async for chunk in _chunks(checkpoint["last_user_id"]):
+            # Keep every worker busy with one chunk queued behind it, no more
+            if len(in_flight) >= workers * 2:
+                await collect(asyncio.FIRST_COMPLETED)
+            future = loop.run_in_executor(pool, _run_chunk, chunk, year, month, per_worker, args.force)
+            in_flight[future] = (number, chunk[-1], len(chunk))
+            number += 1
+        while in_flight:
+            await collect(asyncio.FIRST_COMPLETED)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        await repo.set_precompute_heartbeat(month_key, None)
+
+    for user_id, error in checkpoint["failed"].items():
+        print(f"⚠️  {user_id}: {error}")
+    print(f"✅ {month_key}: {checkpoint['computed']} recaps computed, {checkpoint['skipped']} already stored, "
+          f"{len(checkpoint['failed'])} failed")
+    if checkpoint["failed"]:
+        print("   Re-run with --restart to retry failed users; stored recaps are skipped")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+FinPilot Backend - Rebuild monthly rollups
+Recomputes every per-user monthly rollup from raw transactions, reports the
+months whose stored rollup disagrees, and overwrites them.
+
+Usage:
+    python rebuild_rollups.py                 # all users
+    python rebuild_rollups.py --user USER_ID  # a single user
+    python rebuild_rollups.py --verify-only   # report mismatches, write nothing
+"""
+import argparse
+import asyncio
+import math
+from database import repo
+from repositories.rollups import build_rollups
+from services import version_service
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) \
+            and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def _biggest_amount(rollup):
+    biggest = rollup.get("biggest_debit")
+    return biggest["amount"] if biggest else None
+
+
+async def rebuild_user(user_id: str, verify_only: bool = False):
+    """Returns (months checked, months that did not match)."""
+    rebuilt = build_rollups(user_id, await repo.list_transactions(user_id))
+    mismatched = 0
+    for month, rollup in sorted(rebuilt.items()):
+        stored = await repo.get_rollup(user_id, month)
+        # Ties on the biggest debit may resolve to a different transaction; compare amounts only
+        matches = stored is not None \
+            and _same({**stored, "biggest_debit": None}, {**rollup, "biggest_debit": None}) \
+            and _same(_biggest_amount(stored), _biggest_amount(rollup))
+        if matches:
+            continue
+        mismatched += 1
+        print(f"⚠️  {user_id} {month}: stored rollup {'missing' if stored is None else 'differs'}")
+        if not verify_only:
+            await repo.save_rollup(rollup)
+    if mismatched and not verify_only:
+        # Dashboards read rollups; responses cached against the old ones are stale
+        await version_service.bump(user_id)
+    return len(rebuilt), mismatched
+
+
+async def _user_ids(user_id):
+    if user_id:
+        yield user_id
+        return
+    async for uid in repo.list_user_ids():
+        yield uid
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild monthly rollups from raw transactions")
+    parser.add_argument("--user", help="Only rebuild this user ID")
+    parser.add_argument("--verify-only", action="store_true", help="Report mismatches without writing")
+    args = parser.parse_args()
+
+    users = months = mismatched = 0
+    async for user_id in _user_ids(args.user):
+        checked, bad = await rebuild_user(user_id, args.verify_only)
+        users += 1
+        months += checked
+        mismatched += bad
+
+    action = "found" if args.verify_only else "rebuilt"
+    print(f"✅ Checked {months} months for {users} users, {action} {mismatched} mismatched rollups")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,237 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+
+class AlreadyExists(Exception):
+    """A record with the same unique key is already stored."""
+
+
+class NotFound(Exception):
+    """A record the operation requires does not exist."""
+
+
+class TransactionRecord(NamedTuple):
+    """The fields aggregations read from a transaction, and nothing else."""
+    amount: Optional[float]
+    type: Optional[str]
+    category: Optional[str]
+    date_ordinal: int
+    description: Optional[str]
+
+
+class WrappedSnapshot(NamedTuple):
+    """
+    A stored Wrapped summary (None if there is none) and the generation of
+    its slot, which every invalidation of the month advances.
+    """
+    summary: Optional[dict]
+    generation: int
+
+
+class Repository(ABC):
+    """
+    Storage interface used by every service. All methods are coroutines so
+    request handlers never block the event loop on I/O.
+
+    Records are returned as plain dicts with the document/row ID under "id",
+    the same shape the services used to build with {**doc.to_dict(), "id": doc.id}.
+    """
+
+    # ── Users ──
+    @abstractmethod
+    async def create_user(self, data: dict) -> str:
+        """
+        Store a new user and return its ID. data["email"] is already normalized
+        and is claimed in the same atomic write; raises AlreadyExists if another
+        user holds it.
+        """
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        """Fetch a user by ID, or None if it does not exist."""
+
+    @abstractmethod
+    async def find_user_by_email(self, email: str) -> Optional[dict]:
+        """Fetch the user registered with this normalized email with one point read, or None."""
+
+    @abstractmethod
+    async def update_user(self, user_id: str, fields: dict) -> None:
+        """Update the given fields of an existing user."""
+
+    @abstractmethod
+    async def index_user_email(self, user_id: str, email: str) -> None:
+        """
+        Store the normalized `email` on an existing user and make
+        find_user_by_email return them for it (migrate_email_index.py).
+        Raises AlreadyExists if another user holds the email, NotFound if
+        the user does not exist.
+        """
+
+    @abstractmethod
+    def list_user_ids(self, after: Optional[str] = None) -> AsyncIterator[str]:
+        """Iterate over the IDs of all users in ID order, starting after `after` (an async generator)."""
+
+    # ── Salaries ──
+    # Stored under month_doc_id(user_id, month), so setting a month again
+    # replaces it and reads are direct key lookups.
+    @abstractmethod
+    async def set_salary(self, user_id: str, month: str, amount: float) -> None:
+        """Set (insert or replace) the salary for a month ("YYYY-MM")."""
+
+    @abstractmethod
+    async def get_salaries(self, user_id: str, months: List[str]) -> Dict[str, float]:
+        """{month: amount} for the given months that have a salary, in one batched read."""
+
+    # ── Allocations ──
+    @abstractmethod
+    async def set_allocation(self, user_id: str, month: str, categories: Dict[str, float]) -> None:
+        """Set (insert or replace) the category allocation for a month."""
+
+    @abstractmethod
+    async def get_allocation(self, user_id: str, month: str) -> Dict[str, float]:
+        """Category allocation for the month, or an empty dict."""
+
+    # ── Transactions ──
+    async def add_transaction(self, data: dict) -> str:
+        """
+        Store a transaction and return its ID.
+        `data` carries the "month" and "date_ordinal" index keys set by the service.
+        The month's rollup (see repositories/rollups.py) is updated in the same atomic write.
+        """
+        return (await self.add_transactions([data]))[0]
+
+    @abstractmethod
+    async def add_transactions(self, rows: List[dict]) -> List[str]:
+        """
+        Store a group of transactions and fold them into their monthly rollups
+        in one atomic commit. Returns the new IDs in input order.
+        """
+
+    @abstractmethod
+    async def list_transactions(self, user_id: str, category: Optional[str] = None) -> List[dict]:
+        """All transactions of a user, optionally restricted to one category."""
+
+    @abstractmethod
+    async def page_transactions(
+        self,
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[int, str]] = None,
+        category: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Up to `limit` transactions, newest first, ordered by (date_ordinal, id)
+        descending. `after` is the (date_ordinal, id) of the last row of the
+        previous page.
+        """
+
+    @abstractmethod
+    async def list_transaction_records_between(self, user_id: str, start: date, end: date) -> List[tuple]:
+        """
+        Transactions dated in [start, end), read through the date_ordinal
+        index and projected to the TransactionRecord fields (missing ones are
+        None), one tuple per transaction in that order. Firestore returns TransactionRecords; SQLite returns the plain
+        tuples its C-level fetch already builds, which index the same way.
+        """
+
+    @abstractmethod
+    async def month_totals(self, user_id: str, month: str) -> Dict[str, Dict[str, float]]:
+        """Sum of amounts for a month ("YYYY-MM") grouped as {type: {category: total}}."""
+
+    # ── Monthly rollups ──
+    @abstractmethod
+    async def get_rollup(self, user_id: str, month: str) -> Optional[dict]:
+        """Rollup document for a user's month, or None if nothing was recorded."""
+
+    @abstractmethod
+    async def get_debit_totals(self, user_id: str, months: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        {month: {category: debit total}} from the rollups of the given months
+        that have one, in one batched read of just that field.
+        """
+
+    @abstractmethod
+    async def get_category_daily_spend(self, user_id: str, months: List[str]) -> Dict[str, Dict[str, List[float]]]:
+        """
+        {month: {category: 31 daily debit totals}} like get_debit_totals;
+        months whose rollup predates the field are left out.
+        """
+
+    @abstractmethod
+    async def save_rollup(self, rollup: dict) -> None:
+        """Overwrite a rollup document (used by rebuild_rollups.py)."""
+
+    # ── Wrapped snapshots ──
+    @abstractmethod
+    async def get_wrapped_snapshot(self, user_id: str, month: str) -> WrappedSnapshot:
+        """Frozen Wrapped summary for a closed month (None if there is none) and its generation."""
+
+    @abstractmethod
+    async def save_wrapped_snapshot(self, user_id: str, month: str, summary: dict, generation: int) -> bool:
+        """
+        Store the Wrapped summary computed for a closed month, unless the
+        month was invalidated since `generation` was read: a summary computed
+        before a backdated write must not outlive it. Returns whether it was stored.
+        """
+
+    @abstractmethod
+    async def delete_wrapped_snapshots(self, user_id: str, months: List[str]) -> None:
+        """Drop the snapshots of the given months and advance their generations."""
+
+    # ── Wrapped precompute runs ──
+    @abstractmethod
+    async def get_precompute_heartbeat(self, month: str) -> Optional[float]:
+        """Unix time a precompute_wrapped.py run for `month` last reported progress, or None."""
+
+    @abstractmethod
+    async def set_precompute_heartbeat(self, month: str, at: Optional[float]) -> None:
+        """Record that the month's precompute run is alive at `at`; None marks it finished."""
+
+    # ── Savings goals ──
+    @abstractmethod
+    async def create_goal(self, data: dict) -> str:
+        """Store a savings goal and return its ID."""
+
+    @abstractmethod
+    async def list_goals(self, user_id: str) -> List[dict]:
+        """All savings goals of a user."""
+
+    @abstractmethod
+    async def apply_goal_changes(
+        self,
+        creates: List[dict],
+        increments: Dict[str, float],
+        deletes: List[str],
+    ) -> Tuple[List[str], Dict[str, float], Dict[str, str]]:
+        """
+        Create goals, add amounts to goals' current_amount and delete goals in
+        one atomic commit. current_amount is clamped to target_amount within
+        that commit (in the UPDATE on SQLite, by a read-modify-write
+        transaction on Firestore), so concurrent contributions never
+        overwrite each other and no value over the target is ever stored.
+
+        Returns (new goal IDs in input order, {goal_id: new current_amount},
+        {goal_id: user_id} of the incremented and deleted goals).
+        Raises NotFound, applying nothing, if an incremented or deleted goal
+        does not exist.
+        """
+
+    # ── Data versions ──
+    # A per-user counter bumped after every write to the user's data; GET
+    # endpoints derive their ETags from it.
+    @abstractmethod
+    async def get_data_version(self, user_id: str) -> int:
+        """The user's current data version (0 if never bumped)."""
+
+    @abstractmethod
+    async def bump_data_version(self, user_id: str) -> int:
+        """Atomically increment the user's data version and return the new value."""
+
+    # ── Lifecycle ──
+    @abstractmethod
+    async def warm_up(self) -> None:
+        """
+        One cheap round trip, so connection setup (channel, credentials) is
+        paid at startup rather than by the first request.
+        """
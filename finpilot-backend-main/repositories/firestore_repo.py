@@ -0,0 +1,404 @@
+from urllib.parse import quote
+from google.cloud import firestore
+from repositories.base import AlreadyExists, NotFound, Repository, TransactionRecord, WrappedSnapshot
+from repositories.rollups import apply_transaction, month_doc_id, needs_seed, seed_rollup
+from repositories.usage import record
+
+
+# User fields copied onto the user_emails index doc so login is one read
+EMAIL_INDEX_FIELDS = ("name", "password_hash")
+
+USER_ID_PAGE_SIZE = 1000
+
+
+def _with_id(doc) -> dict:
+    return {**doc.to_dict(), "id": doc.id}
+
+
+def _queried(results: list) -> list:
+    # A query is billed one read per document returned, and at least one
+    record(queries=1, reads=max(1, len(results)))
+    return results
+
+
+def _email_doc_id(email: str) -> str:
+    # Document IDs may not contain "/"
+    return quote(email, safe="@+")
+
+
+class FirestoreRepository(Repository):
+    """Repository backed by a Cloud Firestore AsyncClient."""
+
+    def __init__(self, client):
+        self.db = client
+
+    # ── Users ──
+    def _email_ref(self, email):
+        return self.db.collection("user_emails").document(_email_doc_id(email))
+
+    async def create_user(self, data):
+        user_ref = self.db.collection("users").document()
+        email_ref = self._email_ref(data["email"])
+
+        @firestore.async_transactional
+        async def create(transaction):
+            # Two concurrent signups both read the index doc, so one of them
+            # is retried and then sees the other's claim
+            if (await email_ref.get(transaction=transaction)).exists:
+                raise AlreadyExists(data["email"])
+            transaction.set(user_ref, {**data, "created_at": firestore.SERVER_TIMESTAMP})
+            transaction.create(email_ref, {
+                "user_id": user_ref.id,
+                "email": data["email"],
+                **{field: data.get(field) for field in EMAIL_INDEX_FIELDS},
+            })
+
+        await create(self.db.transaction())
+        record(reads=1, writes=2)
+        return user_ref.id
+
+    async def get_user(self, user_id):
+        doc = await self.db.collection("users").document(user_id).get()
+        record(reads=1)
+        return _with_id(doc) if doc.exists else None
+
+    async def find_user_by_email(self, email):
+        doc = await self._email_ref(email).get()
+        record(reads=1)
+        if not doc.exists:
+            return None
+        entry = doc.to_dict()
+        return {**entry, "id": entry.pop("user_id")}
+
+    async def update_user(self, user_id, fields):
+        user_ref = self.db.collection("users").document(user_id)
+        indexed = {field: fields[field] for field in EMAIL_INDEX_FIELDS if field in fields}
+        if not indexed:
+            await user_ref.update(fields)
+            record(writes=1)
+            return
+        user = await user_ref.get()
+        batch = self.db.batch()
+        batch.update(user_ref, fields)
+        batch.set(self._email_ref(user.get("email")), indexed, merge=True)
+        await batch.commit()
+        record(reads=1, writes=2)
+
+    async def index_user_email(self, user_id, email):
+        user_ref = self.db.collection("users").document(user_id)
+        email_ref = self._email_ref(email)
+
+        @firestore.async_transactional
+        async def index(transaction):
+            claim = await email_ref.get(transaction=transaction)
+            if claim.exists and claim.get("user_id") != user_id:
+                raise AlreadyExists(email)
+            user = await user_ref.get(transaction=transaction)
+            if not user.exists:
+                raise NotFound(user_id)
+            fields = user.to_dict()
+            transaction.set(email_ref, {
+                "user_id": user_id,
+                "email": email,
+                **{field: fields.get(field) for field in EMAIL_INDEX_FIELDS},
+            })
+            if fields.get("email") == email:
+                return False
+            transaction.update(user_ref, {"email": email})
+            return True
+
+        renamed = await index(self.db.transaction())
+        record(reads=2, writes=1 + renamed)
+
+    async def list_user_ids(self, after=None):
+        # Paged rather than one long stream, so a slow consumer can't outlive the RPC
+        users = self.db.collection("users")
+        while True:
+            query = users.order_by("__name__").select(["__name__"]).limit(USER_ID_PAGE_SIZE)
+            if after is not None:
+                query = query.start_after({"__name__": users.document(after)})
+            ids = [doc.id async for doc in query.stream()]
+            record(queries=1, reads=max(1, len(ids)))
+            for user_id in ids:
+                yield user_id
+            if len(ids) < USER_ID_PAGE_SIZE:
+                return
+            after = ids[-1]
+
+    # ── Salaries ──
+    async def set_salary(self, user_id, month, amount):
+        await self.db.collection("salaries").document(month_doc_id(user_id, month)).set({
+            "user_id": user_id,
+            "amount": amount,
+            "month": month,
+            "created_at": firestore.SERVER_TIMESTAMP
+        })
+        record(writes=1)
+
+    async def get_salaries(self, user_id, months):
+        refs = [self.db.collection("salaries").document(month_doc_id(user_id, m)) for m in months]
+        salaries = {}
+        async for doc in self.db.get_all(refs):
+            if doc.exists:
+                data = doc.to_dict()
+                salaries[data["month"]] = data.get("amount", 0)
+        record(reads=len(refs))
+        return salaries
+
+    # ── Allocations ──
+    async def set_allocation(self, user_id, month, categories):
+        await self.db.collection("allocations").document(month_doc_id(user_id, month)).set({
+            "user_id": user_id,
+            "month": month,
+            "categories": categories
+        })
+        record(writes=1)
+
+    async def get_allocation(self, user_id, month):
+        doc = await self.db.collection("allocations").document(month_doc_id(user_id, month)).get()
+        record(reads=1)
+        return doc.to_dict().get("categories", {}) if doc.exists else {}
+
+    # ── Transactions ──
+    async def add_transactions(self, rows):
+        txn_refs = [self.db.collection("transactions").document() for _ in rows]
+        rollup_refs = {
+            (data["user_id"], data["month"]): self.db.collection("monthly_rollups")
+                .document(month_doc_id(data["user_id"], data["month"]))
+            for data in rows
+        }
+
+        @firestore.async_transactional
+        async def write(transaction):
+            rollups = {}
+            async for snapshot in self.db.get_all(list(rollup_refs.values()), transaction=transaction):
+                if snapshot.exists:
+                    rollup = snapshot.to_dict()
+                    rollups[(rollup["user_id"], rollup["month"])] = rollup
+            seeded = 0
+            for key in rollup_refs:
+                if needs_seed(rollups.get(key)):
+                    # Months written before rollups (or their latest field)
+                    # existed; read inside the transaction, so a concurrent
+                    # first write is retried
+                    existing = await self.db.collection("transactions")\
+                        .where("user_id", "==", key[0])\
+                        .where("month", "==", key[1])\
+                        .get(transaction=transaction)
+                    seeded += max(1, len(existing))
+                    rollups[key] = seed_rollup(*key, (_with_id(doc) for doc in existing))
+            for ref, data in zip(txn_refs, rows):
+                apply_transaction(rollups[(data["user_id"], data["month"])], {**data, "id": ref.id})
+                transaction.set(ref, data)
+            for key, ref in rollup_refs.items():
+                transaction.set(ref, rollups[key])
+            return seeded
+
+        seeded = await write(self.db.transaction())
+        record(reads=len(rollup_refs) + seeded, writes=len(rows) + len(rollup_refs))
+        return [ref.id for ref in txn_refs]
+
+    async def list_transactions(self, user_id, category=None):
+        query = self.db.collection("transactions").where("user_id", "==", user_id)
+        if category is not None:
+            query = query.where("category", "==", category)
+        return _queried([_with_id(doc) async for doc in query.stream()])
+
+    async def page_transactions(self, user_id, limit, after=None, category=None):
+        # Needs the (user_id, [category,] date_ordinal DESC, __name__ DESC) indexes
+        query = self.db.collection("transactions").where("user_id", "==", user_id)
+        if category is not None:
+            query = query.where("category", "==", category)
+        query = query\
+            .order_by("date_ordinal", direction=firestore.Query.DESCENDING)\
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
+        if after is not None:
+            query = query.start_after({"date_ordinal": after[0], "__name__": after[1]})
+        return _queried([_with_id(doc) async for doc in query.limit(limit).stream()])
+
+    async def list_transaction_records_between(self, user_id, start, end):
+        # Needs the (user_id, date_ordinal) composite index from firestore.indexes.json
+        fields = TransactionRecord._fields
+        query = self.db.collection("transactions")\
+            .where("user_id", "==", user_id)\
+            .where("date_ordinal", ">=", start.toordinal())\
+            .where("date_ordinal", "<", end.toordinal())\
+            .select(fields)\
+            .stream()
+        make = TransactionRecord._make
+        return _queried([make(map(doc.to_dict().get, fields)) async for doc in query])
+
+    async def month_totals(self, user_id, month):
+        query = self.db.collection("transactions")\
+            .where("user_id", "==", user_id)\
+            .where("month", "==", month)\
+            .select(["type", "category", "amount"])\
+            .stream()
+        totals = {}
+        count = 0
+        async for doc in query:
+            count += 1
+            t = doc.to_dict()
+            by_category = totals.setdefault(t.get("type", ""), {})
+            cat = t.get("category", "misc")
+            by_category[cat] = by_category.get(cat, 0) + t.get("amount", 0)
+        record(queries=1, reads=max(1, count))
+        return totals
+
+    # ── Monthly rollups ──
+    async def get_rollup(self, user_id, month):
+        doc = await self.db.collection("monthly_rollups").document(month_doc_id(user_id, month)).get()
+        record(reads=1)
+        return doc.to_dict() if doc.exists else None
+
+    async def get_debit_totals(self, user_id, months):
+        refs = [self.db.collection("monthly_rollups").document(month_doc_id(user_id, m)) for m in months]
+        totals = {}
+        async for doc in self.db.get_all(refs, field_paths=["month", "debit_totals"]):
+            if doc.exists:
+                data = doc.to_dict()
+                totals[data["month"]] = data.get("debit_totals", {})
+        record(reads=len(refs))
+        return totals
+
+    async def get_category_daily_spend(self, user_id, months):
+        refs = [self.db.collection("monthly_rollups").document(month_doc_id(user_id, m)) for m in months]
+        daily = {}
+        async for doc in self.db.get_all(refs, field_paths=["month", "category_daily_spend"]):
+            if doc.exists:
+                data = doc.to_dict()
+                if "category_daily_spend" in data:
+                    daily[data["month"]] = data["category_daily_spend"]
+        record(reads=len(refs))
+        return daily
+
+    async def save_rollup(self, rollup):
+        await self.db.collection("monthly_rollups")\
+            .document(month_doc_id(rollup["user_id"], rollup["month"]))\
+            .set(rollup)
+        record(writes=1)
+
+    # ── Wrapped snapshots ──
+    async def get_wrapped_snapshot(self, user_id, month):
+        doc = await self.db.collection("wrapped_snapshots").document(month_doc_id(user_id, month)).get()
+        record(reads=1)
+        if not doc.exists:
+            return WrappedSnapshot(None, 0)
+        data = doc.to_dict()
+        return WrappedSnapshot(data.get("summary"), data.get("generation", 0))
+
+    async def save_wrapped_snapshot(self, user_id, month, summary, generation):
+        ref = self.db.collection("wrapped_snapshots").document(month_doc_id(user_id, month))
+
+        @firestore.async_transactional
+        async def save(transaction):
+            # An invalidation committed since `generation` was read means the
+            # summary may predate a backdated write; a concurrent one retries this
+            doc = await ref.get(transaction=transaction)
+            if (doc.to_dict().get("generation", 0) if doc.exists else 0) != generation:
+                return False
+            transaction.set(ref, {
+                "user_id": user_id,
+                "month": month,
+                "summary": summary,
+                "generation": generation,
+                "created_at": firestore.SERVER_TIMESTAMP
+            })
+            return True
+
+        stored = await save(self.db.transaction())
+        record(reads=1, writes=int(stored))
+        return stored
+
+    async def delete_wrapped_snapshots(self, user_id, months):
+        # Leaves the doc behind with its generation advanced, which fails any
+        # save of a summary computed before this
+        batch = self.db.batch()
+        for month in months:
+            batch.set(self.db.collection("wrapped_snapshots").document(month_doc_id(user_id, month)), {
+                "user_id": user_id,
+                "month": month,
+                "summary": None,
+                "generation": firestore.Increment(1),
+            }, merge=True)
+        await batch.commit()
+        record(writes=len(months))
+
+    # ── Wrapped precompute runs ──
+    async def get_precompute_heartbeat(self, month):
+        doc = await self.db.collection("precompute_runs").document(month).get()
+        record(reads=1)
+        return doc.to_dict().get("heartbeat") if doc.exists else None
+
+    async def set_precompute_heartbeat(self, month, at):
+        ref = self.db.collection("precompute_runs").document(month)
+        if at is None:
+            await ref.delete()
+        else:
+            await ref.set({"heartbeat": at})
+        record(writes=1)
+
+    # ── Savings goals ──
+    async def create_goal(self, data):
+        ref = self.db.collection("savings_goals").document()
+        await ref.set(data)
+        record(writes=1)
+        return ref.id
+
+    async def list_goals(self, user_id):
+        query = self.db.collection("savings_goals").where("user_id", "==", user_id).stream()
+        return _queried([_with_id(doc) async for doc in query])
+
+    async def apply_goal_changes(self, creates, increments, deletes):
+        goals = self.db.collection("savings_goals")
+        new_refs = [goals.document() for _ in creates]
+        changed_refs = [goals.document(goal_id) for goal_id in [*increments, *deletes]]
+
+        @firestore.async_transactional
+        async def apply(transaction):
+            # Reading the goals in the transaction makes a concurrent
+            # contribution retry it, so the clamped amount is always written
+            # from the latest one and nothing over the target is ever stored
+            found = {}
+            async for doc in self.db.get_all(changed_refs, field_paths=["current_amount", "target_amount", "user_id"],
+                                             transaction=transaction):
+                if doc.exists:
+                    found[doc.id] = doc.to_dict()
+            for ref in changed_refs:
+                if ref.id not in found:
+                    raise NotFound(ref.id)
+
+            for ref, data in zip(new_refs, creates):
+                transaction.create(ref, data)
+            progress = {}
+            for goal_id, amount in increments.items():
+                goal = found[goal_id]
+                progress[goal_id] = min(goal.get("current_amount", 0.0) + amount, goal.get("target_amount", 0.0))
+                transaction.update(goals.document(goal_id), {"current_amount": progress[goal_id]})
+            for goal_id in deletes:
+                transaction.delete(goals.document(goal_id))
+            return progress, {goal_id: goal["user_id"] for goal_id, goal in found.items()}
+
+        progress, owners = await apply(self.db.transaction())
+        record(reads=len(changed_refs), writes=len(creates) + len(increments) + len(deletes))
+        return [ref.id for ref in new_refs], progress, owners
+
+    # ── Data versions ──
+    async def get_data_version(self, user_id):
+        doc = await self.db.collection("data_versions").document(user_id).get()
+        record(reads=1)
+        return doc.to_dict().get("version", 0) if doc.exists else 0
+
+    async def bump_data_version(self, user_id):
+        # The commit returns the incremented value (a Value proto), so no read is needed
+        result = await self.db.collection("data_versions").document(user_id)\
+            .set({"version": firestore.Increment(1)}, merge=True)
+        record(writes=1)
+        return result.transform_results[0].integer_value
+
+    # ── Lifecycle ──
+    async def warm_up(self):
+        # Opens the gRPC channel and fetches an access token; a lookup of a
+        # missing document is the cheapest call that does both (one read)
+        await self.db.collection("data_versions").document("_warm_up").get()
+        record(reads=1)
@@ -0,0 +1,102 @@
+"""
+Per-user, per-month rollup documents.
+
+A rollup holds everything the month-level endpoints need so they never have
+to read raw transactions:
+
+    debit_totals / credit_totals   {category: amount}
+    debit_counts / credit_counts   {category: number of transactions}
+    transaction_count              all transactions in the month
+    daily_spend                    31 debit totals, index 0 = day 1
+    category_daily_spend           {category: 31 debit totals}
+    biggest_debit                  {id, amount, category, date, description} or None
+
+Both storage backends apply the same functions inside the write that stores
+the transaction, so a rollup is always consistent with its raw records. A
+month with no rollup yet may still hold transactions written before rollups
+existed, and a rollup stored before category_daily_spend was added lacks
+it; the next write to such a month seeds its rollup from the month's
+transactions first.
+"""
+from typing import Optional
+
+
+def month_doc_id(user_id: str, month: str) -> str:
+    """ID of every per-user, per-month record: rollups, snapshots, salaries, allocations."""
+    return f"{user_id}_{month}"
+
+
+def empty_rollup(user_id: str, month: str) -> dict:
+    return {
+        "user_id": user_id,
+        "month": month,
+        "debit_totals": {},
+        "credit_totals": {},
+        "debit_counts": {},
+        "credit_counts": {},
+        "transaction_count": 0,
+        "daily_spend": [0.0] * 31,
+        "category_daily_spend": {},
+        "biggest_debit": None,
+    }
+
+
+def needs_seed(rollup: Optional[dict]) -> bool:
+    """Whether a stored rollup (None if missing) must be rebuilt from its month's transactions."""
+    return rollup is None or "category_daily_spend" not in rollup
+
+
+def apply_transaction(rollup: dict, txn: dict) -> dict:
+    """Fold one stored transaction (with "id", "date", "month" keys) into the rollup."""
+    amount = txn.get("amount", 0)
+    txn_type = txn.get("type", "")
+    category = txn.get("category", "misc")
+
+    rollup["transaction_count"] += 1
+    if txn_type not in ("debit", "credit"):
+        return rollup
+
+    totals = rollup[f"{txn_type}_totals"]
+    counts = rollup[f"{txn_type}_counts"]
+    totals[category] = totals.get(category, 0) + amount
+    counts[category] = counts.get(category, 0) + 1
+
+    if txn_type == "debit":
+        day = int(txn["date"][8:10])
+        rollup["daily_spend"][day - 1] += amount
+        daily = rollup["category_daily_spend"]
+        if category not in daily:
+            daily[category] = [0.0] * 31
+        daily[category][day - 1] += amount
+
+        biggest = rollup["biggest_debit"]
+        if biggest is None or amount > biggest["amount"]:
+            rollup["biggest_debit"] = {
+                "id": txn.get("id"),
+                "amount": amount,
+                "category": category,
+                "date": txn.get("date", ""),
+                "description": txn.get("description") or "",
+            }
+    return rollup
+
+
+def seed_rollup(user_id: str, month: str, transactions) -> dict:
+    """Rollup for a month that needs_seed, from the transactions already stored in it."""
+    rollup = empty_rollup(user_id, month)
+    for t in transactions:
+        apply_transaction(rollup, t)
+    return rollup
+
+
+def build_rollups(user_id: str, transactions) -> dict:
+    """Recompute {month: rollup} from raw transactions."""
+    rollups = {}
+    for t in transactions:
+        month = t.get("month")
+        if not month:
+            continue
+        if month not in rollups:
+            rollups[month] = empty_rollup(user_id, month)
+        apply_transaction(rollups[month], t)
+    return rollups
@@ -0,0 +1,478 @@
+import asyncio
+import json
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from repositories.base import AlreadyExists, NotFound, Repository, TransactionRecord, WrappedSnapshot
+from repositories.rollups import apply_transaction, month_doc_id, needs_seed, seed_rollup
+from repositories.usage import record
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    name TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_users_email;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_unique ON users (email);
+
+-- salaries / allocations: id is "{user_id}_{month}", one row per month
+CREATE TABLE IF NOT EXISTS salaries (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    amount REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS allocations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    categories TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    amount REAL NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL,
+    month TEXT NOT NULL,
+    date_ordinal INTEGER NOT NULL,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, date_ordinal, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_month ON transactions (user_id, month, type, category, amount);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_category ON transactions (user_id, category, date_ordinal, id);
+
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, month)
+);
+
+CREATE TABLE IF NOT EXISTS wrapped_snapshots (
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, month)
+);
+
+CREATE TABLE IF NOT EXISTS precompute_runs (
+    month TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS savings_goals (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    target_amount REAL NOT NULL,
+    current_amount REAL NOT NULL,
+    duration_months INTEGER NOT NULL,
+    deadline TEXT,
+    icon TEXT NOT NULL,
+    color TEXT NOT NULL,
+    suggestion TEXT NOT NULL,
+    monthly_amount REAL NOT NULL,
+    expected_return REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_savings_goals_user ON savings_goals (user_id);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    user_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+USER_COLUMNS = ("email", "name", "password_hash", "created_at")
+TRANSACTION_COLUMNS = (
+    "user_id", "amount", "type", "category", "date", "month", "date_ordinal", "description",
+)
+GOAL_COLUMNS = (
+    "user_id", "name", "target_amount", "current_amount", "duration_months", "deadline",
+    "icon", "color", "suggestion", "monthly_amount", "expected_return",
+)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:20]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _insert_statement(table, columns):
+    placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+    return f"INSERT INTO {table} (id, {', '.join(columns)}) VALUES ({placeholders})"
+
+
+def _row_params(columns, new_id, data):
+    return (new_id, *(data.get(col) for col in columns))
+
+
+class SQLiteRepository(Repository):
+    """
+    Repository backed by a local SQLite file (or ":memory:").
+
+    Every lookup the services make is covered by an index, so month and
+    category reads stay cheap as the tables grow. The connection is owned by
+    one worker thread; coroutines hand it work and await the result, which
+    keeps the event loop free and serializes access without locks.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # Databases created before snapshots had generations
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(wrapped_snapshots)")}
+        if "generation" not in columns:
+            self.conn.execute("ALTER TABLE wrapped_snapshots ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _transaction(self, fn, *args):
+        """Run fn(*args) on the worker thread inside a single DB transaction."""
+        def run():
+            with self.conn:
+                return fn(*args)
+        return await self._run(run)
+
+    async def _query(self, sql, params=()):
+        rows = await self._run(lambda: self.conn.execute(sql, params).fetchall())
+        record(queries=1, reads=len(rows))
+        return rows
+
+    async def _query_tuples(self, sql, params=()):
+        """Like _query but plain tuples, skipping sqlite3.Row construction."""
+        def run():
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(sql, params).fetchall()
+        rows = await self._run(run)
+        record(queries=1, reads=len(rows))
+        return rows
+
+    async def _execute(self, sql, params=()):
+        cursor = await self._transaction(self.conn.execute, sql, params)
+        record(writes=cursor.rowcount)
+
+    async def _insert(self, table, columns, data):
+        new_id = _new_id()
+        await self._execute(_insert_statement(table, columns), _row_params(columns, new_id, data))
+        return new_id
+
+    async def _update(self, table, allowed_columns, row_id, fields):
+        columns = [col for col in fields if col in allowed_columns]
+        if not columns:
+            return
+        assignments = ", ".join(f"{col} = ?" for col in columns)
+        await self._execute(
+            f"UPDATE {table} SET {assignments} WHERE id = ?",
+            (*(fields[col] for col in columns), row_id),
+        )
+
+    def _load_rollup(self, user_id, month):
+        row = self.conn.execute(
+            "SELECT data FROM monthly_rollups WHERE user_id = ? AND month = ?",
+            (user_id, month),
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def _store_rollup(self, rollup):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO monthly_rollups (user_id, month, data) VALUES (?, ?, ?)",
+            (rollup["user_id"], rollup["month"], json.dumps(rollup)),
+        )
+
+    def _add_transactions(self, new_ids, rows):
+        """Returns the number of existing transactions read to seed new rollups."""
+        rollups = {}
+        seeded = 0
+        for data in rows:
+            key = (data["user_id"], data["month"])
+            if key not in rollups:
+                rollup = self._load_rollup(*key)
+                if needs_seed(rollup):
+                    # Read before the insert, so only transactions already stored
+                    existing = self.conn.execute(
+                        "SELECT * FROM transactions WHERE user_id = ? AND month = ?", key,
+                    ).fetchall()
+                    seeded += len(existing)
+                    rollup = seed_rollup(*key, map(dict, existing))
+                rollups[key] = rollup
+        self.conn.executemany(
+            _insert_statement("transactions", TRANSACTION_COLUMNS),
+            [_row_params(TRANSACTION_COLUMNS, new_id, data) for new_id, data in zip(new_ids, rows)],
+        )
+        for new_id, data in zip(new_ids, rows):
+            apply_transaction(rollups[(data["user_id"], data["month"])], {**data, "id": new_id})
+        for rollup in rollups.values():
+            self._store_rollup(rollup)
+        return seeded
+
+    # ── Users ──
+    async def create_user(self, data):
+        # The unique email index makes the duplicate check part of the insert
+        try:
+            return await self._insert("users", USER_COLUMNS, {**data, "created_at": _now()})
+        except sqlite3.IntegrityError:
+            raise AlreadyExists(data["email"])
+
+    async def get_user(self, user_id):
+        rows = await self._query("SELECT * FROM users WHERE id = ?", (user_id,))
+        return dict(rows[0]) if rows else None
+
+    async def find_user_by_email(self, email):
+        rows = await self._query("SELECT * FROM users WHERE email = ?", (email,))
+        return dict(rows[0]) if rows else None
+
+    async def update_user(self, user_id, fields):
+        await self._update("users", USER_COLUMNS, user_id, fields)
+
+    async def index_user_email(self, user_id, email):
+        # The unique email index is the lookup; only the stored value changes
+        try:
+            cursor = await self._transaction(
+                self.conn.execute, "UPDATE users SET email = ? WHERE id = ?", (email, user_id),
+            )
+        except sqlite3.IntegrityError:
+            raise AlreadyExists(email)
+        if cursor.rowcount == 0:
+            raise NotFound(user_id)
+        record(writes=1)
+
+    async def list_user_ids(self, after=None):
+        if after is None:
+            rows = await self._query("SELECT id FROM users ORDER BY id")
+        else:
+            rows = await self._query("SELECT id FROM users WHERE id > ? ORDER BY id", (after,))
+        for row in rows:
+            yield row["id"]
+
+    # ── Salaries ──
+    async def set_salary(self, user_id, month, amount):
+        await self._execute(
+            "INSERT OR REPLACE INTO salaries (id, user_id, month, amount, created_at) VALUES (?, ?, ?, ?, ?)",
+            (month_doc_id(user_id, month), user_id, month, amount, _now()),
+        )
+
+    async def get_salaries(self, user_id, months):
+        ids = [month_doc_id(user_id, m) for m in months]
+        rows = await self._query(
+            f"SELECT month, amount FROM salaries WHERE id IN ({', '.join('?' for _ in ids)})", ids,
+        )
+        return {r["month"]: r["amount"] for r in rows}
+
+    # ── Allocations ──
+    async def set_allocation(self, user_id, month, categories):
+        await self._execute(
+            "INSERT OR REPLACE INTO allocations (id, user_id, month, categories) VALUES (?, ?, ?, ?)",
+            (month_doc_id(user_id, month), user_id, month, json.dumps(categories)),
+        )
+
+    async def get_allocation(self, user_id, month):
+        rows = await self._query("SELECT categories FROM allocations WHERE id = ?", (month_doc_id(user_id, month),))
+        return json.loads(rows[0]["categories"]) if rows else {}
+
+    # ── Transactions ──
+    async def add_transactions(self, rows):
+        new_ids = [_new_id() for _ in rows]
+        seeded = await self._transaction(self._add_transactions, new_ids, rows)
+        months = len({(data["user_id"], data["month"]) for data in rows})
+        record(queries=months, reads=months + seeded, writes=len(rows) + months)
+        return new_ids
+
+    async def list_transactions(self, user_id, category=None):
+        if category is None:
+            rows = await self._query("SELECT * FROM transactions WHERE user_id = ?", (user_id,))
+        else:
+            rows = await self._query(
+                "SELECT * FROM transactions WHERE user_id = ? AND category = ?",
+                (user_id, category),
+            )
+        return [dict(r) for r in rows]
+
+    async def page_transactions(self, user_id, limit, after=None, category=None):
+        sql = "SELECT * FROM transactions WHERE user_id = ?"
+        params = [user_id]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        if after is not None:
+            sql += " AND (date_ordinal < ? OR (date_ordinal = ? AND id < ?))"
+            params += [after[0], after[0], after[1]]
+        sql += " ORDER BY date_ordinal DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(r) for r in await self._query(sql, params)]
+
+    async def list_transaction_records_between(self, user_id, start, end):
+        return await self._query_tuples(
+            f"SELECT {', '.join(TransactionRecord._fields)} FROM transactions "
+            "WHERE user_id = ? AND date_ordinal >= ? AND date_ordinal < ?",
+            (user_id, start.toordinal(), end.toordinal()),
+        )
+
+    async def month_totals(self, user_id, month):
+        # Answered entirely from the covering (user_id, month, ...) index
+        rows = await self._query(
+            "SELECT type, category, SUM(amount) AS total FROM transactions "
+            "WHERE user_id = ? AND month = ? GROUP BY type, category",
+            (user_id, month),
+        )
+        totals = {}
+        for r in rows:
+            totals.setdefault(r["type"], {})[r["category"]] = r["total"]
+        return totals
+
+    # ── Monthly rollups ──
+    async def get_rollup(self, user_id, month):
+        rollup = await self._run(self._load_rollup, user_id, month)
+        record(queries=1, reads=rollup is not None)
+        return rollup
+
+    async def get_debit_totals(self, user_id, months):
+        rows = await self._query(
+            "SELECT month, json_extract(data, '$.debit_totals') AS totals FROM monthly_rollups "
+            f"WHERE user_id = ? AND month IN ({', '.join('?' for _ in months)})",
+            (user_id, *months),
+        )
+        return {r["month"]: json.loads(r["totals"]) for r in rows}
+
+    async def get_category_daily_spend(self, user_id, months):
+        rows = await self._query(
+            "SELECT month, json_extract(data, '$.category_daily_spend') AS daily FROM monthly_rollups "
+            f"WHERE user_id = ? AND month IN ({', '.join('?' for _ in months)})",
+            (user_id, *months),
+        )
+        return {r["month"]: json.loads(r["daily"]) for r in rows if r["daily"] is not None}
+
+    async def save_rollup(self, rollup):
+        await self._transaction(self._store_rollup, rollup)
+        record(writes=1)
+
+    # ── Wrapped snapshots ──
+    async def get_wrapped_snapshot(self, user_id, month):
+        rows = await self._query(
+            "SELECT summary, generation FROM wrapped_snapshots WHERE user_id = ? AND month = ?",
+            (user_id, month),
+        )
+        if not rows:
+            return WrappedSnapshot(None, 0)
+        return WrappedSnapshot(json.loads(rows[0]["summary"]), rows[0]["generation"])
+
+    async def save_wrapped_snapshot(self, user_id, month, summary, generation):
+        # An invalidated slot keeps its row (summary JSON null) with a higher
+        # generation, so the conflict branch refuses the stale summary
+        cursor = await self._transaction(
+            self.conn.execute,
+            "INSERT INTO wrapped_snapshots (user_id, month, summary, created_at, generation) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_id, month) DO UPDATE SET summary = excluded.summary, "
+            "created_at = excluded.created_at WHERE generation = excluded.generation",
+            (user_id, month, json.dumps(summary), _now(), generation),
+        )
+        record(writes=cursor.rowcount)
+        return cursor.rowcount > 0
+
+    async def delete_wrapped_snapshots(self, user_id, months):
+        now = _now()
+        cursor = await self._transaction(
+            self.conn.executemany,
+            "INSERT INTO wrapped_snapshots (user_id, month, summary, created_at, generation) "
+            "VALUES (?, ?, 'null', ?, 1) "
+            "ON CONFLICT (user_id, month) DO UPDATE SET summary = 'null', generation = generation + 1",
+            [(user_id, month, now) for month in months],
+        )
+        record(writes=cursor.rowcount)
+
+    # ── Wrapped precompute runs ──
+    async def get_precompute_heartbeat(self, month):
+        rows = await self._query("SELECT heartbeat FROM precompute_runs WHERE month = ?", (month,))
+        return rows[0]["heartbeat"] if rows else None
+
+    async def set_precompute_heartbeat(self, month, at):
+        if at is None:
+            await self._transaction(self.conn.execute, "DELETE FROM precompute_runs WHERE month = ?", (month,))
+        else:
+            await self._transaction(
+                self.conn.execute,
+                "INSERT INTO precompute_runs (month, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT (month) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (month, at),
+            )
+        record(writes=1)
+
+    # ── Savings goals ──
+    async def create_goal(self, data):
+        return await self._insert("savings_goals", GOAL_COLUMNS, data)
+
+    async def list_goals(self, user_id):
+        rows = await self._query("SELECT * FROM savings_goals WHERE user_id = ?", (user_id,))
+        return [dict(r) for r in rows]
+
+    def _apply_goal_changes(self, creates, increments, deletes):
+        new_ids = [_new_id() for _ in creates]
+        self.conn.executemany(
+            _insert_statement("savings_goals", GOAL_COLUMNS),
+            [_row_params(GOAL_COLUMNS, new_id, data) for new_id, data in zip(new_ids, creates)],
+        )
+        progress = {}
+        owners = {}
+        for goal_id, amount in increments.items():
+            row = self.conn.execute(
+                "UPDATE savings_goals SET current_amount = MIN(current_amount + ?, target_amount) "
+                "WHERE id = ? RETURNING current_amount, user_id",
+                (amount, goal_id),
+            ).fetchone()
+            if row is None:
+                raise NotFound(goal_id)
+            progress[goal_id] = row["current_amount"]
+            owners[goal_id] = row["user_id"]
+        for goal_id in deletes:
+            row = self.conn.execute("DELETE FROM savings_goals WHERE id = ? RETURNING user_id", (goal_id,)).fetchone()
+            if row is None:
+                raise NotFound(goal_id)
+            owners[goal_id] = row["user_id"]
+        return new_ids, progress, owners
+
+    async def apply_goal_changes(self, creates, increments, deletes):
+        # Raising inside the transaction rolls back everything applied so far
+        result = await self._transaction(self._apply_goal_changes, creates, increments, deletes)
+        record(writes=len(creates) + len(increments) + len(deletes))
+        return result
+
+    # ── Data versions ──
+    async def get_data_version(self, user_id):
+        rows = await self._query("SELECT version FROM data_versions WHERE user_id = ?", (user_id,))
+        return rows[0]["version"] if rows else 0
+
+    def _bump_data_version(self, user_id):
+        return self.conn.execute(
+            "INSERT INTO data_versions (user_id, version) VALUES (?, 1) "
+            "ON CONFLICT (user_id) DO UPDATE SET version = version + 1 RETURNING version",
+            (user_id,),
+        ).fetchone()["version"]
+
+    async def bump_data_version(self, user_id):
+        version = await self._transaction(self._bump_data_version, user_id)
+        record(writes=1)
+        return version
+
+    # ── Lifecycle ──
+    async def warm_up(self):
+        await self._run(lambda: self.conn.execute("SELECT 1").fetchone())
@@ -0,0 +1,44 @@
+"""
+Per-request storage usage.
+
+Repositories report the queries they run and the documents they read and
+write through record(). The metrics middleware opens a Usage for each
+request with track() and exports the totals once the response is sent.
+Outside a tracked request, record() does nothing.
+
+Firestore counts follow its billing: a point lookup is one read whether or
+not the document exists, and a query costs one read per document returned
+but at least one. SQLite counts the rows its statements return or change.
+
+record() reads a context variable, so call it from the event loop, never
+from an executor thread.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+
+class Usage:
+    __slots__ = ("queries", "reads", "writes")
+
+    def __init__(self):
+        self.queries = 0
+        self.reads = 0
+        self.writes = 0
+
+
+_current: ContextVar[Optional[Usage]] = ContextVar("storage_usage", default=None)
+
+
+def track() -> Usage:
+    """Start counting for the current request; tasks it spawns share the same Usage."""
+    usage = Usage()
+    _current.set(usage)
+    return usage
+
+
+def record(queries: int = 0, reads: int = 0, writes: int = 0) -> None:
+    usage = _current.get()
+    if usage is not None:
+        usage.queries += queries
+        usage.reads += reads
+        usage.writes += writes
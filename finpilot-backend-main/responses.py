@@ -0,0 +1,45 @@
+"""
+Fast JSON responses.
+
+FastAPI serializes an endpoint's return value by validating it against the
+route's response_model and then encoding it with the stdlib json module.
+For payloads the services build themselves (dashboard summaries, Wrapped
+recaps, history pages) that validation only re-checks our own output, and on
+large lists it is most of the CPU a request costs. trusted_json() skips it:
+the content is encoded once with orjson and returned as-is. The route keeps
+its response_model, which still documents the shape in OpenAPI.
+
+Everything else goes through FastJSONResponse, the app's default response
+class, so validated responses are at least encoded with orjson too.
+"""
+from datetime import date, datetime
+from typing import Any, Mapping, Optional
+import orjson
+from starlette.responses import JSONResponse
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    # Firestore timestamps are datetime subclasses, which orjson leaves to us
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted_json(content: Any, headers: Optional[Mapping[str, str]] = None) -> FastJSONResponse:
+    """
+    Encode service output without validating it against the response_model.
+    Headers set on the endpoint's injected Response are not carried over to a
+    returned one; pass them in `headers`.
+    """
+    return FastJSONResponse(content, headers=headers)
@@ -1,23 +1,28 @@
 from fastapi import APIRouter, HTTPException
 from schemas.auth import UserRegister, UserLogin, UserResponse
 from services import auth_service
+from services.password_service import PasswordHasherBusy
 
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/auth/register", response_model=UserResponse)
-def register(user: UserRegister):
+async def register(user: UserRegister):
     try:
-        return auth_service.register_user(user)
+        return await auth_service.register_user(user)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/auth/login", response_model=UserResponse)
-def login(creds: UserLogin):
+async def login(creds: UserLogin):
     try:
-        return auth_service.login_user(creds)
+        return await auth_service.login_user(creds)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e)) # 401 = Unauthorized
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,37 +1,136 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from schemas.transaction import TransactionInput, DashboardSummaryResponse
-from services import finance_service
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from schemas.transaction import TransactionInput, DashboardSummaryResponse, ImportResponse, SpendForecastResponse
+from responses import dumps, trusted_json
+from services import finance_service, forecast_service, import_service, version_service
 
 router = APIRouter(tags=["Dashboard"])
 
+# Streamed history is sent in chunks of about this size rather than row by row
+STREAM_CHUNK_BYTES = 64 * 1024
+
 @router.post("/transactions")
-def add_transaction(data: TransactionInput):
+async def add_transaction(data: TransactionInput):
+    try:
+        return await finance_service.add_transaction(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/transactions/import", response_model=ImportResponse)
+async def import_transactions(
+    request: Request,
+    user_id: str,
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+):
+    """
+    Bulk import a statement streamed as the raw request body.
+    CSV needs a header row with amount,type,category,date[,description];
+    JSON lines carry one TransactionInput-shaped object per line.
+    """
     try:
-        return finance_service.add_transaction(data)
+        return await import_service.import_transactions(user_id, request.stream(), format)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/dashboard/summary", response_model=DashboardSummaryResponse)
-def get_summary(user_id: str, month: str):
+async def get_summary(request: Request, response: Response, user_id: str, month: str):
     """
     Month format: 'YYYY-MM' (e.g., '2026-02')
     """
     try:
-        return finance_service.get_dashboard_summary(user_id, month)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        return trusted_json(await finance_service.get_dashboard_summary(user_id, month), response.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/dashboard/category/{category_name}")
-def get_category_details(user_id: str, category_name: str):
+@router.get("/dashboard/forecast", response_model=SpendForecastResponse)
+async def get_forecast(request: Request, response: Response, user_id: str):
+    """
+    This month's summary with each category's projected month-end spend,
+    from this month's pace and the user's usual spending by this day.
+    """
     try:
-        return finance_service.get_category_transactions(user_id, category_name)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        return trusted_json(await forecast_service.get_spend_forecast(user_id), response.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/dashboard/history")
-def get_history(user_id: str):
+async def _json_array(rows):
+    chunk = bytearray(b"[")
+    separator = b""
+    async for row in rows:
+        chunk += separator + dumps(row)
+        separator = b","
+        if len(chunk) >= STREAM_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b"]"
+    yield bytes(chunk)
+
+async def _ndjson(rows):
+    chunk = bytearray()
+    async for row in rows:
+        chunk += dumps(row) + b"\n"
+        if len(chunk) >= STREAM_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+async def _history(request: Request, response: Response, user_id: str, limit, cursor, format, category=None):
+    """
+    With `limit`: one page as a JSON list, the next page's cursor in the
+    X-Next-Cursor header (absent on the last page).
+    Without it: every transaction from `cursor` on, streamed page by page
+    as a JSON array or, with format=ndjson, one object per line.
+    Either way a 304 if If-None-Match carries the user's current ETag.
+    """
     try:
-        return finance_service.get_full_history(user_id)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        if limit is not None:
+            items, next_cursor = await finance_service.get_history_page(user_id, limit, cursor, category)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return trusted_json(items, response.headers)
+        rows = finance_service.iter_history(user_id, cursor, category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    # A returned response does not pick up headers set on `response`; copy them (the ETag)
+    if format == "ndjson":
+        return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson", headers=response.headers)
+    return StreamingResponse(_json_array(rows), media_type="application/json", headers=response.headers)
+
+@router.get("/dashboard/category/{category_name}")
+async def get_category_details(
+    request: Request,
+    response: Response,
+    user_id: str,
+    category_name: str,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    return await _history(request, response, user_id, limit, cursor, format, category=category_name)
+
+@router.get("/dashboard/history")
+async def get_history(
+    request: Request,
+    response: Response,
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Transactions newest first. See _history for paging and streaming."""
+    return await _history(request, response, user_id, limit, cursor, format)
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from responses import dumps
+from services import events_service, finance_service, goal_service, version_service
+
+router = APIRouter(tags=["Events"])
+
+# Comment line sent on idle streams so proxies keep them open; the data
+# version is re-checked at the same interval
+KEEPALIVE_SECONDS = 15
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {dumps(data).decode()}\n\n"
+
+async def _snapshot(user_id: str, month: str) -> str:
+    summary, goals = await asyncio.gather(
+        finance_service.get_dashboard_summary(user_id, month),
+        goal_service.get_user_goals(user_id),
+    )
+    return _event("summary", summary) + _event("goals", goals)
+
+async def _stream(user_id: str, month: str, keepalive: float):
+    # Subscribed before the first snapshot is read, so no write falls in between
+    subscription = events_service.subscribe(user_id, month)
+    try:
+        # Read the version before the data, like the conditional GETs, so a
+        # concurrent write is never taken for one already pushed
+        version = await version_service.current(user_id)
+        yield "retry: 5000\n\n" + await _snapshot(user_id, month)
+
+        while True:
+            try:
+                await asyncio.wait_for(subscription.wake.wait(), keepalive)
+            except asyncio.TimeoutError:
+                if await version_service.current(user_id) == version:
+                    yield ": keepalive\n\n"
+                    continue
+                # Written through another worker or instance: nothing was published here
+                subscription.resync = True
+            subscription.wake.clear()
+            version = await version_service.current(user_id)
+
+            if subscription.resync:
+                subscription.resync = subscription.summary = False
+                subscription.deltas.clear()
+                yield await _snapshot(user_id, month)
+                continue
+
+            frames = []
+            if subscription.summary:
+                subscription.summary = False
+                frames.append(_event("summary", await finance_service.get_dashboard_summary(user_id, month)))
+            deltas, subscription.deltas = subscription.deltas, []
+            frames.extend(_event("goal_delta", delta) for delta in deltas)
+            if frames:
+                yield "".join(frames)
+    finally:
+        events_service.unsubscribe(subscription)
+
+@router.get("/events")
+async def dashboard_events(
+    user_id: str,
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+):
+    """
+    Server-Sent Events for a live dashboard. Month format: 'YYYY-MM'
+    (default: this month).
+
+    event: summary     dashboard summary for the month, on connect and after
+                       every write dated in it
+    event: goals       every goal, on connect and after a resync
+    event: goal_delta  {"created": [goal], "updated": [{goal_id, current_amount}],
+                        "deleted": [goal_id]} after each goal write
+
+    Writes through other workers are picked up at the next keepalive
+    (every KEEPALIVE_SECONDS), which resends summary and goals.
+    """
+    return StreamingResponse(
+        _stream(user_id, month or date.today().strftime("%Y-%m"), KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        # Keep reverse proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
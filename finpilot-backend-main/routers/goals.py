@@ -1,30 +1,68 @@
-from fastapi import APIRouter, HTTPException, Query
-from schemas.goal import GoalInput, GoalResponse, GoalFullResponse, GoalUpdateInput, GoalDeleteResponse
-from services import goal_service
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from schemas.goal import (
+    GoalInput, GoalResponse, GoalFullResponse, GoalUpdateInput, GoalDeleteResponse,
+    GoalProgressResponse, GoalBatchInput, GoalBatchResponse, GoalProjectionResponse,
+)
+from repositories.base import NotFound
+from responses import trusted_json
+from services import goal_service, version_service
 from typing import List
 
 router = APIRouter(tags=["Goals"])
 
+# services.projection_service pulls in NumPy; like the Wrapped router, it is
+# imported by the first projection request instead of at startup.
+
 @router.post("/savings/goal", response_model=GoalResponse)
-def create_goal(data: GoalInput):
+async def create_goal(data: GoalInput):
     try:
-        return goal_service.create_savings_goal(data)
+        return await goal_service.create_savings_goal(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/savings/goals", response_model=List[GoalFullResponse])
-def get_goals(user_id: str = Query(..., description="User ID to fetch goals for")):
+async def get_goals(
+    request: Request,
+    response: Response,
+    user_id: str = Query(..., description="User ID to fetch goals for"),
+):
     try:
-        return goal_service.get_user_goals(user_id)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        return trusted_json(await goal_service.get_user_goals(user_id), response.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.put("/savings/goal/{goal_id}")
-def update_goal(goal_id: str, data: GoalUpdateInput):
+@router.get("/savings/goals/projections", response_model=List[GoalProjectionResponse])
+async def get_goal_projections(
+    request: Request,
+    response: Response,
+    user_id: str = Query(..., description="User ID to project goals for"),
+):
+    """
+    Monte Carlo projection of every goal: the chance of reaching the target
+    by paying the goal's monthly amount into its plan, the balance
+    percentiles at each year end and at the deadline, and the monthly amount
+    that reaches the target nine times out of ten.
+    """
+    from services import projection_service
     try:
-        return goal_service.update_goal_progress(goal_id, data.amount)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        goals = await goal_service.get_user_goals(user_id)
+        return trusted_json(await projection_service.project_goals(goals), response.headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/savings/goal/{goal_id}", response_model=GoalProgressResponse)
+async def update_goal(goal_id: str, data: GoalUpdateInput):
+    try:
+        return await goal_service.update_goal_progress(goal_id, data.amount)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -32,10 +70,23 @@ def update_goal(goal_id: str, data: GoalUpdateInput):
 
 
 @router.delete("/savings/goal/{goal_id}", response_model=GoalDeleteResponse)
-def delete_goal(goal_id: str):
+async def delete_goal(goal_id: str):
     try:
-        return goal_service.delete_goal(goal_id)
+        return await goal_service.delete_goal(goal_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/savings/goals/batch", response_model=GoalBatchResponse)
+async def apply_goal_batch(data: GoalBatchInput):
+    """All-or-nothing: a missing goal rejects the whole batch with 404."""
+    try:
+        return await goal_service.apply_goal_batch(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotFound as e:
+        raise HTTPException(status_code=404, detail=f"Goal {e} not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
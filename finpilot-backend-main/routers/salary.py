@@ -5,8 +5,8 @@ from services import finance_service
 router = APIRouter(tags=["Salary"])
 
 @router.post("/salary", response_model=AllocationResponse)
-def set_salary(data: SalaryInput):
+async def set_salary(data: SalaryInput):
     try:
-        return finance_service.set_salary_and_allocate(data)
+        return await finance_service.set_salary_and_allocate(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
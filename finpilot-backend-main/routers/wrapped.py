@@ -1,13 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from schemas.wrapped import WrappedSummaryResponse
-from services import wrapped_service
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from schemas.wrapped import WrappedSummaryResponse, WrappedYearResponse
+from responses import trusted_json
+from services import version_service
+from datetime import MAXYEAR, MINYEAR, datetime
 
 router = APIRouter(tags=["Wrapped"])
 
+# services.wrapped_service pulls in NumPy, a tenth of the app's import
+# time; it is imported by the first Wrapped request instead of at startup.
+
+# Recaps compare against the month before and the year's neighbouring
+# months, which must be valid dates too
+YEAR = Query(None, ge=MINYEAR + 1, le=MAXYEAR - 1)
+
 
 @router.get("/wrapped/summary", response_model=WrappedSummaryResponse)
-def get_wrapped_summary(user_id: str, year: int = None, month: int = None):
+async def get_wrapped_summary(request: Request, response: Response, user_id: str,
+                              year: int = YEAR, month: int = None):
     """
     Get a monthly 'Budget Wrapped' summary for the user.
     Defaults to the current month if year/month not specified.
@@ -21,7 +30,33 @@ def get_wrapped_summary(user_id: str, year: int = None, month: int = None):
     if month < 1 or month > 12:
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
 
+    from services import wrapped_service
+    try:
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        return trusted_json(await wrapped_service.get_wrapped_summary(user_id, year, month), response.headers)
+    except wrapped_service.WrappedNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "60"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@router.get("/wrapped/year", response_model=WrappedYearResponse)
+async def get_wrapped_year(request: Request, response: Response, user_id: str, year: int = YEAR):
+    """
+    Get a 'Year in Review' with all twelve monthly summaries.
+    Defaults to the current year if not specified.
+    """
+    if year is None:
+        year = datetime.now().year
+
+    from services import wrapped_service
     try:
-        return wrapped_service.get_wrapped_summary(user_id, year, month)
+        not_modified = await version_service.conditional(request, response, user_id)
+        if not_modified:
+            return not_modified
+        return trusted_json(await wrapped_service.get_wrapped_year(user_id, year), response.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
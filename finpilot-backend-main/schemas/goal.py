@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class GoalInput(BaseModel):
     user_id: str
@@ -36,4 +36,44 @@ class GoalUpdateInput(BaseModel):
 
 class GoalDeleteResponse(BaseModel):
     status: str
-    message: str
\ No newline at end of file
+    message: str
+
+class GoalProgressResponse(BaseModel):
+    goal_id: str
+    current_amount: float
+
+class GoalContribution(BaseModel):
+    goal_id: str
+    amount: float
+
+class GoalBatchInput(BaseModel):
+    """Applied in one atomic commit; amounts for the same goal are summed."""
+    create: List[GoalInput] = []
+    contribute: List[GoalContribution] = []
+    delete: List[str] = []
+
+class GoalBatchResponse(BaseModel):
+    created: List[GoalResponse]
+    updated: List[GoalProgressResponse]
+    deleted: List[str]
+
+class ProjectionBand(BaseModel):
+    """Percentiles of the projected balance after `month` months."""
+    month: int
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+class GoalProjectionResponse(BaseModel):
+    goal_id: str
+    name: str
+    plan: str
+    target_amount: float
+    current_amount: float
+    monthly_amount: float
+    duration_months: int
+    success_probability: float
+    required_monthly_amount: float
+    bands: List[ProjectionBand]
@@ -29,4 +29,28 @@ class DashboardSummaryResponse(BaseModel):
     total_budget: float
     total_spent: float
     remaining_salary: float
-    breakdown: List[CategorySummary]
\ No newline at end of file
+    breakdown: List[CategorySummary]
+
+class CategoryForecast(CategorySummary):
+    daily_rate: float               # spent / days elapsed
+    forecast: float                 # projected spend by the end of the month
+    forecast_remaining: float       # allocated - forecast
+    overshoot_pct: Optional[float]  # % the forecast exceeds the allocation; None if nothing allocated
+    forecast_status: str            # "over_budget", "will_overshoot" or "on_track"
+
+class SpendForecastResponse(DashboardSummaryResponse):
+    breakdown: List[CategoryForecast]
+    day: int
+    days_in_month: int
+    elapsed_share: float  # share of the month's usual spending done by today
+    total_forecast: float
+
+class ImportRowError(BaseModel):
+    row: int        # Line number in the uploaded file (the CSV header is line 1)
+    error: str
+
+class ImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool  # True when more rows failed than are listed in `errors`
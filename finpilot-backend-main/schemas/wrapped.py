@@ -73,3 +73,33 @@ class WrappedSummaryResponse(BaseModel):
     top_spending_day_of_week: str
     fun_comparisons: List[str]
     streak_days_under_budget: int
+
+
+class MonthHighlight(BaseModel):
+    month: int
+    month_name: str
+    total_savings: float
+
+
+class WrappedYearResponse(BaseModel):
+    year: int
+    user_name: str
+
+    # Yearly totals (sums of the monthly figures)
+    total_income: float
+    total_expenses: float
+    total_savings: float
+    savings_rate: float
+    total_transactions: int
+
+    top_categories: List[CategoryBreakdown]
+
+    # Highlights, among months that have started
+    best_month: Optional[MonthHighlight]
+    worst_month: Optional[MonthHighlight]
+    longest_streak_days_under_budget: int
+
+    goals_summary: GoalSummary
+
+    # January to December, same shape as /wrapped/summary
+    months: List[WrappedSummaryResponse]
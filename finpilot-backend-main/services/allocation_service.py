@@ -0,0 +1,181 @@
+"""
+Budget allocation learned from each user's own spending.
+
+A user's SpendingModel holds their debit totals per category for the
+HISTORY_MONTHS months before the month being budgeted, up to the current
+month. It is built from the monthly rollups in one batched read, never from
+raw transactions, and kept current afterwards by add_transaction and imports,
+which fold each new debit in with a single dict update. POST /salary then
+works from memory.
+
+Models are cached per user, least recently used dropped past
+MODEL_CACHE_SIZE, and rebuilt after BUDGET_MODEL_CACHE_SECONDS so writes
+made through other workers are picked up.
+
+The allocation:
+  - expected spend per category: monthly debits weighted by recency
+    (halving every HALF_LIFE_MONTHS), from the user's first month of spending
+  - each category capped at CATEGORY_CAP of the salary
+  - spending scaled down if needed so at least SAVINGS_FLOOR of the salary
+    is saved
+  - users with less than FULL_HISTORY_MONTHS of history are blended with
+    the default split (ai_service.predict_budget_allocation); with none
+    they get the default split unchanged
+  - savings gets the rest, so the allocation always adds up to the salary
+"""
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List
+from config import BUDGET_MODEL_CACHE_SECONDS
+from database import repo
+from services.ai_service import predict_budget_allocation
+
+HISTORY_MONTHS = 12
+HALF_LIFE_MONTHS = 3
+FULL_HISTORY_MONTHS = 3
+CATEGORY_CAP = 0.5
+SAVINGS_FLOOR = 0.1
+# Users whose model is kept; least recently used are dropped past this
+MODEL_CACHE_SIZE = 10_000
+
+SAVINGS = "savings"
+DECAY = 0.5 ** (1 / HALF_LIFE_MONTHS)
+
+
+class SpendingModel:
+    __slots__ = ("first", "last", "months", "loaded_at")
+
+    def __init__(self, first: str, last: str, months: Dict[str, Dict[str, float]], loaded_at: float):
+        # Debit totals of every month from first to last, complete as of now
+        self.first = first
+        self.last = last
+        self.months = months  # "YYYY-MM" -> {category: debit total}
+        self.loaded_at = loaded_at
+
+    def covers(self, month: str) -> bool:
+        return self.first <= shift_month(month, -HISTORY_MONTHS) and shift_month(month, -1) <= self.last
+
+    def add(self, month: str, category: str, amount: float):
+        # Months outside the loaded range were never read; a partial total
+        # there would be taken for a complete one
+        if self.first <= month <= self.last:
+            totals = self.months.setdefault(month, {})
+            totals[category] = totals.get(category, 0.0) + amount
+
+
+_cache: "OrderedDict[str, SpendingModel]" = OrderedDict()
+
+
+def shift_month(month: str, months: int) -> str:
+    """Month key `months` after `month` (negative: before)."""
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + months
+    return f"{index // 12}-{str(index % 12 + 1).zfill(2)}"
+
+
+def month_keys(first: str, last: str) -> List[str]:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = shift_month(first, 1)
+    return months
+
+
+async def _load(user_id: str, first: str, last: str) -> SpendingModel:
+    loaded_at = time.monotonic()
+    months = await repo.get_debit_totals(user_id, month_keys(first, last))
+    return SpendingModel(first, last, months, loaded_at)
+
+
+async def spending_model(user_id: str, month: str) -> SpendingModel:
+    """
+    A model with the full history window before `month`, and from `month`
+    up to the current month too when `month` is not in the past.
+    """
+    model = _cache.get(user_id)
+    current = date.today().strftime("%Y-%m")
+    # A model from before the month turned no longer tracks the current month
+    if model is not None and model.covers(month) and model.last >= current \
+            and time.monotonic() - model.loaded_at < BUDGET_MODEL_CACHE_SECONDS:
+        _cache.move_to_end(user_id)
+        return model
+
+    first, last = shift_month(month, -HISTORY_MONTHS), shift_month(month, -1)
+    if first > current:
+        # Budgeting more than a year ahead: no history to learn from yet
+        return SpendingModel(first, last, {}, time.monotonic())
+    if month < current:
+        # Past months being backfilled get a one-off read; only models that
+        # reach the current month can be kept up to date
+        return await _load(user_id, first, last)
+
+    model = await _load(user_id, first, max(last, current))
+    _cache[user_id] = model
+    _cache.move_to_end(user_id)
+    if len(_cache) > MODEL_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return model
+
+
+def record_transactions(txns: Iterable[dict]):
+    """Fold committed transactions into their users' cached models, if any."""
+    for txn in txns:
+        if txn.get("type") != "debit":
+            continue
+        model = _cache.get(txn["user_id"])
+        if model is not None:
+            model.add(txn["month"], txn.get("category", ""), txn.get("amount", 0))
+
+
+def expected_spend(model: SpendingModel, month: str):
+    """
+    ({category: expected monthly debits}, months of history) for `month`,
+    weighted towards recent months. Months before the user's first debit
+    are not history; quiet months after it count as zero.
+    """
+    window = [m for m in month_keys(shift_month(month, -HISTORY_MONTHS), shift_month(month, -1))
+              if model.months.get(m)]
+    if not window:
+        return {}, 0
+    window = month_keys(window[0], shift_month(month, -1))
+
+    expected: Dict[str, float] = {}
+    weight_sum = 0.0
+    for age, m in enumerate(reversed(window)):
+        weight = DECAY ** age
+        weight_sum += weight
+        for category, amount in model.months.get(m, {}).items():
+            expected[category] = expected.get(category, 0.0) + weight * amount
+    return {category: amount / weight_sum for category, amount in expected.items()}, len(window)
+
+
+def allocate(salary: float, expected: Dict[str, float], history_months: int) -> dict:
+    default = predict_budget_allocation(salary)
+    if history_months == 0 or salary <= 0:
+        return default
+
+    # Debits filed as savings are money put aside, not spent
+    cap = salary * CATEGORY_CAP
+    spend = {c: min(amount, cap) for c, amount in expected.items() if c != SAVINGS and amount > 0}
+    budget = salary * (1 - SAVINGS_FLOOR)
+    total = sum(spend.values(), 0.0)
+    if total > budget:
+        spend = {c: amount * budget / total for c, amount in spend.items()}
+
+    # The default split saves more than the floor, so blending keeps it
+    confidence = min(1.0, history_months / FULL_HISTORY_MONTHS)
+    if confidence < 1:
+        categories = [c for c in default if c != SAVINGS] + [c for c in spend if c not in default]
+        spend = {c: confidence * spend.get(c, 0.0) + (1 - confidence) * default.get(c, 0.0) for c in categories}
+
+    allocation = {c: round(amount, 2) for c, amount in sorted(spend.items(), key=lambda item: -item[1])}
+    allocation = {c: amount for c, amount in allocation.items() if amount > 0}
+    allocation[SAVINGS] = round(salary - sum(allocation.values(), 0.0), 2)
+    return allocation
+
+
+async def allocate_budget(user_id: str, month: str, salary: float) -> dict:
+    """{category: amount} for a salary of `salary` in `month`, summing to the salary."""
+    model = await spending_model(user_id, month)
+    expected, history_months = expected_spend(model, month)
+    return allocate(salary, expected, history_months)
@@ -1,69 +1,70 @@
-from google.cloud import firestore
-from database import db
+import asyncio
+from database import repo
+from repositories.base import AlreadyExists
 from schemas.auth import UserRegister, UserLogin
-import bcrypt  # <--- Using bcrypt directly now
+from services import password_service
 
-def get_password_hash(password: str) -> str:
-    # Convert string to bytes, hash it, then convert back to string for storage
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed.decode('utf-8')
+# Background rehash tasks, referenced until they finish
+_rehash_tasks = set()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Convert both to bytes to compare
-    pwd_bytes = plain_password.encode('utf-8')
-    hash_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(pwd_bytes, hash_bytes)
+async def _upgrade_hash(user_id: str, password: str):
+    """Replace a hash made with an outdated work factor."""
+    try:
+        await repo.update_user(user_id, {"password_hash": await password_service.hash_password(password)})
+    except Exception as e:
+        print(f"⚠️ Could not rehash password for user {user_id}: {e}")
 
-def register_user(user: UserRegister):
-    # 1. Check if user already exists
-    users_ref = db.collection("users")
-    query = users_ref.where("email", "==", user.email).stream()
-    
-    for _ in query:
+def normalize_email(email: str) -> str:
+    """Key used for the email index: emails are matched case-insensitively."""
+    return email.strip().lower()
+
+async def register_user(user: UserRegister):
+    email = normalize_email(user.email)
+
+    # 1. Cheap early exit for the common duplicate case (the create below is the real check)
+    if await repo.find_user_by_email(email):
         raise ValueError("User with this email already exists")
 
     # 2. Hash the password
-    hashed_pwd = get_password_hash(user.password)
+    # Runs on the bcrypt process pool, not the event loop or request threads
+    hashed_pwd = await password_service.hash_password(user.password)
 
-    # 3. Create User Document
-    new_user_ref = users_ref.document()
-    user_data = {
-        "email": user.email,
-        "name": user.name,
-        "password_hash": hashed_pwd,
-        "created_at": firestore.SERVER_TIMESTAMP
-    }
-    new_user_ref.set(user_data)
+    # 3. Create User Document, claiming the email atomically
+    try:
+        user_id = await repo.create_user({
+            "email": email,
+            "name": user.name,
+            "password_hash": hashed_pwd,
+        })
+    except AlreadyExists:
+        raise ValueError("User with this email already exists")
 
     return {
-        "user_id": new_user_ref.id,
-        "email": user.email,
+        "user_id": user_id,
+        "email": email,
         "name": user.name,
         "message": "User registered successfully"
     }
 
-def login_user(creds: UserLogin):
+async def login_user(creds: UserLogin):
     # 1. Find user by email
-    users_ref = db.collection("users")
-    query = users_ref.where("email", "==", creds.email).limit(1).stream()
-    
-    user_doc = None
-    for doc in query:
-        user_doc = doc
+    user_data = await repo.find_user_by_email(normalize_email(creds.email))
     
-    if not user_doc:
+    if not user_data:
         raise ValueError("Invalid email or password")
-    
-    user_data = user_doc.to_dict()
 
     # 2. Verify Password
-    if not verify_password(creds.password, user_data["password_hash"]):
+    if not await password_service.verify_password(creds.password, user_data["password_hash"]):
         raise ValueError("Invalid email or password")
 
+    # 3. Upgrade the stored hash if BCRYPT_ROUNDS was raised since it was made
+    if password_service.needs_rehash(user_data["password_hash"]):
+        task = asyncio.ensure_future(_upgrade_hash(user_data["id"], creds.password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+
     return {
-        "user_id": user_doc.id,
+        "user_id": user_data["id"],
         "email": user_data["email"],
         "name": user_data["name"],
         "message": "Login successful"
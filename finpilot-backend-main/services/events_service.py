@@ -0,0 +1,76 @@
+"""
+In-process broker for live dashboard updates (see routers/events.py).
+
+The write paths in finance_service, import_service and goal_service publish
+what changed for a user once the write has landed and the user's data
+version has been bumped. Each open /events stream holds a Subscription for
+one user and month. Nothing is queued per event: a change marks the
+subscription (summary needed, goal deltas pending) and sets its Event, so
+an idle subscriber costs one waiting coroutine and a burst of writes is
+coalesced into one summary. Only streams held by this process are reached.
+"""
+import asyncio
+from typing import Dict, Iterable, List, Set
+
+# Goal deltas queued for one slow subscriber before it falls back to a resync
+MAX_PENDING_DELTAS = 100
+
+
+class Subscription:
+    __slots__ = ("user_id", "month", "wake", "summary", "deltas", "resync")
+
+    def __init__(self, user_id: str, month: str):
+        self.user_id = user_id
+        self.month = month
+        self.wake = asyncio.Event()
+        self.summary = False
+        self.deltas: List[dict] = []
+        self.resync = False
+
+
+_subscribers: Dict[str, Set[Subscription]] = {}
+
+
+def subscribe(user_id: str, month: str) -> Subscription:
+    subscription = Subscription(user_id, month)
+    _subscribers.setdefault(user_id, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription):
+    subscriptions = _subscribers.get(subscription.user_id)
+    if subscriptions is not None:
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del _subscribers[subscription.user_id]
+
+
+def subscriber_count() -> int:
+    return sum(len(subscriptions) for subscriptions in _subscribers.values())
+
+
+def publish_months(user_id: str, months: Iterable[str]):
+    """Transactions, salary or allocation dated in `months` changed."""
+    subscriptions = _subscribers.get(user_id)
+    if not subscriptions:
+        return
+    months = set(months)
+    for subscription in subscriptions:
+        if subscription.month in months:
+            subscription.summary = True
+            subscription.wake.set()
+
+
+def publish_goals(user_id: str, created: List[dict] = (), updated: List[dict] = (), deleted: List[str] = ()):
+    """Goals were created (full goal views), contributed to or deleted."""
+    subscriptions = _subscribers.get(user_id)
+    if not subscriptions:
+        return
+    delta = {"created": list(created), "updated": list(updated), "deleted": list(deleted)}
+    for subscription in subscriptions:
+        if len(subscription.deltas) < MAX_PENDING_DELTAS:
+            subscription.deltas.append(delta)
+        else:
+            subscription.deltas.clear()
+            subscription.resync = True
+        subscription.wake.set()
@@ -1,80 +1,109 @@
-from google.cloud import firestore
-from database import db
-from services.ai_service import predict_budget_allocation
+import asyncio
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional
+from database import repo
+from services import allocation_service, events_service, version_service
 from schemas.salary import SalaryInput
 from schemas.transaction import TransactionInput
 
-def set_salary_and_allocate(data: SalaryInput):
-    # 1. Store Salary Record
-    salary_ref = db.collection("salaries").document()
-    salary_ref.set({
-        "user_id": data.user_id,
-        "amount": data.amount,
-        "month": data.month,
-        "created_at": firestore.SERVER_TIMESTAMP
-    })
-
-    # 2. Get AI Prediction
-    allocation_map = predict_budget_allocation(data.amount)
-
-    # 3. Store Allocation
-    # We query to see if an allocation already exists for this month to update it, 
-    # or create a new one. For simplicity, we'll just create new.
-    alloc_ref = db.collection("allocations").document()
-    alloc_ref.set({
-        "user_id": data.user_id,
-        "month": data.month,
-        "categories": allocation_map
-    })
+# Rows fetched per repository round trip when streaming a full history
+HISTORY_PAGE_SIZE = 500
+
+def transaction_keys(date_str: str) -> dict:
+    """
+    Normalized date plus the indexed keys stored with every transaction:
+    "month" ("YYYY-MM") and "date_ordinal" (proleptic Gregorian day number).
+    """
+    try:
+        if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+            # Already canonical: skip strptime, which dominates bulk imports
+            d = date.fromisoformat(date_str)
+            return {"date": date_str, "month": date_str[:7], "date_ordinal": d.toordinal()}
+        d = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid date '{date_str}', expected YYYY-MM-DD")
+    return {"date": d.isoformat(), "month": d.strftime("%Y-%m"), "date_ordinal": d.toordinal()}
+
+def month_bounds(year: int, month: int):
+    """First day of the month and first day of the next month, for [start, end) range reads."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+def next_month(month: str) -> str:
+    """Month key after `month`, e.g. "2026-12" -> "2027-01"."""
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + 1}-01" if mon == 12 else f"{year}-{str(mon + 1).zfill(2)}"
+
+async def invalidate_wrapped_snapshots(user_id: str, month: str):
+    """
+    Wrapped snapshots only exist for closed months and years. A write dated
+    in one changes that month's recap, the next month's comparison figures
+    and the year-in-review of both.
+    """
+    if month < date.today().strftime("%Y-%m"):
+        following = next_month(month)
+        keys = {month, following, month[:4], following[:4]}
+        await repo.delete_wrapped_snapshots(user_id, sorted(keys))
+
+async def set_salary_and_allocate(data: SalaryInput):
+    # 1. Allocate from the user's spending history
+    allocation_map = await allocation_service.allocate_budget(data.user_id, data.month, data.amount)
+
+    # 2. Store Salary and Allocation
+    # Both are keyed by user and month, so setting a month again replaces them
+    await asyncio.gather(
+        repo.set_salary(data.user_id, data.month, data.amount),
+        repo.set_allocation(data.user_id, data.month, allocation_map),
+    )
+    await invalidate_wrapped_snapshots(data.user_id, data.month)
+    await version_service.bump(data.user_id)
+    events_service.publish_months(data.user_id, [data.month])
 
     return {
         "salary": data.amount,
         "predicted_allocation": allocation_map
     }
 
-def add_transaction(data: TransactionInput):
-    doc_ref = db.collection("transactions").document()
-    txn_data = data.dict()
-    doc_ref.set(txn_data)
-    return {"id": doc_ref.id, "status": "success"}
+async def add_transaction(data: TransactionInput):
+    txn_data = {**data.dict(), **transaction_keys(data.date)}
+    txn_id = await repo.add_transaction(txn_data)
+    allocation_service.record_transactions([txn_data])
+    await invalidate_wrapped_snapshots(data.user_id, txn_data["month"])
+    await version_service.bump(data.user_id)
+    events_service.publish_months(data.user_id, [txn_data["month"]])
+    return {"id": txn_id, "status": "success"}
 
-def get_dashboard_summary(user_id: str, month_prefix: str):
+async def get_dashboard_summary(user_id: str, month_prefix: str):
     """
     month_prefix: "2026-02"
     """
     # 1. Fetch Allocation
-    allocs = db.collection("allocations")\
-        .where("user_id", "==", user_id)\
-        .where("month", "==", month_prefix)\
-        .limit(1).stream()
-    
-    budget_map = {}
-    for a in allocs:
-        budget_map = a.to_dict().get("categories", {})
+    budget_map = await repo.get_allocation(user_id, month_prefix)
 
-    # 2. Fetch Transactions (Client-side filtering for simple hackathon implementation)
-    # In production, use composite indexes for date range queries
-    txns = db.collection("transactions").where("user_id", "==", user_id).stream()
-    
-    spent_map = {}
-    total_spent = 0
-    
-    for doc in txns:
-        t = doc.to_dict()
-        # Check if transaction belongs to this month
-        if t.get("date", "").startswith(month_prefix) and t.get("type") == "debit":
-            cat = t.get("category", "misc")
-            amt = t.get("amount", 0)
-            spent_map[cat] = spent_map.get(cat, 0) + amt
-            total_spent += amt
+    # 2. Read this month's debits from the rollup maintained by add_transaction
+    rollup = await repo.get_rollup(user_id, month_prefix)
+    if rollup is not None:
+        spent_map = rollup["debit_totals"]
+    else:
+        # No rollup yet: nothing written to the month since rollups existed
+        # (the first write seeds one from its transactions); aggregate on the month key
+        spent_map = (await repo.month_totals(user_id, month_prefix)).get("debit", {})
 
     # 3. Build Response
+    return build_summary(month_prefix, budget_map, spent_map)
+
+def build_summary(month_prefix: str, budget_map: dict, spent_map: dict) -> dict:
+    """Dashboard summary from a month's allocation and its debit totals by category."""
+    total_spent = sum(spent_map.values(), 0.0)
     breakdown = []
-    total_budget = sum(budget_map.values())
+    total_budget = sum(budget_map.values(), 0.0)
     
     # Iterate over budget categories
     for cat, alloc_amt in budget_map.items():
-        spent = spent_map.get(cat, 0)
+        spent = spent_map.get(cat, 0.0)
         breakdown.append({
             "category": cat,
             "allocated": alloc_amt,
@@ -88,7 +117,7 @@ def get_dashboard_summary(user_id: str, month_prefix: str):
         if cat not in budget_map:
             breakdown.append({
                 "category": cat,
-                "allocated": 0,
+                "allocated": 0.0,
                 "spent": spent,
                 "remaining": -spent,
                 "status": "over_budget"
@@ -102,19 +131,50 @@ def get_dashboard_summary(user_id: str, month_prefix: str):
         "breakdown": breakdown
     }
 
-def get_category_transactions(user_id: str, category: str):
-    txns = db.collection("transactions")\
-        .where("user_id", "==", user_id)\
-        .where("category", "==", category)\
-        .stream()
-    
-    return [
-        {**doc.to_dict(), "id": doc.id} 
-        for doc in txns
-    ]
-
-def get_full_history(user_id: str):
-    txns = db.collection("transactions").where("user_id", "==", user_id).stream()
-    # Sort in python for simplicity
-    data = [{**doc.to_dict(), "id": doc.id} for doc in txns]
-    return sorted(data, key=lambda x: x['date'], reverse=True)
\ No newline at end of file
+def encode_cursor(txn: dict) -> str:
+    """Opaque cursor pointing just past `txn` in (date_ordinal, id) descending order."""
+    raw = json.dumps([txn["date_ordinal"], txn["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ordinal, txn_id = json.loads(raw)
+        if not isinstance(ordinal, int) or not isinstance(txn_id, str):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return ordinal, txn_id
+
+async def get_history_page(user_id: str, limit: int, cursor: Optional[str] = None, category: Optional[str] = None):
+    """
+    One page of transactions, newest first. Returns (items, next_cursor);
+    next_cursor is None on the last page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    # Ask for one extra row to learn whether another page exists
+    rows = await repo.page_transactions(user_id, limit + 1, after=after, category=category)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+def iter_history(user_id: str, cursor: Optional[str] = None, category: Optional[str] = None):
+    """
+    Async iterator over every transaction from `cursor` on, newest first.
+    Holds at most one page in memory. The cursor is validated before the
+    iterator is returned so a bad one can still be reported as a 400.
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    async def rows():
+        position = after
+        while True:
+            page = await repo.page_transactions(user_id, HISTORY_PAGE_SIZE, after=position, category=category)
+            for txn in page:
+                yield txn
+            if len(page) < HISTORY_PAGE_SIZE:
+                return
+            position = (page[-1]["date_ordinal"], page[-1]["id"])
+
+    return rows()
@@ -0,0 +1,163 @@
+"""
+Month-end spend forecast for the dashboard.
+
+Takes the current month's category breakdown (finance_service.build_summary)
+and adds where each category is heading by the last day of the month:
+
+    elapsed     share of a category's monthly spending the user has usually
+                done by today's day of the month, from the previous
+                SEASONALITY_MONTHS months (rent paid on the 1st is done by
+                the 2nd; groceries build up through the month); today / days
+                in month for categories without history
+    typical     expected monthly spend in the category, weighted towards
+                recent months (allocation_service.expected_spend)
+    forecast    spent + (1 - elapsed) x rate, where rate is
+                elapsed x spent + (1 - elapsed^2) x typical: the monthly
+                spend the rest of the month runs at, blending this month's
+                pace (spent / elapsed, weighted by elapsed^2) with the
+                typical spend. Early in the month it is the typical spend,
+                so a bill paid ahead of schedule is counted once rather than
+                extrapolated; a month on its usual track forecasts exactly
+                the typical spend. spent / elapsed (the daily run rate
+                carried to the month end) without history
+
+This month's spending is read from its rollup, like the dashboard summary.
+The history comes from the user's cached SpendingModel, and the
+day-of-month curves from the category_daily_spend of the previous months'
+rollups, read once per user and month in one batched read and cached. A
+request costs an allocation and a rollup read once the model and curves are cached.
+"""
+import asyncio
+import calendar
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional
+from config import BUDGET_MODEL_CACHE_SECONDS
+from database import repo
+from services import allocation_service
+from services.allocation_service import month_keys, shift_month
+from services.finance_service import build_summary
+
+SEASONALITY_MONTHS = 6
+# Curves kept; least recently used are dropped past this
+CURVE_CACHE_SIZE = 10_000
+
+_curves: "OrderedDict[tuple, tuple]" = OrderedDict()  # (user_id, month) -> (curves, overall, read at)
+
+
+def _days_in(month: str) -> int:
+    return calendar.monthrange(int(month[:4]), int(month[5:7]))[1]
+
+
+def _cumulative(spend: List[float]) -> Optional[List[float]]:
+    total = sum(spend, 0.0)
+    if total <= 0:
+        return None
+    running = 0.0
+    curve = []
+    for amount in spend:
+        running += amount
+        curve.append(running / total)
+    return curve
+
+
+async def _curves_for(user_id: str, month: str) -> tuple:
+    """
+    ({category: share of its spending done by the end of each day of
+    `month` (index 0 = day 1)}, the same for all categories together or
+    None) over the months before it. Days of shorter and longer months are
+    stretched to the length of `month`.
+    """
+    key = (user_id, month)
+    cached = _curves.get(key)
+    now = time.monotonic()
+    if cached is not None and now - cached[2] < BUDGET_MODEL_CACHE_SECONDS:
+        _curves.move_to_end(key)
+        return cached[0], cached[1]
+
+    history = await repo.get_category_daily_spend(
+        user_id, month_keys(shift_month(month, -SEASONALITY_MONTHS), shift_month(month, -1)),
+    )
+    days = _days_in(month)
+    by_day: Dict[str, List[float]] = {}
+    overall = [0.0] * days
+    for past, categories in history.items():
+        past_days = _days_in(past)
+        for category, spend in categories.items():
+            if category not in by_day:
+                by_day[category] = [0.0] * days
+            for day, amount in enumerate(spend[:past_days], 1):
+                if amount:
+                    index = max(1, round(day * days / past_days)) - 1
+                    by_day[category][index] += amount
+                    overall[index] += amount
+    curves = {category: _cumulative(spend) for category, spend in by_day.items()}
+    overall = _cumulative(overall)
+
+    _curves[key] = (curves, overall, now)
+    _curves.move_to_end(key)
+    if len(_curves) > CURVE_CACHE_SIZE:
+        _curves.popitem(last=False)
+    return curves, overall
+
+
+def _forecast(spent: float, typical, elapsed: float) -> float:
+    if typical is None:
+        return spent / elapsed if elapsed > 0 else spent
+    return spent + (1 - elapsed) * (elapsed * spent + (1 - elapsed ** 2) * typical)
+
+
+async def get_spend_forecast(user_id: str) -> dict:
+    """The dashboard summary for this month, with a month-end forecast per category."""
+    today = date.today()
+    month = today.strftime("%Y-%m")
+    days = _days_in(month)
+    budget_map, rollup, model, (curves, overall) = await asyncio.gather(
+        repo.get_allocation(user_id, month),
+        repo.get_rollup(user_id, month),
+        allocation_service.spending_model(user_id, month),
+        _curves_for(user_id, month),
+    )
+    if rollup is not None:
+        spent_map = rollup["debit_totals"]
+    else:
+        # No write to the month since rollups existed; aggregate on the month key
+        spent_map = (await repo.month_totals(user_id, month)).get("debit", {})
+    expected, _ = allocation_service.expected_spend(model, month)
+    linear = today.day / days
+
+    summary = build_summary(month, budget_map, spent_map)
+    breakdown = summary["breakdown"]
+    # Categories the user usually spends on but has not yet this month
+    listed = {row["category"] for row in breakdown}
+    for category in expected:
+        if category not in listed:
+            breakdown.append({
+                "category": category, "allocated": 0.0, "spent": 0.0,
+                "remaining": 0.0, "status": "within_budget",
+            })
+
+    total_forecast = 0.0
+    for row in breakdown:
+        category, spent, allocated = row["category"], row["spent"], row["allocated"]
+        curve = curves.get(category)
+        elapsed = curve[today.day - 1] if curve else linear
+        forecast = round(_forecast(spent, expected.get(category), elapsed), 2)
+        total_forecast += forecast
+        row["daily_rate"] = round(spent / today.day, 2)
+        row["forecast"] = forecast
+        row["forecast_remaining"] = round(allocated - forecast, 2)
+        # How far past its allocation the category is heading, in percent;
+        # None for categories with nothing allocated
+        row["overshoot_pct"] = round(max(forecast / allocated - 1, 0.0) * 100, 1) if allocated > 0 else None
+        row["forecast_status"] = "over_budget" if row["status"] == "over_budget" \
+            else "will_overshoot" if forecast > allocated else "on_track"
+
+    return {
+        **summary,
+        "day": today.day,
+        "days_in_month": days,
+        "elapsed_share": round(overall[today.day - 1] if overall else linear, 4),
+        "total_forecast": round(total_forecast, 2),
+    }
@@ -1,14 +1,18 @@
-from database import db
+from database import repo
+from repositories.base import NotFound
+from services import events_service, version_service
 from services.ai_service import suggest_investment_plan
-from schemas.goal import GoalInput
+from schemas.goal import GoalInput, GoalBatchInput
 
-def create_savings_goal(data: GoalInput):
+# Operations per batch request; matches the Firestore per-commit write limit
+GOAL_BATCH_LIMIT = 500
+
+def _goal_record(data: GoalInput) -> dict:
     # 1. Get AI Suggestion
     suggestion = suggest_investment_plan(data.target_amount, data.duration_months)
-    
-    # 2. Store Goal with all fields
-    doc_ref = db.collection("savings_goals").document()
-    goal_record = {
+
+    # 2. Goal with all fields
+    return {
         "user_id": data.user_id,
         "target_amount": data.target_amount,
         "duration_months": data.duration_months,
@@ -19,65 +23,108 @@ def create_savings_goal(data: GoalInput):
         "color": data.color,
         **suggestion
     }
-    doc_ref.set(goal_record)
-    
+
+def _created(goal_id: str, record: dict) -> dict:
     return {
-        "goal_id": doc_ref.id,
-        **suggestion
+        "goal_id": goal_id,
+        "suggestion": record["suggestion"],
+        "monthly_amount": record["monthly_amount"],
+        "expected_return": record["expected_return"],
+    }
+
+async def create_savings_goal(data: GoalInput):
+    goal_record = _goal_record(data)
+    goal_id = await repo.create_goal(goal_record)
+    await version_service.bump(data.user_id)
+    events_service.publish_goals(data.user_id, created=[_goal_view({"id": goal_id, **goal_record})])
+    return _created(goal_id, goal_record)
+
+
+def _goal_view(data: dict) -> dict:
+    return {
+        "goal_id": data["id"],
+        "user_id": data.get("user_id", ""),
+        "name": data.get("name", "Untitled Goal"),
+        "target_amount": data.get("target_amount", 0.0),
+        "current_amount": data.get("current_amount", 0.0),
+        "deadline": data.get("deadline"),
+        "icon": data.get("icon", "🎯"),
+        "color": data.get("color", "hsl(142, 40%, 45%)"),
+        "suggestion": data.get("suggestion", ""),
+        "monthly_amount": data.get("monthly_amount", 0.0),
+        "expected_return": data.get("expected_return", 0.0),
+        "duration_months": data.get("duration_months", 12),
     }
 
 
-def get_user_goals(user_id: str):
-    """Fetch all goals for a user from Firestore."""
-    goals_ref = db.collection("savings_goals").where("user_id", "==", user_id)
-    docs = goals_ref.stream()
-    
-    goals = []
-    for doc in docs:
-        data = doc.to_dict()
-        goals.append({
-            "goal_id": doc.id,
-            "user_id": data.get("user_id", ""),
-            "name": data.get("name", "Untitled Goal"),
-            "target_amount": data.get("target_amount", 0),
-            "current_amount": data.get("current_amount", 0),
-            "deadline": data.get("deadline"),
-            "icon": data.get("icon", "🎯"),
-            "color": data.get("color", "hsl(142, 40%, 45%)"),
-            "suggestion": data.get("suggestion", ""),
-            "monthly_amount": data.get("monthly_amount", 0),
-            "expected_return": data.get("expected_return", 0),
-            "duration_months": data.get("duration_months", 12),
-        })
-    
-    return goals
-
-
-def update_goal_progress(goal_id: str, amount: float):
-    """Add amount to a goal's current_amount."""
-    doc_ref = db.collection("savings_goals").document(goal_id)
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+async def get_user_goals(user_id: str):
+    """Fetch all goals for a user."""
+    return [_goal_view(data) for data in await repo.list_goals(user_id)]
+
+
+async def update_goal_progress(goal_id: str, amount: float):
+    """Add amount to a goal's current_amount, capped at its target, in one atomic write."""
+    try:
+        _, progress, owners = await repo.apply_goal_changes([], {goal_id: amount}, [])
+    except NotFound:
         raise ValueError(f"Goal {goal_id} not found")
-    
-    data = doc.to_dict()
-    current = data.get("current_amount", 0)
-    target = data.get("target_amount", 0)
-    new_amount = min(current + amount, target)
-    
-    doc_ref.update({"current_amount": new_amount})
-    
-    return {"goal_id": goal_id, "current_amount": new_amount}
-
-
-def delete_goal(goal_id: str):
-    """Delete a goal from Firestore."""
-    doc_ref = db.collection("savings_goals").document(goal_id)
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+    await version_service.bump(*owners.values())
+    updated = {"goal_id": goal_id, "current_amount": progress[goal_id]}
+    for user_id in owners.values():
+        events_service.publish_goals(user_id, updated=[updated])
+
+    return updated
+
+
+async def delete_goal(goal_id: str):
+    """Delete a goal."""
+    try:
+        _, _, owners = await repo.apply_goal_changes([], {}, [goal_id])
+    except NotFound:
         raise ValueError(f"Goal {goal_id} not found")
-    
-    doc_ref.delete()
-    return {"status": "success", "message": f"Goal {goal_id} deleted"}
\ No newline at end of file
+    await version_service.bump(*owners.values())
+    for user_id in owners.values():
+        events_service.publish_goals(user_id, deleted=[goal_id])
+
+    return {"status": "success", "message": f"Goal {goal_id} deleted"}
+
+
+async def apply_goal_batch(batch: GoalBatchInput):
+    """
+    Create, contribute to and delete goals in one atomic commit (used by
+    recurring auto-save jobs). Raises NotFound, changing nothing, if any
+    referenced goal is missing.
+    """
+    if len(batch.create) + len(batch.contribute) + len(batch.delete) > GOAL_BATCH_LIMIT:
+        raise ValueError(f"At most {GOAL_BATCH_LIMIT} operations per batch")
+
+    increments = {}
+    for c in batch.contribute:
+        increments[c.goal_id] = increments.get(c.goal_id, 0) + c.amount
+    deletes = list(dict.fromkeys(batch.delete))
+    if set(increments) & set(deletes):
+        raise ValueError("A goal cannot be contributed to and deleted in the same batch")
+
+    records = [_goal_record(g) for g in batch.create]
+    # Goals are addressed by id alone; the commit reports whose data it changed
+    new_ids, progress, owners = await repo.apply_goal_changes(records, increments, deletes)
+    await version_service.bump(*owners.values(), *(record["user_id"] for record in records))
+
+    # One delta per user, like the commit that produced it
+    deltas = {}
+    def delta(user_id):
+        return deltas.setdefault(user_id, {"created": [], "updated": [], "deleted": []})
+    for goal_id, record in zip(new_ids, records):
+        delta(record["user_id"])["created"].append(_goal_view({"id": goal_id, **record}))
+    for goal_id, amount in progress.items():
+        delta(owners[goal_id])["updated"].append({"goal_id": goal_id, "current_amount": amount})
+    for goal_id in deletes:
+        delta(owners[goal_id])["deleted"].append(goal_id)
+    for user_id, changes in deltas.items():
+        events_service.publish_goals(user_id, **changes)
+
+    return {
+        "created": [_created(goal_id, record) for goal_id, record in zip(new_ids, records)],
+        "updated": [{"goal_id": goal_id, "current_amount": amount} for goal_id, amount in progress.items()],
+        "deleted": deletes,
+    }
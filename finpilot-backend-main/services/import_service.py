@@ -0,0 +1,213 @@
+import asyncio
+import codecs
+import csv
+import json
+from collections import deque
+from pydantic import ValidationError
+from database import repo
+from schemas.transaction import TransactionInput
+from services import allocation_service, events_service, version_service
+from services.finance_service import invalidate_wrapped_snapshots, transaction_keys
+
+# Rows per atomic commit (Firestore allows 500 writes per commit; leave room for rollups)
+IMPORT_BATCH_SIZE = 400
+# Cap on per-row errors returned so a bad file cannot grow the response without bound
+MAX_REPORTED_ERRORS = 1000
+# Longest CSV record or JSON line accepted, newlines included; parsing never
+# holds much more than this
+MAX_RECORD_CHARS = 64 * 1024
+
+
+async def _lines(stream):
+    """
+    Decode a byte stream into lines without holding more than one chunk.
+    Lines longer than MAX_RECORD_CHARS are cut to MAX_RECORD_CHARS + 1
+    characters, so the parsers can reject them without holding them whole.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")[:MAX_RECORD_CHARS + 1]
+        pending = pending[:MAX_RECORD_CHARS + 1]
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")[:MAX_RECORD_CHARS + 1]
+
+
+class _LineBuffer:
+    """Lines read ahead of a csv.reader, which pulls them synchronously."""
+
+    def __init__(self):
+        self.lines = deque()
+        self.chars = 0   # buffered
+        self.taken = 0   # handed to the reader so far
+        self.starved = False
+
+    def push(self, line: str):
+        line += "\n"
+        self.lines.append(line)
+        self.chars += len(line)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            self.starved = True
+            raise StopIteration
+        line = self.lines.popleft()
+        self.chars -= len(line)
+        self.taken += len(line)
+        return line
+
+
+async def _csv_rows(lines):
+    """
+    Yield (line number, row dict or error message) for each CSV record.
+
+    More than MAX_RECORD_CHARS is read ahead before each record, so the
+    reader only runs out of lines inside a record at the end of the file
+    (an unterminated quoted field) or in one longer than that; where such a
+    record ends cannot be told, so reading stops there.
+    """
+    buffer = _LineBuffer()
+    reader = csv.reader(buffer)
+    header = None
+    ended = False
+    while True:
+        while not ended and buffer.chars <= MAX_RECORD_CHARS:
+            line = await anext(lines, None)
+            if line is None:
+                ended = True
+            else:
+                buffer.push(line)
+
+        record_line = reader.line_num + 1
+        start = buffer.taken
+        buffer.starved = False
+        try:
+            fields = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield record_line, f"Invalid CSV: {e}"
+            continue
+        if buffer.starved and ended:
+            yield record_line, "Unterminated quoted field"
+            return
+        if buffer.taken - start > MAX_RECORD_CHARS:
+            yield record_line, f"Record longer than {MAX_RECORD_CHARS} characters; the rest of the file was not read"
+            return
+
+        if not fields or (len(fields) == 1 and not fields[0].strip()):
+            continue
+        if header is None:
+            header = [h.strip().lower() for h in fields]
+        elif len(fields) != len(header):
+            yield record_line, f"Expected {len(header)} columns, found {len(fields)}"
+        else:
+            yield record_line, dict(zip(header, fields))
+
+
+async def _jsonl_rows(lines):
+    """Yield (line number, row dict or error message) for each JSON line."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        if len(line) > MAX_RECORD_CHARS:
+            yield line_no, f"Line longer than {MAX_RECORD_CHARS} characters"
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e.msg}"
+            continue
+        if isinstance(row, dict):
+            yield line_no, row
+        else:
+            yield line_no, "Expected a JSON object"
+
+
+def _validate(user_id: str, raw: dict) -> dict:
+    # Empty CSV cells fall back to the TransactionInput defaults
+    raw = {k: v for k, v in raw.items() if v not in ("", None)}
+    if raw.setdefault("user_id", user_id) != user_id:
+        raise ValueError("user_id does not match the import")
+    try:
+        data = TransactionInput(**raw)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+    return {**data.model_dump(), **transaction_keys(data.date)}
+
+
+async def _commit(batch: list, committed_months: set) -> list:
+    ids = await repo.add_transactions(batch)
+    allocation_service.record_transactions(batch)
+    committed_months.update(txn["month"] for txn in batch)
+    return ids
+
+
+async def import_transactions(user_id: str, stream, fmt: str = "csv"):
+    """
+    Import a statement for one user from an async byte stream ("csv" or "jsonl").
+
+    Rows are validated as they arrive and written in atomic batches of
+    IMPORT_BATCH_SIZE; the next batch is parsed while the previous one
+    commits, so memory stays bounded by two batches whatever the file size.
+    """
+    lines = _lines(stream)
+    rows = _csv_rows(lines) if fmt == "csv" else _jsonl_rows(lines)
+
+    imported = 0
+    failed = 0
+    errors = []
+    committed_months = set()
+    batch = []
+    in_flight = None
+
+    try:
+        async for row_no, raw in rows:
+            try:
+                if isinstance(raw, str):
+                    raise ValueError(raw)
+                txn = _validate(user_id, raw)
+            except ValueError as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row_no, "error": str(e)})
+                continue
+
+            batch.append(txn)
+            if len(batch) == IMPORT_BATCH_SIZE:
+                if in_flight is not None:
+                    imported += len(await in_flight)
+                in_flight = asyncio.ensure_future(_commit(batch, committed_months))
+                batch = []
+
+        if in_flight is not None:
+            imported += len(await in_flight)
+        if batch:
+            imported += len(await _commit(batch, committed_months))
+    finally:
+        # A failed batch still leaves the earlier ones committed
+        if in_flight is not None and not in_flight.done():
+            await asyncio.wait([in_flight])
+        for month in sorted(committed_months):
+            await invalidate_wrapped_snapshots(user_id, month)
+        if committed_months:
+            await version_service.bump(user_id)
+            events_service.publish_months(user_id, committed_months)
+
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
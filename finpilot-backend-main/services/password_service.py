@@ -0,0 +1,100 @@
+"""
+bcrypt hashing on a dedicated process pool.
+
+bcrypt is deliberately slow CPU work. Running it in the request threadpool
+lets a burst of logins starve every other endpoint, so hash/verify jobs go to
+a small pool of worker processes instead. The number of jobs waiting or
+running is capped; past the cap callers get PasswordHasherBusy right away
+rather than queueing behind the storm.
+
+This module must stay free of database / Firebase imports: worker processes
+are spawned and import it fresh.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import bcrypt
+from config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hash/verify jobs are already queued."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the parent already runs gRPC / SQLite threads
+        _pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _discard(pool: ProcessPoolExecutor):
+    # A worker that died (OOM kill, crash) breaks the executor for good
+    global _pool
+    if _pool is pool:
+        _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(fn, *args):
+    global _in_flight
+    if _in_flight >= PASSWORD_HASH_QUEUE_LIMIT:
+        raise PasswordHasherBusy("Too many authentication requests, try again shortly")
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # Once, on a fresh pool: a job that kills its worker every time
+            # should not take a new pool down with it on every request
+            _discard(pool)
+            return await loop.run_in_executor(_get_pool(), fn, *args)
+    finally:
+        _in_flight -= 1
+
+
+def hash_cost(hashed: str) -> int:
+    """Work factor encoded in a bcrypt hash ("$2b$12$..." -> 12), 0 if unreadable."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed: str) -> bool:
+    return hash_cost(hashed) < BCRYPT_ROUNDS
+
+
+async def hash_password(password: str) -> str:
+    return await _submit(_hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _submit(_verify, password, hashed)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,155 @@
+"""
+Monte Carlo projections for savings goals.
+
+Each goal is simulated month by month over PATHS return paths, up to its
+deadline (the whole months left until it; duration_months for goals
+without one): the monthly contribution goes in at the start of the month,
+then the balance grows by that month's return. Returns are lognormal around the plan's expected
+annual return (PLANS); a Recurring Deposit has no volatility, so all its
+paths are the same.
+
+All of a user's goals are simulated together, as (goals x paths) arrays
+stepped through the months. Every goal is driven by the same standard
+normal draws from SEED (common random numbers), so a goal's result depends
+only on its own parameters: the same goal projects the same whether it is
+simulated alone or with others, which is what lets results be cached per
+goal, keyed by those parameters.
+
+The final balance is linear in the monthly amount (growth of what is
+already saved + monthly amount x growth of one unit paid in each month),
+so the monthly amount that reaches the target on a path is solved for
+directly; its REQUIRED_PROBABILITY quantile over the paths is the amount
+that reaches the target that often.
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import date
+from typing import List, Optional
+import numpy as np
+from services.ai_service import suggest_investment_plan
+
+PATHS = 10_000
+SEED = 2026
+# Percentiles of the balance reported at each year end and at the deadline
+PERCENTILES = (10, 25, 50, 75, 90)
+# Chance of reaching the target that required_monthly_amount is sized for
+REQUIRED_PROBABILITY = 0.9
+# Longer goals are projected over this many months
+MAX_HORIZON_MONTHS = 600
+# Goals whose projection is kept; least recently used are dropped past this
+CACHE_SIZE = 10_000
+
+# Plan name (as suggested by ai_service) -> (expected annual return, annual volatility)
+PLANS = {
+    "Recurring Deposit (RD)": (0.06, 0.0),
+    "SIP (Index Fund)": (0.12, 0.15),
+}
+
+_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+
+
+def _months_until(deadline: Optional[str], today: date) -> Optional[int]:
+    """Whole months from today to an ISO date deadline; None if it is missing or unreadable."""
+    try:
+        end = date.fromisoformat(deadline[:10])
+    except (TypeError, ValueError):
+        return None
+    return (end.year - today.year) * 12 + end.month - today.month - (end.day < today.day)
+
+
+def _parameters(goal: dict) -> tuple:
+    """(target, current, monthly amount, months, plan) as the simulation sees them."""
+    target = float(goal.get("target_amount", 0.0))
+    months = _months_until(goal.get("deadline"), date.today())
+    if months is None:
+        months = int(goal.get("duration_months", 12))
+    # A deadline this month or already past leaves one month to save in
+    months = max(1, min(months, MAX_HORIZON_MONTHS))
+    plan = goal.get("suggestion")
+    if plan not in PLANS:
+        plan = suggest_investment_plan(target, months)["suggestion"]
+    monthly = goal.get("monthly_amount") or target / months
+    return target, float(goal.get("current_amount", 0.0)), float(monthly), months, plan
+
+
+def simulate(goals: List[tuple], paths: int = PATHS, seed: int = SEED) -> List[dict]:
+    """Project goals given as _parameters() tuples in one vectorized run."""
+    target, current, monthly = (np.array([g[i] for g in goals], dtype=np.float64) for i in range(3))
+    months = np.array([g[3] for g in goals], dtype=np.int64)
+    annual_return, volatility = np.array([PLANS[g[4]] for g in goals], dtype=np.float64).T
+    sigma = volatility / np.sqrt(12)
+    # Lognormal monthly growth whose mean compounds to the annual return
+    drift = np.log1p(annual_return) / 12 - sigma ** 2 / 2
+
+    # Drawn a month at a time: month n gets the same draws whatever the horizon
+    rng = np.random.default_rng(seed)
+
+    saved_growth = np.ones((len(goals), paths))   # growth of the amount already saved
+    unit_growth = np.zeros((len(goals), paths))   # value of 1 paid in every month so far
+    bands = [[] for _ in goals]
+    for month in range(int(months.max())):
+        active = (month < months)[:, None]
+        growth = np.exp(drift[:, None] + sigma[:, None] * rng.standard_normal(paths))
+        saved_growth = np.where(active, saved_growth * growth, saved_growth)
+        unit_growth = np.where(active, (unit_growth + 1) * growth, unit_growth)
+
+        elapsed = month + 1
+        reporting = (elapsed <= months) & ((elapsed % 12 == 0) | (elapsed == months))
+        if reporting.any():
+            rows = np.flatnonzero(reporting)
+            balance = current[rows, None] * saved_growth[rows] + monthly[rows, None] * unit_growth[rows]
+            values = np.percentile(balance, PERCENTILES, axis=1)
+            for column, row in enumerate(rows):
+                bands[row].append({
+                    "month": elapsed,
+                    **{f"p{p}": round(float(values[i, column]), 2) for i, p in enumerate(PERCENTILES)},
+                })
+
+    final = current[:, None] * saved_growth + monthly[:, None] * unit_growth
+    success = (final >= target[:, None]).mean(axis=1)
+    # Monthly amount that reaches the target on each path
+    needed = np.maximum((target[:, None] - current[:, None] * saved_growth) / unit_growth, 0.0)
+    required = np.quantile(needed, REQUIRED_PROBABILITY, axis=1)
+
+    return [
+        {
+            "success_probability": round(float(success[i]), 4),
+            "required_monthly_amount": round(float(required[i]), 2),
+            "bands": bands[i],
+        }
+        for i in range(len(goals))
+    ]
+
+
+async def project_goals(goals: List[dict], paths: int = PATHS, seed: int = SEED) -> List[dict]:
+    """
+    Projection of each goal view (goal_service.get_user_goals), in order.
+    Goals already projected with the same parameters come from the cache;
+    the rest are simulated in one batch, off the event loop.
+    """
+    keys = [(*_parameters(goal), paths, seed) for goal in goals]
+    results = {key: _cache[key] for key in keys if key in _cache}
+    missing = [key for key in dict.fromkeys(keys) if key not in results]
+    if missing:
+        simulated = await asyncio.to_thread(simulate, [key[:5] for key in missing], paths, seed)
+        results.update(zip(missing, simulated))
+    for key in dict.fromkeys(keys):
+        _cache[key] = results[key]
+        _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    projections = []
+    for goal, key in zip(goals, keys):
+        target, current, monthly, months, plan = key[:5]
+        projections.append({
+            "goal_id": goal["goal_id"],
+            "name": goal["name"],
+            "plan": plan,
+            "target_amount": target,
+            "current_amount": current,
+            "monthly_amount": monthly,
+            "duration_months": months,
+            **results[key],
+        })
+    return projections
@@ -0,0 +1,131 @@
+"""
+Columnar transaction frame for vectorized aggregations.
+
+A frame holds a user's transactions as parallel NumPy arrays instead of a
+list of dicts:
+
+    amount          float64
+    category_code   int64, index into `categories`
+    ordinal         int64 day number (date.toordinal)
+    is_debit        bool
+    is_credit       bool
+
+It is built from the TransactionRecord tuples returned by
+repo.list_transaction_records_between, so no per-record dict is ever
+materialized.
+
+Group-bys are np.bincount calls over the integer codes, which add the
+weights in row order like the Python loops they replace. Ties go to the
+key seen first among the selected rows, the order the dict-based code used.
+"""
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Iterable, List
+import numpy as np
+from repositories.base import TransactionRecord
+
+
+class TransactionFrame:
+    __slots__ = ("amount", "category_code", "categories", "ordinal", "is_debit", "is_credit", "rows")
+
+    def __init__(self, rows: List[tuple]):
+        """rows: one TransactionRecord-ordered tuple per transaction."""
+        self.rows = rows
+        n = len(rows)
+        # One C-level pass per column; transposing with zip(*rows) costs more
+        # A missing amount (None) becomes NaN; count it as 0 like record.get("amount", 0)
+        self.amount = np.nan_to_num(
+            np.fromiter(map(itemgetter(0), rows), dtype=np.float64, count=n), copy=False,
+        )
+        types = np.array(list(map(itemgetter(1), rows)), dtype=object)
+        self.is_debit = types == "debit"
+        self.is_credit = types == "credit"
+        index: Dict[str, int] = {}
+        self.category_code = np.fromiter(
+            (index.setdefault("misc" if c is None else c, len(index)) for c in map(itemgetter(2), rows)),
+            dtype=np.int64, count=n,
+        )
+        self.categories = list(index)
+        self.ordinal = np.fromiter(map(itemgetter(3), rows), dtype=np.int64, count=n)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def record(self, i: int) -> dict:
+        """Row i as a dict; the stored date string is always the ISO form of date_ordinal."""
+        record = dict(zip(TransactionRecord._fields, self.rows[i]))
+        record["date"] = date.fromordinal(record["date_ordinal"]).isoformat()
+        return record
+
+    def between(self, start: date, end: date) -> np.ndarray:
+        """Row mask for dates in [start, end)."""
+        return (self.ordinal >= start.toordinal()) & (self.ordinal < end.toordinal())
+
+    def total(self, mask: np.ndarray) -> float:
+        return float(self.amount[mask].sum())
+
+    # ── Group-bys ──
+    def _first_seen(self, keys: np.ndarray, mask: np.ndarray, size: int) -> np.ndarray:
+        """Row index at which each key first appears among the masked rows (len(self) if never)."""
+        first = np.full(size, len(self), dtype=np.int64)
+        np.minimum.at(first, keys[mask], np.flatnonzero(mask))
+        return first
+
+    def category_totals(self, mask: np.ndarray) -> Dict[str, float]:
+        """{category: summed amount}, ordered by descending amount, ties by first appearance."""
+        size = len(self.categories)
+        totals = np.bincount(self.category_code[mask], weights=self.amount[mask], minlength=size)
+        first = self._first_seen(self.category_code, mask, size)
+        seen = first < len(self)
+        order = np.lexsort((first, -totals))
+        return {self.categories[i]: float(totals[i]) for i in order if seen[i]}
+
+    def most_frequent_category(self, mask: np.ndarray):
+        """Category with the most masked rows (first appearance wins ties), or None."""
+        if not mask.any():
+            return None
+        size = len(self.categories)
+        counts = np.bincount(self.category_code[mask], minlength=size)
+        first = self._first_seen(self.category_code, mask, size)
+        return self.categories[int(np.lexsort((first, -counts))[0])]
+
+    def weekday_totals(self, mask: np.ndarray) -> np.ndarray:
+        """Summed amount per weekday, index 0 = Monday (day 1 of the calendar is a Monday)."""
+        return np.bincount((self.ordinal[mask] - 1) % 7, weights=self.amount[mask], minlength=7)
+
+    def top_weekday(self, mask: np.ndarray):
+        """Weekday index with the highest total (first appearance wins ties), or None."""
+        if not mask.any():
+            return None
+        weekdays = (self.ordinal - 1) % 7
+        totals = self.weekday_totals(mask)
+        first = self._first_seen(weekdays, mask, 7)
+        return int(np.lexsort((first, -totals))[0])
+
+    def daily_totals(self, mask: np.ndarray, month_start: date, days: int) -> np.ndarray:
+        """Summed amount per day of the month, index 0 = day 1. Masked rows must fall in the month."""
+        return np.bincount(self.ordinal[mask] - month_start.toordinal(),
+                           weights=self.amount[mask], minlength=days)[:days]
+
+    def weekly_totals(self, mask: np.ndarray, month_start: date, weeks: int = 4) -> np.ndarray:
+        """Summed amount per 7-day bin from the month start; the last bin takes the remaining days."""
+        bins = np.minimum((self.ordinal[mask] - month_start.toordinal()) // 7, weeks - 1)
+        return np.bincount(bins, weights=self.amount[mask], minlength=weeks)
+
+    def largest(self, mask: np.ndarray):
+        """Record with the largest amount among the masked rows (earliest row wins ties), or None."""
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return None
+        return self.record(int(rows[np.argmax(self.amount[rows])]))
+
+
+def longest_run(flags: Iterable[bool]) -> int:
+    """Length of the longest run of True values."""
+    flags = np.asarray(flags, dtype=bool)
+    if not flags.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
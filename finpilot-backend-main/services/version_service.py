@@ -0,0 +1,73 @@
+"""
+Per-user data versions and the ETags derived from them.
+
+Every write to a user's data bumps their version after the write lands, so
+a response built from data at version N is never tagged with a later one.
+GET endpoints read the version before building the payload: when the
+client's If-None-Match already names it they answer 304 without reading any
+data or recomputing anything.
+
+Versions are cached in process. Bumps made here update the cache at once;
+versions read from storage are re-read after DATA_VERSION_CACHE_SECONDS.
+"""
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+from fastapi import Request, Response
+from config import DATA_VERSION_CACHE_SECONDS
+from database import repo
+
+# Users whose version is kept; least recently used are dropped past this
+CACHE_SIZE = 100_000
+
+_cache: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (version, read at)
+
+
+def _remember(user_id: str, version: int, read_at: float):
+    cached = _cache.get(user_id)
+    # Concurrent bumps can finish out of order; never step back
+    if cached is not None and cached[0] > version:
+        version = cached[0]
+    _cache[user_id] = (version, read_at)
+    _cache.move_to_end(user_id)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def current(user_id: str) -> int:
+    cached = _cache.get(user_id)
+    now = time.monotonic()
+    if cached is not None and now - cached[1] < DATA_VERSION_CACHE_SECONDS:
+        _cache.move_to_end(user_id)
+        return cached[0]
+    version = await repo.get_data_version(user_id)
+    _remember(user_id, version, now)
+    return version
+
+
+async def bump(*user_ids: str):
+    """Call after a write to these users' data has been committed."""
+    for user_id in dict.fromkeys(user_ids):
+        version = await repo.bump_data_version(user_id)
+        # A bump made here is authoritative until the next expiry check
+        _remember(user_id, version, time.monotonic())
+
+
+async def etag(user_id: str) -> str:
+    # The day is part of the tag: Wrapped and defaulted month/year parameters
+    # depend on the date as well as on the data
+    return f'W/"{await current(user_id)}-{date.today().toordinal()}"'
+
+
+async def conditional(request: Request, response: Response, user_id: str) -> Optional[Response]:
+    """
+    A 304 response if the client's If-None-Match matches the user's current
+    ETag; otherwise None, with the ETag set on `response`.
+    """
+    tag = await etag(user_id)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if tag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
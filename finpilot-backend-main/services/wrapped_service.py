@@ -1,7 +1,12 @@
-from database import db
-from collections import defaultdict
-from datetime import datetime, timedelta
+from config import WRAPPED_PRECOMPUTED_ONLY
+from database import repo
+from services.finance_service import month_bounds
+from services.transaction_frame import TransactionFrame, longest_run
+from datetime import date
+import asyncio
 import calendar
+import time
+import numpy as np
 
 CATEGORY_ICONS = {
     "rent": "🏠",
@@ -35,181 +40,108 @@ FUN_COMPARISONS = [
 ]
 
 
-def _get_previous_month_totals(user_id: str, year: int, month: int):
-    """Get income/expenses for the previous month for comparison."""
-    if month == 1:
-        prev_year, prev_month = year - 1, 12
-    else:
-        prev_year, prev_month = year, month - 1
+# A precompute run that has not reported progress for this long is taken to
+# have died, and its month's recaps are computed on demand again
+PRECOMPUTE_HEARTBEAT_TIMEOUT = 15 * 60
 
-    prev_prefix = f"{prev_year}-{str(prev_month).zfill(2)}"
 
-    txns_ref = db.collection("transactions").where("user_id", "==", user_id).stream()
-    prev_income = 0.0
-    prev_expenses = 0.0
+class WrappedNotReady(Exception):
+    """A closed month's recap is queued in a running precompute (WRAPPED_PRECOMPUTED_ONLY)."""
+
 
-    for doc in txns_ref:
-        t = doc.to_dict()
-        if t.get("date", "").startswith(prev_prefix):
-            amount = t.get("amount", 0)
-            if t.get("type", "") == "credit":
-                prev_income += amount
-            elif t.get("type", "") == "debit":
-                prev_expenses += amount
+async def _precompute_running(month_prefix: str) -> bool:
+    heartbeat = await repo.get_precompute_heartbeat(month_prefix)
+    return heartbeat is not None and time.time() - heartbeat < PRECOMPUTE_HEARTBEAT_TIMEOUT
 
-    # Also check salary
-    salaries_ref = db.collection("salaries").where("user_id", "==", user_id).stream()
-    for doc in salaries_ref:
-        s = doc.to_dict()
-        if s.get("month", "") == prev_prefix:
-            sal = s.get("amount", 0)
-            if sal > prev_income:
-                prev_income = sal
 
-    return prev_income, prev_expenses
+def _previous_month(year: int, month: int):
+    if month == 1:
+        return year - 1, 12
+    return year, month - 1
+
+
+async def get_wrapped_summary(user_id: str, year: int, month: int):
+    """
+    Monthly wrapped summary for a user. Months that have ended are computed
+    once and then served from a frozen snapshot, which writes dated in that
+    month (or the month before it) invalidate. With WRAPPED_PRECOMPUTED_ONLY
+    a missing snapshot raises WrappedNotReady while precompute_wrapped.py is
+    working through that month, instead of being computed live. The goals
+    summary is never frozen; it is read live on every request.
+    """
+    month_prefix = f"{year}-{str(month).zfill(2)}"
+    _, month_end = month_bounds(year, month)
+    if month_end > date.today():
+        summary, goals = await asyncio.gather(
+            _compute_wrapped_summary(user_id, year, month), repo.list_goals(user_id)
+        )
+        return _with_goals(summary, goals)
+
+    snapshot, goals = await asyncio.gather(
+        repo.get_wrapped_snapshot(user_id, month_prefix), repo.list_goals(user_id)
+    )
+    summary = snapshot.summary
+    if summary is None:
+        if WRAPPED_PRECOMPUTED_ONLY and await _precompute_running(month_prefix):
+            raise WrappedNotReady(f"Your {MONTH_NAMES[month - 1]} Wrapped is still being prepared")
+        summary = await _compute_wrapped_summary(user_id, year, month)
+        # Not stored if a write invalidated the month while it was computed
+        await repo.save_wrapped_snapshot(user_id, month_prefix, summary, snapshot.generation)
+    return _with_goals(summary, goals)
+
+
+async def precompute_wrapped_summary(user_id: str, year: int, month: int, force: bool = False) -> bool:
+    """
+    Snapshot a closed month's summary ahead of time (see precompute_wrapped.py).
+    Returns False when a snapshot already existed and force is not set, or
+    when a write invalidated the month while it was being computed.
+    """
+    month_prefix = f"{year}-{str(month).zfill(2)}"
+    snapshot = await repo.get_wrapped_snapshot(user_id, month_prefix)
+    if not force and snapshot.summary is not None:
+        return False
+    summary = await _compute_wrapped_summary(user_id, year, month)
+    return await repo.save_wrapped_snapshot(user_id, month_prefix, summary, snapshot.generation)
 
 
-def get_wrapped_summary(user_id: str, year: int, month: int):
+async def _compute_wrapped_summary(user_id: str, year: int, month: int):
     """Generate a monthly wrapped summary for a user."""
     month_prefix = f"{year}-{str(month).zfill(2)}"
-    days_in_month = calendar.monthrange(year, month)[1]
+    prev_year, prev_month = _previous_month(year, month)
+    prev_prefix = f"{prev_year}-{str(prev_month).zfill(2)}"
 
-    # ── 1. Fetch all transactions for the month ──
-    txns_ref = db.collection("transactions").where("user_id", "==", user_id).stream()
-
-    all_transactions = []
-    for doc in txns_ref:
-        t = doc.to_dict()
-        t["id"] = doc.id
-        if t.get("date", "").startswith(month_prefix):
-            all_transactions.append(t)
-
-    # ── 2. Fetch salary for the month ──
-    salaries_ref = db.collection("salaries").where("user_id", "==", user_id).stream()
-    month_salary = 0
-    for doc in salaries_ref:
-        s = doc.to_dict()
-        if s.get("month", "") == month_prefix:
-            month_salary = s.get("amount", 0)
-
-    # ── 3. Fetch goals (active) ──
-    goals_ref = db.collection("savings_goals").where("user_id", "==", user_id).stream()
-    goals = []
-    for doc in goals_ref:
-        g = doc.to_dict()
-        g["id"] = doc.id
-        goals.append(g)
-
-    # ── 4. Fetch user name ──
-    users_ref = db.collection("users").where("user_id", "==", user_id).limit(1).stream()
-    user_name = "User"
-    for doc in users_ref:
-        u = doc.to_dict()
-        user_name = u.get("name", "User")
-
-    # ── 5. Process transactions ──
-    total_income = 0.0
-    total_expenses = 0.0
-    category_spending = defaultdict(float)
-    category_count = defaultdict(int)
-    day_of_week_spending = defaultdict(float)
-    daily_spending = defaultdict(float)
-    biggest_txn = None
+    # ── 1. Fetch everything concurrently ──
+    # One range read covers both the previous and the current month
+    prev_start, _ = month_bounds(prev_year, prev_month)
+    _, month_end = month_bounds(year, month)
 
-    for t in all_transactions:
-        amount = t.get("amount", 0)
-        txn_type = t.get("type", "")
-        category = t.get("category", "misc")
-        date_str = t.get("date", "")
-
-        if txn_type == "credit":
-            total_income += amount
-        elif txn_type == "debit":
-            total_expenses += amount
-            category_spending[category] += amount
-            category_count[category] += 1
-
-            # Day-level tracking
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                day_of_week_spending[dt.weekday()] += amount
-                daily_spending[dt.day] += amount
-            except (ValueError, TypeError):
-                pass
-
-            # Biggest transaction
-            if biggest_txn is None or amount > biggest_txn["amount"]:
-                biggest_txn = {
-                    "amount": amount,
-                    "category": category,
-                    "date": date_str,
-                    "description": t.get("description", ""),
-                }
+    rows, salaries, user = await asyncio.gather(
+        repo.list_transaction_records_between(user_id, prev_start, month_end),
+        repo.get_salaries(user_id, [prev_prefix, month_prefix]),
+        repo.get_user(user_id),
+    )
 
-    # Salary-based income if higher
-    if month_salary > total_income:
-        total_income = month_salary
+    summary, _ = _summarize_month(TransactionFrame(rows), year, month, salaries, _user_name(user))
+    return summary
 
-    total_savings = total_income - total_expenses
-    savings_rate = (total_savings / total_income * 100) if total_income > 0 else 0
 
-    # ── 6. Comparison with previous month ──
-    prev_income, prev_expenses = _get_previous_month_totals(user_id, year, month)
-    prev_savings = prev_income - prev_expenses
+def _user_name(user) -> str:
+    return user.get("name", "User") if user else "User"
 
-    income_change = ((total_income - prev_income) / prev_income * 100) if prev_income > 0 else 0
-    expense_change = ((total_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0
-    savings_change = ((total_savings - prev_savings) / abs(prev_savings) * 100) if prev_savings != 0 else 0
 
-    # ── 7. Build top categories ──
-    sorted_cats = sorted(category_spending.items(), key=lambda x: x[1], reverse=True)
-    top_categories = []
-    for cat, amt in sorted_cats[:5]:
-        pct = (amt / total_expenses * 100) if total_expenses > 0 else 0
-        top_categories.append({
-            "category": cat,
-            "amount": round(amt, 2),
-            "percentage": round(pct, 1),
-            "icon": CATEGORY_ICONS.get(cat, "📊"),
-        })
+def _with_goals(summary: dict, goals) -> dict:
+    """
+    Fill in the goals summary, which computed and snapshotted summaries leave
+    empty: goals are not month-scoped and keep changing after a month closes.
+    """
+    goals_summary = _goals_summary(goals)
+    summary["goals_summary"] = goals_summary
+    for month_summary in summary.get("months", ()):
+        month_summary["goals_summary"] = goals_summary
+    return summary
 
-    most_consistent = max(category_count, key=category_count.get) if category_count else "none"
 
-    # ── 8. Weekly breakdown ──
-    weekly_data = []
-    week_expenses = defaultdict(float)
-    week_income_map = defaultdict(float)
-
-    for t in all_transactions:
-        date_str = t.get("date", "")
-        amount = t.get("amount", 0)
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%d")
-            week_num = min((dt.day - 1) // 7, 3)  # 0-3 for weeks 1-4
-            if t.get("type", "") == "debit":
-                week_expenses[week_num] += amount
-            elif t.get("type", "") == "credit":
-                week_income_map[week_num] += amount
-        except (ValueError, TypeError):
-            pass
-
-    for w in range(4):
-        label = f"Week {w + 1}"
-        inc = round(week_income_map.get(w, 0), 2)
-        exp = round(week_expenses.get(w, 0), 2)
-        weekly_data.append({
-            "week_label": label,
-            "income": inc,
-            "expenses": exp,
-            "savings": round(inc - exp, 2),
-        })
-
-    highest_spending_week = f"Week {max(range(4), key=lambda w: week_expenses.get(w, 0)) + 1}" if week_expenses else "Week 1"
-    
-    week_savings = {w: week_income_map.get(w, 0) - week_expenses.get(w, 0) for w in range(4)}
-    best_savings_week = f"Week {max(range(4), key=lambda w: week_savings.get(w, 0)) + 1}"
-
-    # ── 9. Goals summary ──
+def _goals_summary(goals) -> dict:
     total_goals = len(goals)
     completed_goals = 0
     in_progress_goals = 0
@@ -225,7 +157,7 @@ def get_wrapped_summary(user_id: str, year: int, month: int):
         elif current > 0:
             in_progress_goals += 1
 
-    goals_summary = {
+    return {
         "total_goals": total_goals,
         "completed": completed_goals,
         "in_progress": in_progress_goals,
@@ -233,25 +165,114 @@ def get_wrapped_summary(user_id: str, year: int, month: int):
         "total_target": round(total_target_goals, 2),
     }
 
-    # ── 10. Fun stats ──
-    daily_avg = total_expenses / days_in_month if days_in_month > 0 else 0
+
+def _top_categories(category_spending: dict, total_expenses: float, limit: int = 5) -> list:
+    """category_spending must already be ordered by amount, largest first (see category_totals)."""
+    top_categories = []
+    for cat, amt in list(category_spending.items())[:limit]:
+        pct = (amt / total_expenses * 100) if total_expenses > 0 else 0.0
+        top_categories.append({
+            "category": cat,
+            "amount": round(amt, 2),
+            "percentage": round(pct, 1),
+            "icon": CATEGORY_ICONS.get(cat, "📊"),
+        })
+    return top_categories
+
+
+def _summarize_month(frame: TransactionFrame, year: int, month: int, salaries: dict, user_name: str):
+    """
+    Wrapped summary for one month, computed from a frame that covers the
+    month and the one before it. Also returns the month's per-day
+    under-budget flags so yearly streaks can run across month boundaries.
+    """
+    month_prefix = f"{year}-{str(month).zfill(2)}"
+    days_in_month = calendar.monthrange(year, month)[1]
+    prev_year, prev_month = _previous_month(year, month)
+    prev_prefix = f"{prev_year}-{str(prev_month).zfill(2)}"
+    prev_start, _ = month_bounds(prev_year, prev_month)
+    month_start, month_end = month_bounds(year, month)
+
+    # ── 2. Aggregate over a columnar frame ──
+    in_month = frame.between(month_start, month_end)
+    prev_month_rows = frame.between(prev_start, month_start)
+    debits = in_month & frame.is_debit
+    credits = in_month & frame.is_credit
+
+    total_transactions = int(in_month.sum())
+    total_income = frame.total(credits)
+    total_expenses = frame.total(debits)
+    prev_income = frame.total(prev_month_rows & frame.is_credit)
+    prev_expenses = frame.total(prev_month_rows & frame.is_debit)
+
+    category_spending = frame.category_totals(debits)
+    daily_spending = frame.daily_totals(debits, month_start, days_in_month)
+    week_expenses = frame.weekly_totals(debits, month_start)
+    week_income = frame.weekly_totals(credits, month_start)
+
+    biggest = frame.largest(debits)
+    biggest_txn = None
+    if biggest is not None:
+        biggest_txn = {
+            "amount": biggest.get("amount", 0),
+            "category": biggest.get("category", "misc"),
+            "date": biggest.get("date", ""),
+            "description": biggest.get("description") or "",
+        }
+
+    month_salary = salaries.get(month_prefix) or 0
+    prev_salary = salaries.get(prev_prefix) or 0
+
+    # Salary-based income if higher
+    if month_salary > total_income:
+        total_income = month_salary
+
+    total_savings = total_income - total_expenses
+    savings_rate = (total_savings / total_income * 100) if total_income > 0 else 0.0
+
+    # ── 3. Comparison with previous month ──
+    if prev_salary > prev_income:
+        prev_income = prev_salary
+    prev_savings = prev_income - prev_expenses
+
+    income_change = ((total_income - prev_income) / prev_income * 100) if prev_income > 0 else 0.0
+    expense_change = ((total_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0.0
+    savings_change = ((total_savings - prev_savings) / abs(prev_savings) * 100) if prev_savings != 0 else 0.0
+
+    # ── 4. Build top categories ──
+    top_categories = _top_categories(category_spending, total_expenses)
+
+    most_consistent = frame.most_frequent_category(debits) or "none"
+
+    # ── 5. Weekly breakdown ──
+    weekly_data = []
+    for w in range(4):
+        label = f"Week {w + 1}"
+        inc = round(float(week_income[w]), 2)
+        exp = round(float(week_expenses[w]), 2)
+        weekly_data.append({
+            "week_label": label,
+            "income": inc,
+            "expenses": exp,
+            "savings": round(inc - exp, 2),
+        })
+
+    highest_spending_week = f"Week {int(np.argmax(week_expenses)) + 1}"
+    best_savings_week = f"Week {int(np.argmax(week_income - week_expenses)) + 1}"
+
+    # ── 6. Fun stats ──
+    daily_avg = total_expenses / days_in_month if days_in_month > 0 else 0.0
     num_weeks = 4
-    txn_per_week = len(all_transactions) / num_weeks if num_weeks > 0 else 0
+    txn_per_week = total_transactions / num_weeks if num_weeks > 0 else 0.0
 
     # Top spending day of week
-    top_day_idx = max(day_of_week_spending, key=day_of_week_spending.get) if day_of_week_spending else 0
-    top_spending_day = DAY_NAMES[top_day_idx] if isinstance(top_day_idx, int) and top_day_idx < 7 else "Monday"
+    top_day_idx = frame.top_weekday(debits)
+    top_spending_day = DAY_NAMES[top_day_idx] if top_day_idx is not None else "Monday"
 
     # Streak: consecutive days spending under daily budget
     daily_budget = total_income / days_in_month if days_in_month > 0 and total_income > 0 else float('inf')
-    streak = 0
-    max_streak = 0
-    for day in range(1, days_in_month + 1):
-        if daily_spending.get(day, 0) <= daily_budget:
-            streak += 1
-            max_streak = max(max_streak, streak)
-        else:
-            streak = 0
+    under_budget = daily_spending <= daily_budget
+    max_streak = longest_run(under_budget)
 
     # Fun comparisons
     fun_comparisons = []
@@ -282,7 +303,7 @@ def get_wrapped_summary(user_id: str, year: int, month: int):
         "income_change": round(income_change, 1),
         "expense_change": round(expense_change, 1),
         "savings_change": round(savings_change, 1),
-        "total_transactions": len(all_transactions),
+        "total_transactions": total_transactions,
         "average_daily_spending": round(daily_avg, 2),
         "top_categories": top_categories,
         "most_consistent_category": most_consistent,
@@ -290,10 +311,95 @@ def get_wrapped_summary(user_id: str, year: int, month: int):
         "weekly_data": weekly_data,
         "highest_spending_week": highest_spending_week,
         "best_savings_week": best_savings_week,
-        "goals_summary": goals_summary,
+        "goals_summary": None,  # read live, see _with_goals
         "daily_average_spend": round(daily_avg, 2),
         "transactions_per_week": round(txn_per_week, 1),
         "top_spending_day_of_week": top_spending_day,
         "fun_comparisons": fun_comparisons,
         "streak_days_under_budget": max_streak,
+    }, under_budget
+
+
+async def get_wrapped_year(user_id: str, year: int):
+    """
+    Year in review: the twelve monthly summaries plus yearly totals. Years
+    that have ended are snapshotted like closed months (under the key "YYYY").
+    """
+    if date(year + 1, 1, 1) > date.today():
+        summary, goals = await asyncio.gather(_compute_wrapped_year(user_id, year), repo.list_goals(user_id))
+        return _with_goals(summary, goals)
+
+    snapshot, goals = await asyncio.gather(
+        repo.get_wrapped_snapshot(user_id, str(year)), repo.list_goals(user_id)
+    )
+    summary = snapshot.summary
+    if summary is None:
+        summary = await _compute_wrapped_year(user_id, year)
+        await repo.save_wrapped_snapshot(user_id, str(year), summary, snapshot.generation)
+    return _with_goals(summary, goals)
+
+
+async def _compute_wrapped_year(user_id: str, year: int):
+    # ── 1. Fetch everything concurrently ──
+    # One range read from the December before (January's comparison month)
+    # to the end of the year; every month is summarized from the same frame
+    months = [f"{year - 1}-12"] + [f"{year}-{str(m).zfill(2)}" for m in range(1, 13)]
+    year_start, next_year_start = date(year, 1, 1), date(year + 1, 1, 1)
+
+    rows, salaries, user = await asyncio.gather(
+        repo.list_transaction_records_between(user_id, date(year - 1, 12, 1), next_year_start),
+        repo.get_salaries(user_id, months),
+        repo.get_user(user_id),
+    )
+    frame = TransactionFrame(rows)
+    user_name = _user_name(user)
+
+    # ── 2. Monthly summaries ──
+    monthly = []
+    under_budget = []
+    for month in range(1, 13):
+        summary, flags = _summarize_month(frame, year, month, salaries, user_name)
+        monthly.append(summary)
+        under_budget.append(flags)
+
+    # Months and days that have not started yet don't count towards highlights
+    today = date.today()
+    started = [s for s in monthly if date(year, s["month"], 1) <= today]
+    days_started = max(0, min((today - year_start).days + 1, (next_year_start - year_start).days))
+    longest_streak = longest_run(np.concatenate(under_budget)[:days_started])
+
+    # ── 3. Yearly totals ──
+    # Sums of the monthly figures, so the recap adds up to what each month shows
+    total_income = sum(s["total_income"] for s in monthly)
+    total_expenses = sum(s["total_expenses"] for s in monthly)
+    total_savings = total_income - total_expenses
+    savings_rate = (total_savings / total_income * 100) if total_income > 0 else 0.0
+
+    year_debits = frame.between(year_start, next_year_start) & frame.is_debit
+    top_categories = _top_categories(frame.category_totals(year_debits), frame.total(year_debits))
+
+    def highlight(summary):
+        return {
+            "month": summary["month"],
+            "month_name": summary["month_name"],
+            "total_savings": summary["total_savings"],
+        }
+
+    best_month = highlight(max(started, key=lambda s: s["total_savings"])) if started else None
+    worst_month = highlight(min(started, key=lambda s: s["total_savings"])) if started else None
+
+    return {
+        "year": year,
+        "user_name": user_name,
+        "total_income": round(total_income, 2),
+        "total_expenses": round(total_expenses, 2),
+        "total_savings": round(total_savings, 2),
+        "savings_rate": round(savings_rate, 1),
+        "total_transactions": sum(s["total_transactions"] for s in monthly),
+        "top_categories": top_categories,
+        "best_month": best_month,
+        "worst_month": worst_month,
+        "longest_streak_days_under_budget": longest_streak,
+        "goals_summary": None,  # read live, see _with_goals
+        "months": monthly,
     }
@@ -0,0 +1,21 @@
+"""
+Tests run against the SQLite backend in memory; no Firebase project needed.
+
+    pip install pytest
+    python -m pytest -q
+"""
+import os
+import sys
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from repositories.sqlite_repo import SQLiteRepository  # noqa: E402
+
+
+@pytest.fixture
+def sqlite_repo():
+    """A fresh in-memory repository, separate from the app's."""
+    return SQLiteRepository(":memory:")
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from services.allocation_service import CATEGORY_CAP, SAVINGS_FLOOR
+from services.ai_service import predict_budget_allocation
+
+SALARY = 50000.0
+
+
+def _allocate(client, user_id, history):
+    """history: {month: {category: debit total}}; returns the allocation for 2026-06."""
+    rows = "".join(f"{amount},debit,{category},{month}-10,seed\n"
+                   for month, totals in history.items() for category, amount in totals.items())
+    if rows:
+        response = client.post("/transactions/import", params={"user_id": user_id, "format": "csv"},
+                               content="amount,type,category,date,description\n" + rows)
+        assert response.status_code == 200
+    response = client.post("/salary", json={"user_id": user_id, "amount": SALARY, "month": "2026-06"})
+    assert response.status_code == 200
+    return response.json()["predicted_allocation"]
+
+
+def test_full_history_is_capped_and_keeps_the_savings_floor():
+    spending = {"rent": 40000, "food": 15000, "transport": 10000, "savings": 8000}
+    with TestClient(app) as client:
+        allocation = _allocate(client, "alloc-full", {m: spending for m in ("2026-03", "2026-04", "2026-05")})
+
+    # rent capped at 25000, then 50000 of spending scaled into the 45000 left after the floor
+    assert allocation == {"rent": 22500.0, "food": 13500.0, "transport": 9000.0, "savings": 5000.0}
+    assert allocation["rent"] <= SALARY * CATEGORY_CAP
+    assert allocation["savings"] >= SALARY * SAVINGS_FLOOR
+    assert sum(allocation.values()) == SALARY
+
+
+def test_short_history_is_blended_with_the_default_split():
+    with TestClient(app) as client:
+        allocation = _allocate(client, "alloc-short", {"2026-05": {"rent": 10000, "food": 5000}})
+
+    # One month of the three for full confidence
+    default = predict_budget_allocation(SALARY)
+    assert allocation["rent"] == pytest.approx(10000 / 3 + default["rent"] * 2 / 3, abs=0.01)
+    assert allocation["food"] == pytest.approx(5000 / 3 + default["food"] * 2 / 3, abs=0.01)
+    assert allocation["misc"] == pytest.approx(default["misc"] * 2 / 3, abs=0.01)
+    assert sum(allocation.values()) == pytest.approx(SALARY, abs=0.001)
+
+
+def test_no_history_gets_the_default_split():
+    with TestClient(app) as client:
+        assert _allocate(client, "alloc-new", {}) == predict_budget_allocation(SALARY)
@@ -0,0 +1,63 @@
+import asyncio
+import gzip
+import json
+import brotli
+import httpx
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+from compression import MINIMUM_SIZE, CompressionMiddleware
+from main import app
+
+USER = "compress-user"
+ROWS = "amount,type,category,date,description\n" + "".join(
+    f"{100 + r},debit,food,2026-03-{(r % 28) + 1:02d},groceries run {r}\n" for r in range(60))
+DECODE = {"br": brotli.decompress, "gzip": gzip.decompress}
+
+
+def _raw(client, url, accept_encoding, **params):
+    with client.stream("GET", url, params={"user_id": USER, **params},
+                       headers={"Accept-Encoding": accept_encoding}) as response:
+        return response.status_code, response.headers, b"".join(response.iter_raw())
+
+
+def test_responses_are_compressed_as_negotiated():
+    with TestClient(app) as client:
+        assert client.post("/transactions/import", params={"user_id": USER, "format": "csv"},
+                           content=ROWS).status_code == 200
+        _, _, plain = _raw(client, "/dashboard/history", "identity", limit=60)
+        assert len(plain) >= MINIMUM_SIZE
+
+        for accept, expected in [("br, gzip", "br"), ("gzip, deflate", "gzip"), ("br;q=0, gzip", "gzip")]:
+            status, headers, body = _raw(client, "/dashboard/history", accept, limit=60)
+            assert status == 200
+            assert headers["content-encoding"] == expected
+            assert "Accept-Encoding" in headers["vary"]
+            assert int(headers["content-length"]) == len(body) < len(plain)
+            assert json.loads(DECODE[expected](body)) == json.loads(plain)
+
+        # Streamed page by page: compressed on the fly, no Content-Length
+        status, headers, body = _raw(client, "/dashboard/history", "br", format="ndjson")
+        assert headers["content-encoding"] == "br" and "content-length" not in headers
+        assert len(brotli.decompress(body).splitlines()) == 60
+
+        # Under MINIMUM_SIZE, and nothing the client accepts
+        _, headers, _ = _raw(client, "/", "br, gzip")
+        assert "content-encoding" not in headers
+        _, headers, body = _raw(client, "/dashboard/history", "deflate", limit=60)
+        assert "content-encoding" not in headers and body == plain
+
+
+def test_event_streams_are_never_compressed():
+    async def events(scope, receive, send):
+        frames = (f"event: tick\ndata: {'x' * MINIMUM_SIZE}\n\n" for _ in range(3))
+        await StreamingResponse(frames, media_type="text/event-stream")(scope, receive, send)
+
+    transport = httpx.ASGITransport(app=CompressionMiddleware(events))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/", headers={"Accept-Encoding": "br, gzip"})
+
+    response = asyncio.run(run())
+    assert "content-encoding" not in response.headers
+    assert response.text.count("event: tick") == 3
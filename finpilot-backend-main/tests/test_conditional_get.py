@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+from database import repo
+from main import app
+
+
+def test_write_then_conditional_get_is_not_stale():
+    with TestClient(app) as client:
+        url = "/dashboard/summary?user_id=etag-user&month=2026-03"
+        first = client.get(url)
+        tag = first.headers["etag"]
+        assert first.status_code == 200
+        assert client.get(url, headers={"If-None-Match": tag}).status_code == 304
+
+        client.post("/transactions", json={"user_id": "etag-user", "amount": 40.0, "type": "debit",
+                                           "category": "food", "date": "2026-03-02"})
+        after_write = client.get(url, headers={"If-None-Match": tag})
+        assert after_write.status_code == 200
+        assert after_write.json()["total_spent"] == 40.0
+        tag = after_write.headers["etag"]
+
+        # A write committed by another worker or instance bumps the stored version only
+        client.portal.call(repo.bump_data_version, "etag-user")
+        assert client.get(url, headers={"If-None-Match": tag}).status_code == 200
@@ -0,0 +1,53 @@
+import asyncio
+import time
+import pytest
+import database
+from repositories.sqlite_repo import SQLiteRepository
+
+
+def test_calls_before_creation_wait_off_the_loop(monkeypatch):
+    created = []
+
+    def slow_create():
+        time.sleep(0.3)  # firebase_admin / gRPC imports
+        created.append(SQLiteRepository(":memory:"))
+        return created[-1]
+
+    monkeypatch.setattr(database, "_create_repository", slow_create)
+    provider = database.RepositoryProvider()
+    repo = database.LazyRepository(provider)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while not provider.warm:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        warm_up = provider.start_warm_up()
+        results = await asyncio.gather(
+            repo.get_data_version("u1"),
+            repo.get_user("missing"),
+            ticker(),
+            warm_up,
+        )
+        user_ids = [user_id async for user_id in repo.list_user_ids()]
+        return results, ticks, user_ids
+
+    (version, user, _, _), ticks, user_ids = asyncio.run(run())
+    assert (version, user, user_ids) == (0, None, [])
+    assert ticks >= 10
+    assert len(created) == 1
+    assert repo.get_user.__self__ is created[0]
+
+
+def test_backend_attributes_are_forwarded_before_creation(monkeypatch):
+    monkeypatch.setattr(database, "_create_repository", lambda: SQLiteRepository(":memory:"))
+    repo = database.LazyRepository(database.RepositoryProvider())
+
+    assert repo.conn.execute("SELECT 1").fetchone()[0] == 1
+    assert asyncio.run(repo._run(lambda: 2)) == 2
+    with pytest.raises(AttributeError):
+        repo.no_such_attribute
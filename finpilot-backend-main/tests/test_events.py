@@ -0,0 +1,93 @@
+"""
+/events is driven through the ASGI app directly: httpx's ASGITransport
+buffers a response until its body ends, which a stream never does.
+"""
+import asyncio
+import json
+from urllib.parse import urlencode
+import httpx
+from database import repo
+from main import app
+from routers import events
+
+MONTH = "2026-03"
+
+
+class EventStream:
+    """An open /events connection that yields (event, data) frames."""
+
+    def __init__(self, user_id):
+        self.frames = asyncio.Queue()
+        self.closed = asyncio.Event()
+        self.requested = False
+        self.task = asyncio.create_task(app({
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/events", "raw_path": b"/events", "root_path": "",
+            "query_string": urlencode({"user_id": user_id, "month": MONTH}).encode(),
+            "headers": [(b"host", b"test")], "client": ("127.0.0.1", 0), "server": ("test", 80),
+        }, self._receive, self._send))
+
+    async def _receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            for block in message.get("body", b"").decode().split("\n\n"):
+                fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+                if "event" in fields:
+                    self.frames.put_nowait((fields["event"], json.loads(fields["data"])))
+
+    async def next(self):
+        return await asyncio.wait_for(self.frames.get(), 5)
+
+    async def close(self):
+        self.closed.set()
+        await self.task
+
+
+def test_snapshot_then_summary_and_goal_deltas():
+    async def run():
+        stream = EventStream("sse-user")
+        frames = [await stream.next(), await stream.next()]
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.post("/transactions", json={"user_id": "sse-user", "amount": 25.0, "type": "debit",
+                                                     "category": "food", "date": f"{MONTH}-04"})
+            frames.append(await stream.next())
+            # Dated in another month: no summary for this stream
+            await client.post("/transactions", json={"user_id": "sse-user", "amount": 5.0, "type": "debit",
+                                                     "category": "food", "date": "2026-01-04"})
+            created = await client.post("/savings/goal", json={"user_id": "sse-user", "target_amount": 100.0,
+                                                                "duration_months": 4})
+            frames.append(await stream.next())
+        await stream.close()
+        return stream.status, frames, created.json()["goal_id"]
+
+    status, frames, goal_id = asyncio.run(run())
+    assert status == 200
+    assert [name for name, _ in frames] == ["summary", "goals", "summary", "goal_delta"]
+    assert frames[0][1]["total_spent"] == 0
+    assert frames[1][1] == []
+    assert frames[2][1]["total_spent"] == 25.0
+    assert [goal["goal_id"] for goal in frames[3][1]["created"]] == [goal_id]
+
+
+def test_write_elsewhere_resyncs_at_the_keepalive(monkeypatch):
+    monkeypatch.setattr(events, "KEEPALIVE_SECONDS", 0.1)
+
+    async def run():
+        stream = EventStream("sse-other")
+        snapshot = [await stream.next(), await stream.next()]
+        # A write through another worker bumps the version without publishing here
+        await repo.bump_data_version("sse-other")
+        resync = [await stream.next(), await stream.next()]
+        await stream.close()
+        return snapshot, resync
+
+    snapshot, resync = asyncio.run(run())
+    assert [name for name, _ in snapshot] == [name for name, _ in resync] == ["summary", "goals"]
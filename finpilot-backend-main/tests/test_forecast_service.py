@@ -0,0 +1,17 @@
+from services.forecast_service import _forecast
+
+
+def test_spent_is_counted_once_at_the_start_of_the_month():
+    assert _forecast(1000.0, 1000.0, 0.0) == 2000.0
+    assert _forecast(0.0, 1000.0, 0.0) == 1000.0
+
+
+def test_month_on_its_usual_track_forecasts_the_typical_spend():
+    for elapsed in (0.1, 0.5, 0.9):
+        assert abs(_forecast(elapsed * 800.0, 800.0, elapsed) - 800.0) < 1e-9
+
+
+def test_month_end_and_no_history():
+    assert _forecast(750.0, 1000.0, 1.0) == 750.0
+    assert _forecast(300.0, None, 0.5) == 600.0
+    assert _forecast(300.0, None, 0.0) == 300.0
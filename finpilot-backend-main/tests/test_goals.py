@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from repositories.base import NotFound
+from schemas.goal import GoalInput
+from services.goal_service import _goal_record
+
+
+def _goal(user_id="u1", target=100.0, current=0.0):
+    return _goal_record(GoalInput(user_id=user_id, target_amount=target, duration_months=12,
+                                  current_amount=current))
+
+
+def test_contributions_are_clamped_to_the_target(sqlite_repo):
+    async def run():
+        (goal_id,), _, _ = await sqlite_repo.apply_goal_changes([_goal(current=60.0)], {}, [])
+        results = await asyncio.gather(*(
+            sqlite_repo.apply_goal_changes([], {goal_id: 30.0}, []) for _ in range(3)))
+        _, withdrawn, owners = await sqlite_repo.apply_goal_changes([], {goal_id: -25.0}, [])
+        return goal_id, [progress[goal_id] for _, progress, _ in results], withdrawn[goal_id], owners, \
+            await sqlite_repo.list_goals("u1")
+
+    goal_id, progress, withdrawn, owners, (goal,) = asyncio.run(run())
+    assert progress == [90.0, 100.0, 100.0]
+    assert withdrawn == 75.0
+    assert owners == {goal_id: "u1"}
+    assert goal["current_amount"] == 75.0
+
+
+def test_missing_goal_applies_nothing(sqlite_repo):
+    async def run():
+        (goal_id,), _, _ = await sqlite_repo.apply_goal_changes([_goal()], {}, [])
+        with pytest.raises(NotFound):
+            await sqlite_repo.apply_goal_changes([_goal()], {goal_id: 10.0}, ["missing"])
+        return goal_id, await sqlite_repo.list_goals("u1")
+
+    goal_id, goals = asyncio.run(run())
+    assert [(g["id"], g["current_amount"]) for g in goals] == [(goal_id, 0.0)]
+
+
+def test_delete_reports_the_owner(sqlite_repo):
+    async def run():
+        (goal_id,), _, _ = await sqlite_repo.apply_goal_changes([_goal(user_id="u2")], {}, [])
+        return goal_id, await sqlite_repo.apply_goal_changes([], {}, [goal_id])
+
+    goal_id, (_, progress, owners) = asyncio.run(run())
+    assert progress == {}
+    assert owners == {goal_id: "u2"}
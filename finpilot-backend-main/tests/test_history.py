@@ -0,0 +1,55 @@
+import base64
+import json
+from fastapi.testclient import TestClient
+from main import app
+
+USER = "history-user"
+# Two on the same day, so pages also split between rows that tie on date
+DATES = ["2026-01-05", "2026-01-20", "2026-01-20", "2026-02-03", "2026-02-14"]
+
+
+def _seed(client):
+    for i, day in enumerate(DATES):
+        category = "food" if i % 2 else "rent"
+        response = client.post("/transactions", json={"user_id": USER, "amount": 10.0 + i, "type": "debit",
+                                                       "category": category, "date": day})
+        assert response.status_code == 200
+
+
+def _pages(client, url, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"user_id": USER, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        items += response.json()
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items, pages
+
+
+def test_cursor_pages_match_the_full_stream():
+    with TestClient(app) as client:
+        _seed(client)
+        paged, pages = _pages(client, "/dashboard/history", 2)
+        streamed = client.get("/dashboard/history", params={"user_id": USER}).json()
+        lines = client.get("/dashboard/history", params={"user_id": USER, "format": "ndjson"}).text.splitlines()
+        food_paged, _ = _pages(client, "/dashboard/category/food", 1)
+
+    assert pages == 3
+    assert [t["id"] for t in paged] == [t["id"] for t in streamed] == [json.loads(line)["id"] for line in lines]
+    assert len({t["id"] for t in paged}) == len(DATES)
+    assert [t["date"] for t in paged] == sorted(DATES, reverse=True)
+    assert [t["amount"] for t in food_paged] == [13.0, 11.0]
+
+
+def test_bad_cursor_is_a_400():
+    wrong_types = base64.urlsafe_b64encode(b'["2026-01-05", 1]').decode().rstrip("=")
+    with TestClient(app) as client:
+        for cursor in ("not a cursor!", wrong_types):
+            for params in ({"limit": 2}, {}, {"format": "ndjson"}):
+                response = client.get("/dashboard/history",
+                                      params={"user_id": USER, "cursor": cursor, **params})
+                assert response.status_code == 400
+                assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,92 @@
+import asyncio
+from services import import_service
+from services.import_service import MAX_RECORD_CHARS, _csv_rows, _lines
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _parse(*chunks):
+    async def run():
+        return [row async for row in _csv_rows(_lines(_stream(*chunks)))]
+    return asyncio.run(run())
+
+
+def test_literal_quote_inside_a_field_does_not_swallow_the_file():
+    rows = _parse(
+        b"amount,type,category,date,description\n",
+        b'120,debit,shopping,2026-03-01,5" screen\n',
+        b"40,debit,food,2026-03-02,lunch\n",
+    )
+    assert rows == [
+        (2, {"amount": "120", "type": "debit", "category": "shopping", "date": "2026-03-01",
+             "description": '5" screen'}),
+        (3, {"amount": "40", "type": "debit", "category": "food", "date": "2026-03-02",
+             "description": "lunch"}),
+    ]
+
+
+def test_quoted_field_spans_lines_and_chunks():
+    rows = _parse(
+        b"amount,description\r\n\r\n",
+        b'10,"two\nli', b'nes, ""quoted"""\n',
+        b"20,plain",
+    )
+    assert rows == [
+        (3, {"amount": "10", "description": 'two\nlines, "quoted"'}),
+        (5, {"amount": "20", "description": "plain"}),
+    ]
+
+
+def test_unterminated_quote_and_column_count_are_reported():
+    rows = _parse(b"amount,description\n1\n2,\"never closed\n3,x\n")
+    assert rows == [(2, "Expected 2 columns, found 1"), (3, "Unterminated quoted field")]
+
+
+def test_oversized_record_stops_the_parse():
+    rows = _parse(
+        b"amount,description\n",
+        b'1,"' + b"x" * MAX_RECORD_CHARS + b'"\n',
+        b"2,after\n",
+    )
+    assert rows == [(2, f"Record longer than {MAX_RECORD_CHARS} characters; the rest of the file was not read")]
+
+
+def test_cleanup_covers_batches_committed_before_a_failure(monkeypatch):
+    calls = []
+    commits = 0
+
+    async def add_transactions(batch):
+        nonlocal commits
+        commits += 1
+        if commits == 2:
+            raise RuntimeError("commit failed")
+        return [str(i) for i in range(len(batch))]
+
+    async def invalidate(user_id, month):
+        calls.append(("invalidate", month))
+
+    async def bump(*user_ids):
+        calls.append(("bump", user_ids))
+
+    monkeypatch.setattr(import_service.repo, "add_transactions", add_transactions, raising=False)
+    monkeypatch.setattr(import_service, "invalidate_wrapped_snapshots", invalidate)
+    monkeypatch.setattr(import_service.version_service, "bump", bump)
+    monkeypatch.setattr(import_service.events_service, "publish_months",
+                        lambda user_id, months: calls.append(("publish", sorted(months))))
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 2)
+
+    body = b"amount,type,category,date\n" + b"".join(
+        b"5,debit,food,2025-%02d-01\n" % month for month in (1, 1, 2, 2))
+
+    async def run():
+        try:
+            await import_service.import_transactions("u1", _stream(body))
+        except RuntimeError:
+            return
+        raise AssertionError("the failed commit was swallowed")
+
+    asyncio.run(run())
+    assert calls == [("invalidate", "2025-01"), ("bump", ("u1",)), ("publish", ["2025-01"])]
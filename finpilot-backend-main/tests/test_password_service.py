@@ -0,0 +1,23 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+from services import password_service
+
+
+def test_broken_pool_is_replaced():
+    async def run():
+        pool = password_service._get_pool()
+        # A worker dying takes the whole executor down
+        try:
+            await asyncio.get_running_loop().run_in_executor(pool, os._exit, 1)
+        except BrokenProcessPool:
+            pass
+        hashed = await password_service.hash_password("secret")
+        return pool, hashed, await password_service.verify_password("secret", hashed)
+
+    try:
+        pool, hashed, verified = asyncio.run(run())
+        assert verified
+        assert password_service._pool is not pool
+    finally:
+        password_service.shutdown()
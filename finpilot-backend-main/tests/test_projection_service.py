@@ -0,0 +1,23 @@
+from datetime import date
+from services.projection_service import MAX_HORIZON_MONTHS, _months_until, _parameters
+
+
+def test_months_until_counts_whole_months():
+    today = date(2026, 10, 18)
+    assert _months_until("2027-10-18", today) == 12
+    assert _months_until("2027-10-17", today) == 11
+    assert _months_until("2026-10-30", today) == 0
+    assert _months_until("2025-01-01", today) < 0
+    assert _months_until(None, today) is None
+    assert _months_until("someday", today) is None
+
+
+def test_deadline_sets_the_horizon():
+    goal = {"target_amount": 12000.0, "duration_months": 60, "suggestion": "SIP (Index Fund)",
+            "monthly_amount": 500.0}
+    assert _parameters(goal)[3] == 60
+    today = date.today()
+    year = today.year
+    assert _parameters({**goal, "deadline": f"{year + 2}-{today:%m}-01"})[3] == 24 - (today.day > 1)
+    assert _parameters({**goal, "deadline": f"{year - 1}-01-01"})[3] == 1
+    assert _parameters({**goal, "deadline": f"{year + 100}-01-01"})[3] == MAX_HORIZON_MONTHS
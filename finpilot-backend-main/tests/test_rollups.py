@@ -0,0 +1,72 @@
+import asyncio
+from services.finance_service import transaction_keys
+
+
+def _txn(user_id, amount, category, day, txn_type="debit"):
+    return {"user_id": user_id, "amount": amount, "type": txn_type, "category": category,
+            "description": None, **transaction_keys(day)}
+
+
+def _insert_without_rollup(repo, txn):
+    # A transaction written before rollups existed
+    columns = ", ".join(txn)
+    repo.conn.execute(
+        f"INSERT INTO transactions (id, {columns}) VALUES (?, {', '.join('?' for _ in txn)})",
+        (f"legacy-{txn['date']}-{txn['amount']}", *txn.values()),
+    )
+
+
+def test_first_write_seeds_missing_rollup_from_existing_transactions(sqlite_repo):
+    _insert_without_rollup(sqlite_repo, _txn("u1", 40.0, "food", "2026-03-02"))
+    _insert_without_rollup(sqlite_repo, _txn("u1", 900.0, "rent", "2026-03-01"))
+    assert asyncio.run(sqlite_repo.get_rollup("u1", "2026-03")) is None
+
+    asyncio.run(sqlite_repo.add_transactions([_txn("u1", 10.0, "food", "2026-03-05")]))
+
+    rollup = asyncio.run(sqlite_repo.get_rollup("u1", "2026-03"))
+    assert rollup["debit_totals"] == {"food": 50.0, "rent": 900.0}
+    assert rollup["transaction_count"] == 3
+    assert rollup["biggest_debit"]["amount"] == 900.0
+
+
+def test_new_month_rollup_holds_only_its_transactions(sqlite_repo):
+    _insert_without_rollup(sqlite_repo, _txn("u1", 40.0, "food", "2026-02-02"))
+    _insert_without_rollup(sqlite_repo, _txn("u2", 70.0, "food", "2026-03-02"))
+
+    asyncio.run(sqlite_repo.add_transactions([_txn("u1", 10.0, "food", "2026-03-05")]))
+
+    rollup = asyncio.run(sqlite_repo.get_rollup("u1", "2026-03"))
+    assert rollup["debit_totals"] == {"food": 10.0}
+    assert rollup["transaction_count"] == 1
+
+
+def test_debit_totals_read_is_counted_once(sqlite_repo):
+    from repositories.usage import track
+
+    async def run():
+        await sqlite_repo.add_transactions([_txn("u1", 10.0, "food", "2026-03-05")])
+        usage = track()
+        totals = await sqlite_repo.get_debit_totals("u1", ["2026-02", "2026-03"])
+        return totals, usage
+
+    totals, usage = asyncio.run(run())
+    assert totals == {"2026-03": {"food": 10.0}}
+    assert (usage.queries, usage.reads) == (1, 1)
+
+
+def test_rollup_without_category_days_is_reseeded(sqlite_repo):
+    async def run():
+        await sqlite_repo.add_transactions([_txn("u1", 40.0, "food", "2026-03-02")])
+        # A rollup stored before category_daily_spend existed
+        stale = await sqlite_repo.get_rollup("u1", "2026-03")
+        del stale["category_daily_spend"]
+        await sqlite_repo.save_rollup(stale)
+        missing = await sqlite_repo.get_category_daily_spend("u1", ["2026-03"])
+
+        await sqlite_repo.add_transactions([_txn("u1", 10.0, "food", "2026-03-09")])
+        return missing, await sqlite_repo.get_category_daily_spend("u1", ["2026-02", "2026-03"])
+
+    missing, daily = asyncio.run(run())
+    assert missing == {}
+    food = daily["2026-03"]["food"]
+    assert (food[1], food[8], sum(food)) == (40.0, 10.0, 50.0)
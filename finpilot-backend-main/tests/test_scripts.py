@@ -0,0 +1,76 @@
+import asyncio
+import importlib
+import json
+import sys
+import pytest
+import database
+from repositories.sqlite_repo import SQLiteRepository
+
+
+def fresh_repo(monkeypatch, *modules):
+    """A repository proxy not yet created, as a script finds it at startup, patched into modules."""
+    monkeypatch.setattr(database, "_create_repository", lambda: SQLiteRepository(":memory:"))
+    repo = database.LazyRepository(database.RepositoryProvider())
+    for module in modules:
+        monkeypatch.setattr(module, "repo", repo)
+    return repo
+
+
+@pytest.mark.parametrize("script", [
+    "migrate_transaction_keys", "migrate_email_index", "compact_salary_allocations", "rebuild_rollups",
+])
+def test_script_runs_against_sqlite(script, monkeypatch, capsys):
+    module = importlib.import_module(script)
+    fresh_repo(monkeypatch, module)
+    monkeypatch.setattr(sys, "argv", [f"{script}.py"])
+    asyncio.run(module.main())
+    assert capsys.readouterr().out
+
+
+def test_compaction_keeps_one_salary_and_allocation_per_month(monkeypatch, capsys):
+    import compact_salary_allocations
+    from services.ai_service import predict_budget_allocation
+
+    repo = fresh_repo(monkeypatch, compact_salary_allocations)
+    matching = predict_budget_allocation(50000.0)
+    # Random-ID records from before salaries and allocations were keyed by month
+    repo.conn.executemany("INSERT INTO salaries VALUES (?, ?, ?, ?, ?)", [
+        ("a1", "u1", "2026-01", 40000.0, "2026-01-01T00:00:00"),
+        ("a2", "u1", "2026-01", 50000.0, "2026-01-05T00:00:00"),
+        ("u1_2026-02", "u1", "2026-02", 55000.0, "2026-02-01T00:00:00"),
+    ])
+    repo.conn.executemany("INSERT INTO allocations VALUES (?, ?, ?, ?)", [
+        ("b1", "u1", "2026-01", json.dumps(matching)),
+        ("b2", "u1", "2026-01", json.dumps({"food": 1.0})),
+    ])
+
+    monkeypatch.setattr(sys, "argv", ["compact_salary_allocations.py"])
+    asyncio.run(compact_salary_allocations.main())
+
+    salaries = repo.conn.execute("SELECT id, amount FROM salaries ORDER BY id").fetchall()
+    allocations = repo.conn.execute("SELECT id, categories FROM allocations").fetchall()
+    assert [tuple(row) for row in salaries] == [("u1_2026-01", 50000.0), ("u1_2026-02", 55000.0)]
+    assert [(row["id"], json.loads(row["categories"])) for row in allocations] == [("u1_2026-01", matching)]
+    assert "Removed 4 duplicate or legacy records" in capsys.readouterr().out
+
+
+def test_email_backfill_makes_existing_users_findable(monkeypatch, capsys):
+    import migrate_email_index
+
+    repo = fresh_repo(monkeypatch, migrate_email_index)
+    # Registered before emails were normalized
+    repo.conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?)", [
+        ("u1", " Ann@Example.COM", "Ann", "hash", "2025-01-01"),
+        ("u2", "bob@example.com", "Bob", "hash", "2025-01-02"),
+        ("u3", "BOB@example.com", "Bob again", "hash", "2025-01-03"),
+    ])
+
+    asyncio.run(migrate_email_index.main())
+
+    ann = asyncio.run(repo.find_user_by_email("ann@example.com"))
+    bob = asyncio.run(repo.find_user_by_email("bob@example.com"))
+    assert (ann["id"], ann["email"]) == ("u1", "ann@example.com")
+    assert bob["id"] == "u2"
+    out = capsys.readouterr().out
+    assert "bob@example.com is used by u2 and u3" in out
+    assert "Indexed 2 users (1 duplicate emails)" in out
@@ -0,0 +1,23 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+
+@pytest.mark.parametrize("url", [
+    "/wrapped/summary?user_id=u1&year=0&month=1",
+    "/wrapped/summary?user_id=u1&year=1&month=1",
+    "/wrapped/summary?user_id=u1&year=9999&month=12",
+    "/wrapped/year?user_id=u1&year=0",
+    "/wrapped/year?user_id=u1&year=9999",
+    "/wrapped/year?user_id=u1&year=12345",
+])
+def test_out_of_range_year_is_rejected(url):
+    with TestClient(app) as client:
+        response = client.get(url)
+    assert response.status_code == 422
+
+
+def test_earliest_and_latest_years_are_served():
+    with TestClient(app) as client:
+        assert client.get("/wrapped/summary?user_id=u1&year=2&month=1").status_code == 200
+        assert client.get("/wrapped/year?user_id=u1&year=9998").status_code == 200
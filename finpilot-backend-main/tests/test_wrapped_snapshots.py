@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import date
+from schemas.goal import GoalInput
+from services import finance_service, wrapped_service
+from services.goal_service import _goal_record
+
+
+def test_invalidation_during_compute_blocks_the_stale_save(sqlite_repo, monkeypatch):
+    monkeypatch.setattr(finance_service, "repo", sqlite_repo)
+    monkeypatch.setattr(wrapped_service, "repo", sqlite_repo)
+    year = date.today().year - 1
+
+    async def backdated_write_during(*args):
+        # A write into the month lands after the computation read its data
+        await finance_service.invalidate_wrapped_snapshots("u1", f"{year}-03")
+        return {"total_spent": 0.0}
+
+    monkeypatch.setattr(wrapped_service, "_compute_wrapped_summary", backdated_write_during)
+
+    async def run():
+        summary = await wrapped_service.get_wrapped_summary("u1", year, 3)
+        snapshot = await sqlite_repo.get_wrapped_snapshot("u1", f"{year}-03")
+        return summary, snapshot
+
+    summary, snapshot = asyncio.run(run())
+    assert summary["total_spent"] == 0.0
+    assert snapshot.summary is None
+    assert snapshot.generation == 1
+
+
+def test_snapshot_is_stored_and_dropped(sqlite_repo):
+    async def run():
+        missing = await sqlite_repo.get_wrapped_snapshot("u1", "2025-03")
+        stored = await sqlite_repo.save_wrapped_snapshot("u1", "2025-03", {"a": 1}, missing.generation)
+        kept = await sqlite_repo.get_wrapped_snapshot("u1", "2025-03")
+        await sqlite_repo.delete_wrapped_snapshots("u1", ["2025-03"])
+        dropped = await sqlite_repo.get_wrapped_snapshot("u1", "2025-03")
+        stale = await sqlite_repo.save_wrapped_snapshot("u1", "2025-03", {"a": 1}, kept.generation)
+        fresh = await sqlite_repo.save_wrapped_snapshot("u1", "2025-03", {"a": 2}, dropped.generation)
+        return missing, stored, kept, dropped, stale, fresh, await sqlite_repo.get_wrapped_snapshot("u1", "2025-03")
+
+    missing, stored, kept, dropped, stale, fresh, final = asyncio.run(run())
+    assert missing == (None, 0)
+    assert stored and kept == ({"a": 1}, 0)
+    assert dropped == (None, 1)
+    assert not stale
+    assert fresh and final == ({"a": 2}, 1)
+
+
+def test_precomputed_only_waits_for_a_running_precompute(sqlite_repo, monkeypatch):
+    monkeypatch.setattr(wrapped_service, "repo", sqlite_repo)
+    monkeypatch.setattr(wrapped_service, "WRAPPED_PRECOMPUTED_ONLY", True)
+    monkeypatch.setattr(wrapped_service, "_compute_wrapped_summary", lambda *args: asyncio.sleep(0, {"live": True}))
+    year = date.today().year - 1
+    month = f"{year}-03"
+
+    async def summary():
+        try:
+            return await wrapped_service.get_wrapped_summary("u1", year, 3)
+        except wrapped_service.WrappedNotReady:
+            return None
+
+    async def run():
+        await sqlite_repo.set_precompute_heartbeat(month, time.time())
+        queued = await summary()
+        await sqlite_repo.set_precompute_heartbeat(month, time.time() - wrapped_service.PRECOMPUTE_HEARTBEAT_TIMEOUT)
+        dead_job = await summary()
+        await sqlite_repo.set_precompute_heartbeat(f"{year}-04", None)
+        never_run = await wrapped_service.get_wrapped_summary("u1", year, 4)
+        return queued, dead_job, never_run, await sqlite_repo.get_wrapped_snapshot("u1", f"{year}-04")
+
+    queued, dead_job, never_run, stored = asyncio.run(run())
+    assert queued is None
+    assert dead_job["live"] and never_run["live"]
+    assert stored.summary == {"live": True}
+
+
+def test_goals_summary_is_read_live_over_a_snapshot(sqlite_repo, monkeypatch):
+    monkeypatch.setattr(wrapped_service, "repo", sqlite_repo)
+    year = date.today().year - 1
+    goal = _goal_record(GoalInput(user_id="u1", target_amount=100.0, duration_months=12))
+
+    async def run():
+        (goal_id,), _, _ = await sqlite_repo.apply_goal_changes([goal], {}, [])
+        before = await wrapped_service.get_wrapped_summary("u1", year, 3)
+        year_before = await wrapped_service.get_wrapped_year("u1", year)
+        # Goal writes don't invalidate snapshots
+        await sqlite_repo.apply_goal_changes([], {goal_id: 100.0}, [])
+        after = await wrapped_service.get_wrapped_summary("u1", year, 3)
+        year_after = await wrapped_service.get_wrapped_year("u1", year)
+        return before, year_before, after, year_after, await sqlite_repo.get_wrapped_snapshot("u1", f"{year}-03")
+
+    before, year_before, after, year_after, snapshot = asyncio.run(run())
+    assert before["goals_summary"]["completed"] == 0
+    assert year_before["months"][2]["goals_summary"]["completed"] == 0
+    assert after["goals_summary"]["completed"] == 1
+    assert after["goals_summary"]["total_saved"] == 100.0
+    assert year_after["goals_summary"]["completed"] == 1
+    assert all(month["goals_summary"]["completed"] == 1 for month in year_after["months"])
+    assert snapshot.summary["goals_summary"] is None